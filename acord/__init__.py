@@ -15,7 +15,20 @@
 
 from .bases import *
 from .models import *
-from .client import Client, Shard, CacheData, Cache, DefaultCache
+from .client import (
+    Client,
+    Shard,
+    ShardCluster,
+    CacheData,
+    Cache,
+    DefaultCache,
+    MessageCache,
+    CachePolicy,
+    PolicyStore,
+    SessionStore,
+    FileSessionStore,
+    SQLiteSessionStore,
+)
 from .webhooks.webhook import Webhook, WebhookType
 from .voice.transports.base import BaseTransport
 from .voice.transports.reader import BaseReceiver
@@ -1,4 +1,10 @@
 from .client import Client
 from .shard import Shard
+from .parsers import EventParsers
+from .startup import IdentifyScheduler
+from .cluster import ShardCluster
+from .sessions import SessionData, SessionStore, FileSessionStore, SQLiteSessionStore
 from .caches.cache import CacheData, Cache
 from .caches.default import DefaultCache
+from .caches.messages import MessageCache
+from .caches.policy import CachePolicy, PolicyStore
@@ -2,13 +2,18 @@
 from __future__ import annotations
 from ctypes import Union
 
-from typing import Any, Dict, Iterator, Optional
+import asyncio
+from typing import Any, Dict, Iterable, Iterator, List, Optional
 from abc import ABC, abstractmethod
+from collections.abc import MutableMapping
 from weakref import WeakValueDictionary
 from acord import User, Guild, Snowflake, Message, Channel
 import pydantic
 
 from acord.models.channels.stage import StageInstance
+from acord.models.raw import Materializer, RawPayload
+
+from .snapshot import SNAPSHOT_SECTIONS, SnapshotInfo, SnapshotReader, write_snapshot
 
 
 class CacheData(dict):
@@ -18,10 +23,10 @@ def __get_validators__(cls):
 
     @classmethod
     def validate(cls, v) -> dict:
-        if isinstance(v, (dict, WeakValueDictionary)):
+        if isinstance(v, (dict, WeakValueDictionary, MutableMapping)):
             return v
 
-        raise TypeError("Value must be a dict or WeakValueDictionary")
+        raise TypeError("Value must be a dict, WeakValueDictionary or mapping")
 
 
 class Cache(ABC, pydantic.BaseModel):
@@ -49,6 +54,11 @@ class MyCache(Cache):
 
     sections: Dict[str, CacheData] = {}
     """ Mapping of cache sections for cache """
+    sweep_interval: Optional[float] = 60.0
+    """ Seconds between removing expired items in the background,
+    ``None`` to only remove them when accessed """
+
+    _restored_snapshot: Optional[SnapshotInfo] = pydantic.PrivateAttr(None)
 
     def __getitem__(self, item: Any) -> CacheData:
         return self.sections[item]
@@ -70,6 +80,125 @@ def clear(self) -> None:
         """Clears the cache,
         make sure not to erase the constants."""
 
+    @property
+    def materializer(self) -> Optional[Materializer]:
+        """The :class:`Materializer` building models from stored payloads,
+        ``None`` if the cache stores models."""
+        return None
+
+    @property
+    def restored_snapshot(self) -> Optional[SnapshotInfo]:
+        """The snapshot the cache was last restored from,
+        its :attr:`SnapshotInfo.age` tells how outdated restored items may be."""
+        return self._restored_snapshot
+
+    def snapshot(self, path: str) -> int:
+        """Writes the users, channels and guilds of the cache to a file,
+        roles, members and threads are written as part of their guild.
+        Returns the number of items written.
+
+        Items are streamed to a compressed file one at a time,
+        so large caches are never serialized into a single blob.
+
+        Parameters
+        ----------
+        path: :class:`str`
+            Path to write snapshot to, replaced if it exists
+        """
+        records = (
+            (name, key, value)
+            for name in SNAPSHOT_SECTIONS
+            if name in self.sections
+            for key, value in list(self.sections[name].items())
+        )
+
+        return write_snapshot(path, records)
+
+    def restore(self, path: str, conn: Any) -> SnapshotInfo:
+        """Adds the items of a snapshot written by :meth:`Cache.snapshot` to the cache.
+
+        Restored items may be outdated until the gateway updates them,
+        see :attr:`Cache.restored_snapshot`.
+        Sections holding weak references, such as the users of :class:`DefaultCache`,
+        only keep restored items which are referenced by other restored items.
+
+        .. warning::
+            Snapshots are pickles, only restore snapshots written by your own client.
+
+        Parameters
+        ----------
+        path: :class:`str`
+            Path of snapshot
+        conn: :class:`HTTPClient`
+            Connection given to restored models, usually :attr:`Client.http`
+        """
+        materializer = self.materializer
+        restored = 0
+
+        with SnapshotReader(path, conn, materializer) as reader:
+            for name, key, value in reader:
+                if name not in self.sections:
+                    continue
+
+                if materializer is None and isinstance(value, RawPayload):
+                    value = value.build()
+
+                self.sections[name][key] = value
+                restored += 1
+
+        self._restored_snapshot = SnapshotInfo(path, reader.created_at, restored)
+        return self._restored_snapshot
+
+    def sweep(self, limit: Optional[int] = None) -> int:
+        """Removes expired items from every section which expires items,
+        such as a :class:`PolicyStore`. Returns the number of items removed.
+
+        Parameters
+        ----------
+        limit: :class:`int`
+            Maximum number of items to remove
+        """
+        removed = 0
+
+        for section in list(self.sections.values()):
+            sweep = getattr(section, "sweep", None)
+
+            if sweep is None:
+                continue
+
+            if limit is None:
+                removed += sweep()
+                continue
+
+            if removed >= limit:
+                break
+            removed += sweep(limit - removed)
+
+        return removed
+
+    async def sweep_expired(self, chunk: int = 500) -> int:
+        """|coro|
+
+        Removes every expired item, ``chunk`` items at a time,
+        yielding to the event loop between chunks so large sweeps dont block it.
+        Returns the number of items removed.
+
+        Parameters
+        ----------
+        chunk: :class:`int`
+            Number of items to remove before yielding
+        """
+        removed = 0
+
+        while True:
+            swept = self.sweep(chunk)
+            removed += swept
+
+            if swept < chunk:
+                return removed
+
+            await asyncio.sleep(0)
+
     # NOTE: Users
 
     @abstractmethod
@@ -96,6 +225,20 @@ def add_user(self, user: User, /) -> None:
             The user to add in the cache.
         """
 
+    def add_user_payload(self, user: User, data: Dict[str, Any], /) -> None:
+        """Adds a :class:`User` along with the payload it was built from,
+        caches which store payloads instead of models should override this.
+        By default the user is added with :meth:`Cache.add_user`.
+
+        Parameters
+        ----------
+        user: :class:`User`
+            The user to add in the cache.
+        data: Dict[:class:`str`, Any]
+            Payload the user was built from
+        """
+        self.add_user(user)
+
     @abstractmethod
     def remove_user(self, user_id: Snowflake, *args) -> Optional[User]:
         """Removes a :class:`User` from the cache.
@@ -209,6 +352,21 @@ def add_message(self, message: Message, /) -> None:
             overwrites if message already exists.
         """
 
+    def add_message_payload(self, message: Message, data: Dict[str, Any], /) -> None:
+        """Adds a :class:`Message` along with the payload it was built from,
+        caches which store payloads instead of models should override this.
+        By default the message is added with :meth:`Cache.add_message`.
+
+        Parameters
+        ----------
+        message: :class:`Message`
+            Message to add,
+            overwrites if message already exists.
+        data: Dict[:class:`str`, Any]
+            Payload the message was built from
+        """
+        self.add_message(message)
+
     @abstractmethod
     def remove_message(
         self, channel_id: Snowflake, message_id: Snowflake, *args
@@ -223,6 +381,69 @@ def remove_message(
             ID of message to get
         """
 
+    def remove_messages(
+        self, channel_id: Snowflake, message_ids: Iterable[Snowflake], /
+    ) -> List[Optional[Message]]:
+        """Removes many messages of a channel from the cache,
+        returns the removed messages with ``None`` for messages which were not cached.
+
+        Parameters
+        ----------
+        channel_id: :class:`Snowflake`
+            ID of channel were messages are in
+        message_ids: Iterable[:class:`Snowflake`]
+            IDs of messages to remove
+        """
+        return [
+            self.remove_message(channel_id, int(message_id), None)
+            for message_id in message_ids
+        ]
+
+    def purge_channel(self, channel_id: Snowflake, /) -> List[Message]:
+        """Removes every cached message of a channel,
+        returns the removed messages.
+
+        Parameters
+        ----------
+        channel_id: :class:`Snowflake`
+            ID of channel to remove messages of
+        """
+        messages = [m for m in self.messages() if m.channel_id == channel_id]
+
+        for message in messages:
+            self.remove_message(channel_id, message.id, None)
+
+        return messages
+
+    def messages_between(
+        self,
+        channel_id: Snowflake,
+        /,
+        after: Optional[Snowflake] = None,
+        before: Optional[Snowflake] = None,
+    ) -> List[Message]:
+        """Gets the cached messages of a channel with IDs between ``after`` and ``before``,
+        oldest first.
+
+        Parameters
+        ----------
+        channel_id: :class:`Snowflake`
+            ID of channel to get messages of
+        after: :class:`Snowflake`
+            Only get messages with a greater ID
+        before: :class:`Snowflake`
+            Only get messages with a lower ID
+        """
+        messages = [
+            message
+            for message in self.messages()
+            if message.channel_id == channel_id
+            and (after is None or message.id > after)
+            and (before is None or message.id < before)
+        ]
+
+        return sorted(messages, key=lambda message: message.id)
+
     # NOTE: Stage instances
 
     @abstractmethod
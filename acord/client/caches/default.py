@@ -3,9 +3,13 @@
 
 import typing
 from weakref import WeakValueDictionary
+import pydantic
 from acord.models import Snowflake, User, Guild, Channel, Message, StageInstance
+from acord.models.raw import Materializer, RawPayload, slim_payload
 
 from .cache import CacheData, Cache
+from .messages import EvictionPolicy, MessageCache
+from .policy import CachePolicy, PolicyStore
 
 SECTIONS = {
     "messages": {},
@@ -17,15 +21,141 @@
 
 
 class DefaultCache(Cache):
+    """The cache used by default,
+    messages are kept in a :class:`MessageCache` which evicts old messages once full.
+
+    .. rubric:: Keeping the last 50 messages of each channel
+
+    .. code-block:: py
+
+        from acord import Client, DefaultCache
+
+        client = Client(
+            cache=DefaultCache(max_messages=20000, max_messages_per_channel=50)
+        )
+
+    .. rubric:: Limiting other sections
+
+    .. code-block:: py
+
+        from acord import CachePolicy, DefaultCache
+
+        cache = DefaultCache(
+            policies={
+                "users": CachePolicy(max_items=100000, eviction="lfu"),
+                "messages": CachePolicy(max_items=5000, ttl=3600),
+            }
+        )
+
+    .. note::
+        A policy for ``messages`` replaces ``max_messages`` and ``message_eviction``,
+        messages can only be evicted with ``lru`` or ``fifo``.
+
+    .. rubric:: Storing payloads instead of models
+
+    With ``compact`` set, messages, users and guild members
+    are stored as slimmed payloads and built when they are looked up.
+    Built models are kept for ``materialized_ttl`` seconds,
+    changes made to them are lost unless they are added back to the cache.
+
+    .. code-block:: py
+
+        cache = DefaultCache(
+            compact=True,
+            policies={"users": CachePolicy(max_items=100000)},
+        )
+
+    .. note::
+        Users are normally only cached while another object references them,
+        in compact mode they are kept until removed so should be given a policy.
+    """
+
     sections: typing.Dict[str, CacheData] = SECTIONS
 
+    max_messages: typing.Optional[int] = 1000
+    """ Maximum number of messages cached, ``None`` for no limit """
+    max_messages_per_channel: typing.Optional[int] = None
+    """ Maximum number of messages cached for each channel, ``None`` for no limit """
+    message_eviction: EvictionPolicy = "lru"
+    """ Order messages are evicted in, ``lru`` or ``fifo`` """
+    policies: typing.Dict[str, CachePolicy] = {}
+    """ Mapping of section name to the :class:`CachePolicy` applied to it """
+    compact: bool = False
+    """ Whether messages, users and members are stored as payloads and built when accessed """
+    materialized_ttl: float = 5.0
+    """ Seconds a model built from a payload is kept for """
+
+    _materializer: typing.Optional[Materializer] = pydantic.PrivateAttr(None)
+
+    def __init__(self, **kwds) -> None:
+        super().__init__(**kwds)
+
+        if self.compact:
+            self._materializer = Materializer(self.materialized_ttl)
+
+            # Payloads are only referenced by the cache
+            if isinstance(self.sections.get("users"), WeakValueDictionary):
+                self.sections["users"] = dict(self.sections["users"])
+
+        for name, policy in self.policies.items():
+            if name == "messages":
+                continue
+
+            section = self.sections.get(name)
+
+            if not isinstance(section, PolicyStore):
+                store = PolicyStore(policy)
+                store.update(section or {})
+                self.sections[name] = store
+
+        if not isinstance(self.sections.get("messages"), MessageCache):
+            policy = self.policies.get("messages")
+
+            if policy is None:
+                messages = MessageCache(
+                    self.max_messages,
+                    self.max_messages_per_channel,
+                    self.message_eviction,
+                )
+            else:
+                messages = MessageCache(
+                    policy.max_items,
+                    self.max_messages_per_channel,
+                    policy.eviction,
+                    policy.ttl,
+                )
+
+            messages.update(self.sections.get("messages") or {})
+            self.sections["messages"] = messages
+
+    @property
+    def message_cache(self) -> MessageCache:
+        """The :class:`MessageCache` holding messages,
+        exposes eviction counters and :meth:`MessageCache.memory_usage`.
+        """
+        return self.sections["messages"]
+
+    @property
+    def materializer(self) -> typing.Optional[Materializer]:
+        return self._materializer
+
+    def _load(self, value: typing.Any) -> typing.Any:
+        if self._materializer is None:
+            return value
+        return self._materializer.load(value)
+
     def clear(self):
         for cache in self.sections.values():
             cache.clear()
 
+        if self._materializer is not None:
+            self._materializer.clear()
+
     def users(self) -> typing.Iterator[User]:
         cache = self["users"]
 
+        if self._materializer is not None:
+            return map(self._load, cache.values())
         return cache.values()
 
     # NOTE: Users
@@ -36,7 +166,7 @@ def get_user(self, user_id: Snowflake, /) -> None:
 
         cache = self["users"]
 
-        return cache.get(user_id)
+        return self._load(cache.get(user_id))
 
     def add_user(self, user: User, /) -> None:
         if not isinstance(user, User):
@@ -46,13 +176,21 @@ def add_user(self, user: User, /) -> None:
 
         cache[user.id] = user
 
+    def add_user_payload(self, user: User, data: typing.Dict[str, typing.Any], /) -> None:
+        if not self.compact:
+            return self.add_user(user)
+
+        cache = self["users"]
+
+        cache[user.id] = RawPayload(User, user.conn, slim_payload(data))
+
     def remove_user(self, user_id: Snowflake, *args) -> None:
         if not isinstance(user_id, int):
             raise TypeError("User ID must be an int")
 
         cache = self["users"]
 
-        return cache.pop(user_id, *args)
+        return self._load(cache.pop(user_id, *args))
 
     # NOTE: Guilds
 
@@ -121,6 +259,8 @@ def remove_channel(self, channel_id: Snowflake, *args) -> None:
     def messages(self) -> typing.Iterator[Message]:
         cache = self["messages"]
 
+        if self._materializer is not None:
+            return map(self._load, cache.values())
         return cache.values()
 
     def get_message(
@@ -133,7 +273,7 @@ def get_message(
 
         cache = self["messages"]
 
-        return cache.get(f"{channel_id}:{message_id}")
+        return self._load(cache.get((channel_id, message_id)))
 
     def add_message(self, message: Message, /) -> None:
         if not isinstance(message, Message):
@@ -141,7 +281,19 @@ def add_message(self, message: Message, /) -> None:
 
         cache = self["messages"]
 
-        cache[f"{message.channel_id}:{message.id}"] = message
+        cache[(int(message.channel_id), int(message.id))] = message
+
+    def add_message_payload(
+        self, message: Message, data: typing.Dict[str, typing.Any], /
+    ) -> None:
+        if not self.compact:
+            return self.add_message(message)
+
+        cache = self["messages"]
+
+        cache[(int(message.channel_id), int(message.id))] = RawPayload(
+            Message, message.conn, slim_payload(data)
+        )
 
     def remove_message(
         self, channel_id: Snowflake, message_id: Snowflake, *args
@@ -153,7 +305,37 @@ def remove_message(
 
         cache = self["messages"]
 
-        cache.pop(f"{channel_id}:{message_id}", *args)
+        return self._load(cache.pop((channel_id, message_id), *args))
+
+    def remove_messages(
+        self, channel_id: Snowflake, message_ids: typing.Iterable[Snowflake], /
+    ) -> typing.List[typing.Optional[Message]]:
+        if not isinstance(channel_id, int):
+            raise TypeError("Channel ID must be an int")
+
+        removed = self.message_cache.remove_many(channel_id, map(int, message_ids))
+
+        return [self._load(message) for message in removed]
+
+    def purge_channel(self, channel_id: Snowflake, /) -> typing.List[Message]:
+        if not isinstance(channel_id, int):
+            raise TypeError("Channel ID must be an int")
+
+        return [self._load(m) for m in self.message_cache.purge_channel(channel_id)]
+
+    def messages_between(
+        self,
+        channel_id: Snowflake,
+        /,
+        after: typing.Optional[Snowflake] = None,
+        before: typing.Optional[Snowflake] = None,
+    ) -> typing.List[Message]:
+        if not isinstance(channel_id, int):
+            raise TypeError("Channel ID must be an int")
+
+        messages = self.message_cache.messages_between(channel_id, after, before)
+
+        return [self._load(message) for message in messages]
 
     # NOTE: Stage Instances
     def stage_instances(self) -> typing.Iterator[StageInstance]:
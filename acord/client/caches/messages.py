@@ -0,0 +1,384 @@
+# Bounded message storage used by DefaultCache
+from __future__ import annotations
+
+import bisect
+import sys
+import time
+from collections import Counter, OrderedDict
+from collections.abc import MutableMapping
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Literal, Optional, Tuple
+
+import pydantic
+
+from .policy import TTLTracker
+
+EvictionPolicy = Literal["lru", "fifo"]
+
+
+def approximate_size(obj: Any, _seen: set = None) -> int:
+    """Approximates the memory used by an object and everything it references,
+    objects referenced more than once are only counted once.
+    """
+    if _seen is None:
+        _seen = set()
+
+    if id(obj) in _seen:
+        return 0
+
+    _seen.add(id(obj))
+    size = sys.getsizeof(obj)
+
+    if isinstance(obj, (str, bytes, int, float, bool, type(None))):
+        return size
+
+    if isinstance(obj, dict):
+        for key, value in obj.items():
+            size += approximate_size(key, _seen) + approximate_size(value, _seen)
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        for value in obj:
+            size += approximate_size(value, _seen)
+    elif isinstance(obj, pydantic.BaseModel):
+        for name, value in obj.__dict__.items():
+            # Connections are shared by every model, not owned by them
+            if name != "conn":
+                size += approximate_size(value, _seen)
+
+    return size
+
+
+class _ChannelIndex(object):
+    # Messages of a single channel
+    __slots__ = ("order", "ids")
+
+    def __init__(self) -> None:
+        # Message ids in eviction order
+        self.order: OrderedDict[int, None] = OrderedDict()
+        # Message ids sorted, snowflakes sort by creation time
+        self.ids: List[int] = []
+
+    def add(self, message_id: int) -> None:
+        self.order[message_id] = None
+        ids = self.ids
+
+        if not ids or ids[-1] < message_id:
+            # New messages almost always have the highest id
+            ids.append(message_id)
+        else:
+            bisect.insort(ids, message_id)
+
+    def remove(self, message_id: int) -> None:
+        del self.order[message_id]
+
+        index = bisect.bisect_left(self.ids, message_id)
+        del self.ids[index]
+
+
+class MessageCache(MutableMapping):
+    """A mapping of ``(channel_id, message_id)`` to messages,
+    which evicts the oldest messages once full.
+
+    Messages are evicted once ``max_messages`` are cached,
+    or once a channel holds ``max_messages_per_channel``.
+    With the ``lru`` policy, reading a message marks it as recently used,
+    with ``fifo`` messages are evicted in the order they were added.
+
+    Messages are also indexed by channel,
+    so removing every message of a channel or fetching a range of messages
+    only touches the messages of that channel.
+
+    Parameters
+    ----------
+    max_messages: :class:`int`
+        Maximum number of messages cached, ``None`` for no limit
+    max_messages_per_channel: :class:`int`
+        Maximum number of messages cached for each channel, ``None`` for no limit
+    policy: Literal["lru", "fifo"]
+        Order messages are evicted in
+    ttl: :class:`float`
+        Seconds a message is kept after it was last added or updated,
+        ``None`` for no expiry. Expired messages are removed when accessed
+        or by :meth:`MessageCache.sweep`.
+
+    Attributes
+    ----------
+    evictions: :class:`~collections.Counter`
+        Number of messages evicted,
+        under ``max_messages``, ``max_messages_per_channel`` and ``ttl``
+    """
+
+    def __init__(
+        self,
+        max_messages: Optional[int] = 1000,
+        max_messages_per_channel: Optional[int] = None,
+        policy: EvictionPolicy = "lru",
+        ttl: Optional[float] = None,
+    ) -> None:
+        if policy not in ("lru", "fifo"):
+            raise ValueError("policy must be either lru or fifo")
+
+        self.max_messages = max_messages
+        self.max_messages_per_channel = max_messages_per_channel
+        self.policy = policy
+        self.ttl = ttl
+
+        self.evictions: Counter = Counter()
+
+        self._messages: OrderedDict[Tuple[int, int], Any] = OrderedDict()
+        self._channels: Dict[int, _ChannelIndex] = dict()
+        self._ttl = TTLTracker(ttl) if ttl is not None else None
+
+    def __repr__(self) -> str:
+        return (
+            f"MessageCache(size={len(self)}, max_messages={self.max_messages}, "
+            f"policy={self.policy!r})"
+        )
+
+    def __len__(self) -> int:
+        return len(self._messages)
+
+    def __iter__(self) -> Iterator[Tuple[int, int]]:
+        return iter(self._messages)
+
+    def __contains__(self, key: Any) -> bool:
+        if key not in self._messages:
+            return False
+
+        if self._ttl is not None and self._ttl.expired(key):
+            self._evict(key, "ttl")
+            return False
+        return True
+
+    def __getitem__(self, key: Tuple[int, int]) -> Any:
+        message = self._messages[key]
+
+        if self._ttl is not None and self._ttl.expired(key):
+            self._evict(key, "ttl")
+            raise KeyError(key)
+
+        if self.policy == "lru":
+            self._touch(key)
+
+        return message
+
+    def _touch(self, key: Tuple[int, int]) -> None:
+        self._messages.move_to_end(key)
+        self._channels[key[0]].order.move_to_end(key[1])
+
+    def __setitem__(self, key: Tuple[int, int], message: Any) -> None:
+        channel_id, message_id = key
+
+        if self._ttl is not None:
+            self._ttl.touch(key)
+
+        if key in self._messages:
+            self._messages[key] = message
+
+            if self.policy == "lru":
+                self._touch(key)
+            return
+
+        self._messages[key] = message
+
+        index = self._channels.get(channel_id)
+
+        if index is None:
+            index = self._channels[channel_id] = _ChannelIndex()
+
+        index.add(message_id)
+
+        if (
+            self.max_messages_per_channel is not None
+            and len(index.order) > self.max_messages_per_channel
+        ):
+            oldest = next(iter(index.order))
+            index.remove(oldest)
+            del self._messages[(channel_id, oldest)]
+            self.evictions["max_messages_per_channel"] += 1
+
+            if self._ttl is not None:
+                self._ttl.discard((channel_id, oldest))
+
+        if self.max_messages is not None:
+            while len(self._messages) > self.max_messages:
+                oldest, _ = self._messages.popitem(last=False)
+                self._forget(oldest)
+                self.evictions["max_messages"] += 1
+
+    def _evict(self, key: Tuple[int, int], reason: str) -> None:
+        del self[key]
+        self.evictions[reason] += 1
+
+    def _forget(self, key: Tuple[int, int]) -> None:
+        if self._ttl is not None:
+            self._ttl.discard(key)
+
+        channel_id, message_id = key
+        index = self._channels[channel_id]
+        index.remove(message_id)
+
+        if not index.order:
+            del self._channels[channel_id]
+
+    def __delitem__(self, key: Tuple[int, int]) -> None:
+        del self._messages[key]
+        self._forget(key)
+
+    def clear(self) -> None:
+        self._messages.clear()
+        self._channels.clear()
+
+        if self._ttl is not None:
+            self._ttl.clear()
+
+    def values(self):
+        # Iterating shouldnt count as using every message
+        if self._ttl is None:
+            return self._messages.values()
+        return [message for _, message in self.items()]
+
+    def items(self):
+        if self._ttl is None:
+            return self._messages.items()
+
+        now = time.monotonic()
+        expired = self._ttl.expired
+
+        return [item for item in self._messages.items() if not expired(item[0], now)]
+
+    def sweep(self, limit: Optional[int] = None) -> int:
+        """Removes expired messages, returns the number removed
+
+        Parameters
+        ----------
+        limit: :class:`int`
+            Maximum number of messages to remove
+        """
+        if self._ttl is None:
+            return 0
+
+        keys = self._ttl.due(limit)
+
+        for key in keys:
+            self._evict(key, "ttl")
+
+        return len(keys)
+
+    def add(self, message: Any) -> None:
+        """Adds a message, replacing the cached message with the same id"""
+        self[(int(message.channel_id), int(message.id))] = message
+
+    def remove(self, channel_id: int, message_id: int) -> Optional[Any]:
+        """Removes a message, returns ``None`` if it wasnt cached"""
+        key = (channel_id, message_id)
+        message = self._messages.pop(key, None)
+
+        if message is not None:
+            self._forget(key)
+
+        return message
+
+    def remove_many(
+        self, channel_id: int, message_ids: Iterable[int]
+    ) -> List[Optional[Any]]:
+        """Removes many messages from a channel,
+        returns the removed messages with ``None`` for messages which werent cached.
+        """
+        index = self._channels.get(channel_id)
+
+        if index is None:
+            return [None for _ in message_ids]
+
+        removed = []
+
+        for message_id in message_ids:
+            message = self._messages.pop((channel_id, message_id), None)
+
+            if message is not None:
+                index.remove(message_id)
+
+                if self._ttl is not None:
+                    self._ttl.discard((channel_id, message_id))
+
+            removed.append(message)
+
+        if not index.order:
+            del self._channels[channel_id]
+
+        return removed
+
+    def purge_channel(self, channel_id: int) -> List[Any]:
+        """Removes every message of a channel, returns the removed messages"""
+        index = self._channels.pop(channel_id, None)
+
+        if index is None:
+            return []
+
+        messages = self._messages
+
+        if self._ttl is not None:
+            for message_id in index.ids:
+                self._ttl.discard((channel_id, message_id))
+
+        return [messages.pop((channel_id, message_id)) for message_id in index.ids]
+
+    def channel_messages(self, channel_id: int) -> List[Any]:
+        """Gets every message of a channel, oldest first"""
+        return self.messages_between(channel_id)
+
+    def messages_between(
+        self,
+        channel_id: int,
+        after: Optional[int] = None,
+        before: Optional[int] = None,
+    ) -> List[Any]:
+        """Gets the messages of a channel with ids between ``after`` and ``before``,
+        oldest first. Snowflakes of timestamps can be used to get messages sent in a period.
+
+        Parameters
+        ----------
+        channel_id: :class:`int`
+            ID of the channel
+        after: :class:`int`
+            Only get messages with a greater id
+        before: :class:`int`
+            Only get messages with a lower id
+        """
+        index = self._channels.get(channel_id)
+
+        if index is None:
+            return []
+
+        ids = index.ids
+        start = 0 if after is None else bisect.bisect_right(ids, after)
+        end = len(ids) if before is None else bisect.bisect_left(ids, before)
+        messages = self._messages
+        keys = [(channel_id, message_id) for message_id in ids[start:end]]
+
+        if self._ttl is not None:
+            now = time.monotonic()
+            keys = [key for key in keys if not self._ttl.expired(key, now)]
+
+        return [messages[key] for key in keys]
+
+    def channel_size(self, channel_id: int) -> int:
+        """Number of messages cached for a channel"""
+        index = self._channels.get(channel_id)
+        return 0 if index is None else len(index.order)
+
+    def memory_usage(self, sample: int = 100) -> int:
+        """Approximates the bytes used by cached messages,
+        by measuring up to ``sample`` of the most recent messages.
+
+        Parameters
+        ----------
+        sample: :class:`int`
+            Number of messages to measure
+        """
+        if not self._messages:
+            return 0
+
+        measured = list(islice(reversed(self._messages.values()), sample))
+        average = sum(approximate_size(message) for message in measured) / len(measured)
+
+        return int(average * len(self._messages))
@@ -0,0 +1,252 @@
+# Size and expiry policies for cache sections
+from __future__ import annotations
+
+import time
+from collections import Counter, OrderedDict
+from collections.abc import MutableMapping
+from typing import Any, Dict, Hashable, Iterator, List, Literal, Optional
+
+import pydantic
+
+SectionEviction = Literal["lru", "lfu", "fifo"]
+
+
+class CachePolicy(pydantic.BaseModel):
+    """Limits applied to a section of a cache
+
+    .. rubric:: Expiring users an hour after they were last updated
+
+    .. code-block:: py
+
+        from acord import CachePolicy, DefaultCache
+
+        cache = DefaultCache(
+            policies={"users": CachePolicy(max_items=50000, ttl=3600, eviction="lfu")}
+        )
+    """
+
+    max_items: Optional[pydantic.conint(gt=0)] = None
+    """ Maximum number of items kept in the section, ``None`` for no limit """
+    ttl: Optional[pydantic.confloat(gt=0)] = None
+    """ Seconds an item is kept after it was last added or updated, ``None`` for no expiry """
+    eviction: SectionEviction = "lru"
+    """ Which item is evicted once the section is full,
+    the least recently used, the least frequently used or the oldest """
+
+
+class TTLTracker(object):
+    # Expiry times of keys, in the order they expire.
+    # As every key lives for the same ttl, this is the order they were last written.
+    __slots__ = ("ttl", "expires")
+
+    def __init__(self, ttl: float) -> None:
+        self.ttl = ttl
+        self.expires: OrderedDict[Hashable, float] = OrderedDict()
+
+    def touch(self, key: Hashable) -> None:
+        self.expires[key] = time.monotonic() + self.ttl
+        self.expires.move_to_end(key)
+
+    def discard(self, key: Hashable) -> None:
+        self.expires.pop(key, None)
+
+    def expired(self, key: Hashable, now: float = None) -> bool:
+        expires_at = self.expires.get(key)
+
+        if expires_at is None:
+            return False
+        return expires_at <= (time.monotonic() if now is None else now)
+
+    def due(self, limit: Optional[int] = None) -> List[Hashable]:
+        """Gets up to ``limit`` keys which have expired"""
+        now = time.monotonic()
+        keys = []
+
+        for key, expires_at in self.expires.items():
+            if expires_at > now or (limit is not None and len(keys) >= limit):
+                break
+            keys.append(key)
+
+        return keys
+
+    def clear(self) -> None:
+        self.expires.clear()
+
+
+class PolicyStore(MutableMapping):
+    """A cache section which enforces a :class:`CachePolicy`
+
+    Items are evicted once ``max_items`` are stored,
+    expired items are removed when accessed or by :meth:`PolicyStore.sweep`.
+
+    Parameters
+    ----------
+    policy: :class:`CachePolicy`
+        Policy to enforce
+
+    Attributes
+    ----------
+    evictions: :class:`~collections.Counter`
+        Number of items removed, under ``max_items`` and ``ttl``
+    """
+
+    def __init__(self, policy: CachePolicy) -> None:
+        self.policy = policy
+        self.evictions: Counter = Counter()
+
+        self._data: Dict[Hashable, Any] = dict()
+        # Eviction order for lru and fifo
+        self._order: OrderedDict[Hashable, None] = OrderedDict()
+        # Use counts for lfu, keys with the same count are kept in the order they were used
+        self._counts: Dict[Hashable, int] = dict()
+        self._frequencies: Dict[int, OrderedDict[Hashable, None]] = dict()
+        self._min_count = 0
+
+        self._ttl = TTLTracker(policy.ttl) if policy.ttl is not None else None
+
+    def __repr__(self) -> str:
+        return f"PolicyStore(size={len(self)}, policy={self.policy!r})"
+
+    def __len__(self) -> int:
+        # Includes expired items which have not been swept yet
+        return len(self._data)
+
+    def __iter__(self) -> Iterator[Hashable]:
+        return iter(list(self._data))
+
+    def __contains__(self, key: Any) -> bool:
+        if key not in self._data:
+            return False
+
+        if self._ttl is not None and self._ttl.expired(key):
+            self._evict(key, "ttl")
+            return False
+        return True
+
+    def __getitem__(self, key: Hashable) -> Any:
+        value = self._data[key]
+
+        if self._ttl is not None and self._ttl.expired(key):
+            self._evict(key, "ttl")
+            raise KeyError(key)
+
+        self._use(key)
+        return value
+
+    def __setitem__(self, key: Hashable, value: Any) -> None:
+        if key in self._data:
+            self._data[key] = value
+            self._use(key)
+        else:
+            max_items = self.policy.max_items
+
+            if max_items is not None and len(self._data) >= max_items:
+                self._evict(self._victim(), "max_items")
+
+            self._data[key] = value
+
+            if self.policy.eviction == "lfu":
+                self._counts[key] = 1
+                self._frequencies.setdefault(1, OrderedDict())[key] = None
+                self._min_count = 1
+            else:
+                self._order[key] = None
+
+        if self._ttl is not None:
+            self._ttl.touch(key)
+
+    def __delitem__(self, key: Hashable) -> None:
+        if key not in self._data:
+            raise KeyError(key)
+
+        self._remove(key)
+
+    def _use(self, key: Hashable) -> None:
+        eviction = self.policy.eviction
+
+        if eviction == "lru":
+            self._order.move_to_end(key)
+        elif eviction == "lfu":
+            count = self._counts[key]
+            self._unlink_count(key, count)
+
+            self._counts[key] = count + 1
+            self._frequencies.setdefault(count + 1, OrderedDict())[key] = None
+
+            if self._min_count == count and count not in self._frequencies:
+                self._min_count = count + 1
+
+    def _unlink_count(self, key: Hashable, count: int) -> None:
+        keys = self._frequencies[count]
+        del keys[key]
+
+        if not keys:
+            del self._frequencies[count]
+
+    def _victim(self) -> Hashable:
+        if self.policy.eviction == "lfu":
+            return next(iter(self._frequencies[self._min_count]))
+        return next(iter(self._order))
+
+    def _remove(self, key: Hashable) -> Any:
+        value = self._data.pop(key)
+
+        if self.policy.eviction == "lfu":
+            count = self._counts.pop(key)
+            self._unlink_count(key, count)
+
+            if count == self._min_count and count not in self._frequencies:
+                self._min_count = min(self._frequencies, default=0)
+        else:
+            del self._order[key]
+
+        if self._ttl is not None:
+            self._ttl.discard(key)
+
+        return value
+
+    def _evict(self, key: Hashable, reason: str) -> None:
+        self._remove(key)
+        self.evictions[reason] += 1
+
+    def _alive(self) -> Iterator[Hashable]:
+        if self._ttl is None:
+            return iter(list(self._data))
+
+        now = time.monotonic()
+        return (key for key in list(self._data) if not self._ttl.expired(key, now))
+
+    def values(self):
+        # Iterating shouldnt count as using every item
+        return [self._data[key] for key in self._alive()]
+
+    def items(self):
+        return [(key, self._data[key]) for key in self._alive()]
+
+    def clear(self) -> None:
+        self._data.clear()
+        self._order.clear()
+        self._counts.clear()
+        self._frequencies.clear()
+        self._min_count = 0
+
+        if self._ttl is not None:
+            self._ttl.clear()
+
+    def sweep(self, limit: Optional[int] = None) -> int:
+        """Removes expired items, returns the number removed
+
+        Parameters
+        ----------
+        limit: :class:`int`
+            Maximum number of items to remove
+        """
+        if self._ttl is None:
+            return 0
+
+        keys = self._ttl.due(limit)
+
+        for key in keys:
+            self._evict(key, "ttl")
+
+        return len(keys)
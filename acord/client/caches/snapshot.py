@@ -0,0 +1,165 @@
+# Streaming snapshots of cache sections
+from __future__ import annotations
+
+import datetime
+import gzip
+import os
+import pickle
+import struct
+import time
+from typing import Any, BinaryIO, Iterable, Iterator, NamedTuple, Optional, Tuple
+
+from acord.core.http import HTTPClient
+from acord.models.raw import Materializer
+
+MAGIC = b"ACSNAP"
+VERSION = 1
+
+# Magic, format version, unix time the snapshot was taken
+_HEADER = struct.Struct(">6sBd")
+
+# Sections written to snapshots, roles are stored in their guilds.
+# Guilds come last so the users and channels they reference are already written.
+SNAPSHOT_SECTIONS = ("users", "channels", "guilds")
+
+Record = Tuple[str, Any, Any]
+
+
+class SnapshotInfo(NamedTuple):
+    """Details of a snapshot a cache was restored from"""
+
+    path: str
+    """ Path of the snapshot """
+    created_at: datetime.datetime
+    """ When the snapshot was taken """
+    records: int
+    """ Number of items restored """
+
+    @property
+    def age(self) -> float:
+        """Seconds since the snapshot was taken"""
+        return time.time() - self.created_at.timestamp()
+
+
+class _SnapshotPickler(pickle.Pickler):
+    # Connections and materializers belong to the running client,
+    # they are swapped for the ones of the client restoring the snapshot.
+    def persistent_id(self, obj: Any) -> Optional[str]:
+        if isinstance(obj, HTTPClient):
+            return "conn"
+        if isinstance(obj, Materializer):
+            return "materializer"
+        return None
+
+
+class _SnapshotUnpickler(pickle.Unpickler):
+    def __init__(
+        self, file: BinaryIO, conn: Any, materializer: Optional[Materializer]
+    ) -> None:
+        super().__init__(file)
+        self.conn = conn
+        self.materializer = materializer
+
+    def persistent_load(self, pid: str) -> Any:
+        if pid == "conn":
+            return self.conn
+        if pid == "materializer":
+            if self.materializer is None:
+                # Payloads restored into a cache which stores models
+                self.materializer = Materializer()
+            return self.materializer
+
+        raise pickle.UnpicklingError(f"Unknown persistent id {pid!r}")
+
+
+def write_snapshot(path: str, records: Iterable[Record]) -> int:
+    """Writes records to a snapshot, returns the number written.
+
+    Records are pickled one at a time into a gzip stream,
+    so the snapshot is never held in memory as a whole.
+    The file is replaced atomically so a crash never leaves it half written.
+    """
+    tmp = f"{path}.tmp"
+    written = 0
+
+    with open(tmp, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, VERSION, time.time()))
+
+        with gzip.GzipFile(fileobj=f, mode="wb", compresslevel=6) as stream:
+            # A single pickler keeps objects shared between records shared
+            pickler = _SnapshotPickler(stream, pickle.HIGHEST_PROTOCOL)
+
+            for record in records:
+                pickler.dump(record)
+                written += 1
+
+            pickler.dump(None)
+
+    os.replace(tmp, path)
+    return written
+
+
+class SnapshotReader(object):
+    """Reads the records of a snapshot, one at a time
+
+    .. warning::
+        Snapshots are pickles, only restore snapshots written by your own client.
+
+    Parameters
+    ----------
+    path: :class:`str`
+        Path of the snapshot
+    conn: Any
+        Connection given to restored models
+    materializer: :class:`Materializer`
+        Materializer given to restored member mappings
+    """
+
+    __slots__ = ("path", "conn", "materializer", "created_at", "_file", "_stream")
+
+    def __init__(
+        self, path: str, conn: Any, materializer: Optional[Materializer] = None
+    ) -> None:
+        self.path = path
+        self.conn = conn
+        self.materializer = materializer
+        self.created_at: Optional[datetime.datetime] = None
+
+        self._file = None
+        self._stream = None
+
+    def __enter__(self) -> SnapshotReader:
+        self._file = open(self.path, "rb")
+
+        try:
+            magic, version, created_at = _HEADER.unpack(
+                self._file.read(_HEADER.size)
+            )
+        except struct.error:
+            self._file.close()
+            raise ValueError(f"{self.path} is not a cache snapshot")
+
+        if magic != MAGIC or version != VERSION:
+            self._file.close()
+            raise ValueError(f"{self.path} is not a version {VERSION} cache snapshot")
+
+        self.created_at = datetime.datetime.fromtimestamp(
+            created_at, datetime.timezone.utc
+        )
+        self._stream = gzip.GzipFile(fileobj=self._file, mode="rb")
+
+        return self
+
+    def __exit__(self, *args) -> None:
+        self._stream.close()
+        self._file.close()
+
+    def __iter__(self) -> Iterator[Record]:
+        unpickler = _SnapshotUnpickler(self._stream, self.conn, self.materializer)
+
+        while True:
+            record = unpickler.load()
+
+            if record is None:
+                return
+            yield record
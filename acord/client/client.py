@@ -12,6 +12,7 @@
 
 import asyncio
 import logging
+import os
 import sys
 import traceback
 
@@ -19,6 +20,7 @@
 
 from acord.core.abc import Route, API_VERSION
 from acord.core.http import HTTPClient
+from acord.core.response_cache import GATEWAY_INVALIDATIONS
 from acord.errors import *
 from acord.payloads import (
     StageInstanceCreatePayload,
@@ -29,6 +31,11 @@
 from acord.utils import _d_to_channel
 
 from .shard import Shard
+from .handler import INTERNAL_EVENTS, EVENT_DISPATCHES
+from .parsers import DEFAULT_PARSERS, EventParsers
+from .queue import EventQueueStats
+from .startup import IdentifyScheduler
+from .sessions import SessionStore
 from .caches.cache import Cache
 from .caches.default import DefaultCache
 from .ratelimiter import GatewayRatelimiter, DefaultGatewayRatelimiter
@@ -52,7 +59,12 @@ class Client(object):
         Presence to be sent in the identity packet
     encoding: :class:`str`
         Any of ``ETF`` and ``JSON`` are allowed to be chosen, controls data recieved by discord,
-        defaults to ``False``.
+        defaults to ``JSON``.
+
+        .. note::
+            ETF uses `erlpack <https://github.com/discord/erlpack>`_ if it is installed,
+            else a pure python implementation is used,
+            which decodes much slower than JSON.
     compress: :class:`bool`
         Whether to read compressed stream when receiving requests, defaults to ``False``
     dispatch_on_recv: :class:`bool`
@@ -65,6 +77,31 @@ class Client(object):
         Gateway ratelimiter for client to use
 
         .. versionadded:: 0.2.3a0
+    lazy_decoding: :class:`bool`
+        Whether to skip decoding dispatch events which nothing consumes,
+        see :meth:`Client.should_parse_event`. Defaults to ``False``.
+
+        .. note::
+            Only JSON payloads can be skipped,
+            ETF payloads are always decoded.
+    event_workers: :class:`int`
+        Number of workers each shard uses to parse events, defaults to ``1``.
+        Events for the same guild are always parsed in order.
+    event_queue_size: :class:`int`
+        Maximum number of events each worker can have queued before the shard stops reading,
+        defaults to ``1000``. ``0`` means no limit.
+    num_shards: :class:`int`
+        Total number of shards, defaults to the number recommended by discord
+    shard_ids: List[:class:`int`]
+        Shards this client should run, defaults to every shard.
+        Used when shards are split between processes, see :class:`ShardCluster`.
+    session_store: :class:`SessionStore`
+        Store used to persist sessions, so shards can resume after the client restarts.
+        Sessions are not persisted by default.
+    cache_snapshot: :class:`str`
+        Path the cache is snapshotted to when the client disconnects,
+        and restored from before it connects, see :meth:`Cache.snapshot`.
+        Combined with a ``session_store``, resumed shards start with a warm cache.
 
     Attributes
     ----------
@@ -128,6 +165,27 @@ class Client(object):
         List of guilds client has access to
     rest: :class:`RestApi`
         An instance of the Rest API object
+    lazy_decoding: :class:`bool`
+        Whether events with no consumers are skipped before being decoded
+    internal_events: Set[:class:`str`]
+        Gateway events which are always decoded when using lazy decoding,
+        as they are used to update the cache or to dispatch application commands.
+        Events can be removed if you dont need them to be cached.
+    parsers: :class:`EventParsers`
+        Mapping of gateway events to the parsers used to handle them,
+        parsers can be added or overridden for individual events.
+    identify_scheduler: :class:`IdentifyScheduler`
+        Controls when shards identify,
+        its ``max_concurrency`` is set when the client is ran.
+    shard_ids: Optional[List[:class:`int`]]
+        Shards this client runs, ``None`` if it runs every shard
+    ipc: Optional[:class:`IPCClient`]
+        Connection to other clusters,
+        only available when ran by a :class:`ShardCluster`
+    session_store: Optional[:class:`SessionStore`]
+        Store sessions are persisted to
+    cache_snapshot: Optional[:class:`str`]
+        Path the cache is snapshotted to
     """
 
     cache: Cache
@@ -145,6 +203,13 @@ def __init__(
         compress: Optional[bool] = False,
         cache: Cache = DefaultCache(),
         gateway_ratelimiter: GatewayRatelimiter = DefaultGatewayRatelimiter(),
+        lazy_decoding: bool = False,
+        event_workers: int = 1,
+        event_queue_size: int = 1000,
+        num_shards: Optional[int] = None,
+        shard_ids: Optional[List[int]] = None,
+        session_store: Optional[SessionStore] = None,
+        cache_snapshot: Optional[str] = None,
     ) -> None:
 
         self.loop = loop
@@ -158,6 +223,11 @@ def __init__(
         # Gateway connection stuff
         self.encoding = encoding
         self.compress = compress
+        self.lazy_decoding = lazy_decoding
+        self.internal_events = set(INTERNAL_EVENTS)
+        self.parsers: EventParsers = DEFAULT_PARSERS.copy()
+        self.event_workers = event_workers
+        self.event_queue_size = event_queue_size
 
         # Others
         self.session_id = None
@@ -179,7 +249,15 @@ def __init__(
 
         self.shards = dict()
         self.max_concurrency = 0
-        self.num_shards = None
+        self.num_shards = num_shards
+        self.shard_ids = shard_ids
+        self.identify_scheduler = IdentifyScheduler()
+        self.ipc = None
+
+        self.session_store = session_store
+        self._session_saver = None
+        self._cache_sweeper = None
+        self.cache_snapshot = cache_snapshot
 
     def on(self, name: str, *, once: bool = False) -> Optional[_C]:
         """Register an event to be dispatched on call.
@@ -288,6 +366,38 @@ def dispatch(self, event_name: str, *args, **kwargs) -> None:
 
         logger.info("Dispatched event: {}".format(event_name))
 
+    def should_parse_event(self, event: str) -> bool:
+        """Whether a gateway event should be decoded,
+        only used when :attr:`Client.lazy_decoding` is enabled.
+
+        Events are decoded if they are in :attr:`Client.internal_events`,
+        have a custom parser in :attr:`Client.parsers`,
+        invalidate the response cache of :attr:`Client.http`,
+        or if a listener or ``on_*`` method exists for them.
+
+        Parameters
+        ----------
+        event: :class:`str`
+            Name of the gateway event, e.g. ``MESSAGE_REACTION_ADD``
+        """
+        if event in self.internal_events:
+            return True
+
+        if self.parsers.get(event) is not DEFAULT_PARSERS.get(event):
+            return True
+
+        if (
+            event in GATEWAY_INVALIDATIONS
+            and getattr(self.http, "response_cache", None) is not None
+        ):
+            return True
+
+        for name in EVENT_DISPATCHES.get(event, ()):
+            if name in self._events or hasattr(self, "on_" + name):
+                return True
+
+        return False
+
     def wait_for(
         self, event: str, *, check: Callable[..., bool] = None, timeout: int = None
     ) -> _C:
@@ -531,38 +641,104 @@ async def shard_handler(self, *ready_scripts) -> None:
 
         if self.compress:
             GATEWAY_WEBHOOK_URL += "&compress=zlib-stream"
-        GATEWAY_WEBHOOK_URL += f"&encoding={self.encoding}"
+        GATEWAY_WEBHOOK_URL += f"&encoding={self.encoding.lower()}"
 
         if not self.num_shards:
             self.num_shards = gateway["shards"]
 
         self.max_concurrency = gateway["session_start_limit"]["max_concurrency"]
+        self.identify_scheduler.max_concurrency = self.max_concurrency
+
         TASK_LIST = []
+        launched = 0
+        started_at = self.loop.time()
 
-        c = 0
+        shard_ids = self.shard_ids
+        if shard_ids is None:
+            shard_ids = range(self.num_shards)
 
-        for i in range(self.num_shards):
-            # shard_id = i
-            shard = Shard(
+        for i in shard_ids:
+            self.shards[i] = Shard(
                 url=GATEWAY_WEBHOOK_URL,
                 shard_id=i,
                 num_shards=self.num_shards,
                 client=self,
             )
 
-            await shard.connect()
-            await shard.receive_hello()
-            await shard.send_identity(self.token, self.intents, self.presence)
+        def launch(shard):
+            nonlocal launched
+
+            TASK_LIST.append(shard.listen(shard=shard))
+
+            launched += 1
+            logger.info(
+                f"Launched shard {shard.shard_id}, {launched}/{len(self.shards)} shards running"
+            )
+            self.dispatch("shard_launch", shard, launched, len(self.shards))
+
+        async def resume_shard(shard):
+            session = self.session_store.get(shard.shard_id, self.num_shards)
+
+            if session is None:
+                return False
+
+            shard.restore_session(session)
+
+            try:
+                await shard.connect(shard.resume_gateway_url)
+                await shard.receive_hello()
+                await shard.resume()
+            except Exception as exc:
+                logger.warning(
+                    f"Failed to resume shard {shard.shard_id}, identifying instead",
+                    exc_info=exc,
+                )
+
+                if shard.ws is not None:
+                    await shard.disconnect()
+                shard.session_id = shard.resume_url = shard.sequence = None
+
+                return False
+
+            # If discord rejects the session the handler identifies instead
+            launch(shard)
+            return True
+
+        async def launch_bucket(shard_ids):
+            # Shards in a bucket identify one after another,
+            # buckets themselves are launched in parallel.
+            for shard_id in shard_ids:
+                shard = self.shards[shard_id]
+
+                await shard.connect()
+                await shard.receive_hello()
+                await shard.send_identity(self.token, self.intents, self.presence)
 
-            task = shard.listen(shard=shard)
-            TASK_LIST.append(task)
+                launch(shard)
 
-            self.shards.update({i: shard})
-            c += 1
+        to_identify = list(self.shards)
 
-            if c == self.max_concurrency:
-                await asyncio.sleep(5)
-                c = 0
+        if self.session_store is not None:
+            # Resuming isnt limited by max_concurrency
+            shards = list(self.shards.values())
+            resumed = await asyncio.gather(*(resume_shard(shard) for shard in shards))
+
+            to_identify = [
+                shard.shard_id for shard, ok in zip(shards, resumed) if not ok
+            ]
+            self._session_saver = self.loop.create_task(self._save_sessions_task())
+
+        if self.cache.sweep_interval is not None and self._cache_sweeper is None:
+            self._cache_sweeper = self.loop.create_task(self._sweep_cache_task())
+
+        await asyncio.gather(
+            *(
+                launch_bucket(bucket)
+                for bucket in self.identify_scheduler.buckets(to_identify)
+            )
+        )
+
+        self.dispatch("shards_launched", self.loop.time() - started_at)
 
         for script in ready_scripts:
             await script
@@ -618,6 +794,8 @@ def run(
 
         self.http.client = self
 
+        self.restore_cache()
+
         # Login to create session
         # Also validates token
         try:
@@ -663,6 +841,79 @@ def run(
             )
         )
 
+    def save_sessions(self) -> None:
+        """Saves the session of every shard to :attr:`Client.session_store`.
+
+        Every session is written, even if unchanged,
+        so sessions of idle shards are not considered expired.
+        Sessions are written as a single batch with :meth:`SessionStore.save_many`.
+        """
+        store = self.session_store
+
+        if store is None:
+            return
+
+        sessions = [shard.session_data() for shard in self.shards.values()]
+        sessions = [session for session in sessions if session is not None]
+
+        if sessions:
+            store.save_many(sessions)
+
+    def restore_cache(self) -> None:
+        """Restores the cache from :attr:`Client.cache_snapshot`, if it exists.
+        A snapshot which cannot be read is logged and ignored.
+        """
+        path = self.cache_snapshot
+
+        if path is None or not os.path.exists(path):
+            return
+
+        try:
+            snapshot = self.cache.restore(path, self.http)
+        except Exception as exc:
+            logger.warning(f"Failed to restore cache from {path}", exc_info=exc)
+            return
+
+        logger.info(
+            f"Restored {snapshot.records} cached items from {path}, "
+            f"snapshot taken {snapshot.age:.0f}s ago"
+        )
+
+    def snapshot_cache(self) -> None:
+        """Writes the cache to :attr:`Client.cache_snapshot`, if set"""
+        path = self.cache_snapshot
+
+        if path is None:
+            return
+
+        try:
+            written = self.cache.snapshot(path)
+        except Exception as exc:
+            logger.warning(f"Failed to snapshot cache to {path}", exc_info=exc)
+        else:
+            logger.info(f"Wrote {written} cached items to {path}")
+
+    async def _save_sessions_task(self):
+        while True:
+            await asyncio.sleep(self.session_store.save_interval)
+
+            try:
+                self.save_sessions()
+            except Exception:
+                self.on_error("session store")
+
+    async def _sweep_cache_task(self):
+        while True:
+            await asyncio.sleep(self.cache.sweep_interval)
+
+            try:
+                removed = await self.cache.sweep_expired()
+            except Exception:
+                self.on_error("cache sweep")
+            else:
+                if removed:
+                    logger.debug(f"Removed {removed} expired items from cache")
+
     async def disconnect(self):
         """|coro|
 
@@ -675,7 +926,20 @@ async def disconnect(self):
         logger.info("Disconnected from API, closing any open connections")
         await self.http.disconnect()
 
-        for shard in self.shards:
+        if self.session_store is not None:
+            if self._session_saver is not None:
+                self._session_saver.cancel()
+
+            # Shards close with 4000, so the sessions can be resumed after a restart
+            self.save_sessions()
+
+        if self._cache_sweeper is not None:
+            self._cache_sweeper.cancel()
+            self._cache_sweeper = None
+
+        self.snapshot_cache()
+
+        for shard in self.shards.values():
             await shard.disconnect()
 
         for _, vc in self.voice_connections.items():
@@ -745,6 +1009,13 @@ async def fetch_glob_app_command(self, command_id: Snowflake) -> ApplicationComm
         """
         return await self.rest.fetch_glob_app_command(command_id)
 
+    @property
+    def event_queue_stats(self) -> Dict[int, EventQueueStats]:
+        """Mapping of shard IDs to the backpressure metrics of their event queue"""
+        return {
+            shard_id: shard.event_queue.stats for shard_id, shard in self.shards.items()
+        }
+
     @property
     def application_commands(self) -> dict:
         if not self.rest:
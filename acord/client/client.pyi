@@ -7,6 +7,7 @@ from typing import (
     List,
     Literal,
     Optional,
+    Set,
     Tuple,
     Union,
     overload,
@@ -27,6 +28,11 @@ from acord import (
     Channel,
     Shard,
 )
+from acord.client.parsers import EventParsers
+from acord.client.queue import EventQueueStats
+from acord.client.startup import IdentifyScheduler
+from acord.core.ipc import IPCClient
+from acord.client.sessions import SessionStore
 
 class Client(object):
     INTERNAL_STORAGE: Dict[str, Any]
@@ -34,6 +40,18 @@ class Client(object):
     token: Optional[str]
     encoding: Literal["JSON", "ETF"]
     compress: Optional[bool]
+    lazy_decoding: bool
+    internal_events: Set[str]
+    parsers: EventParsers
+    event_workers: int
+    event_queue_size: int
+    event_queue_stats: Dict[int, EventQueueStats]
+    identify_scheduler: IdentifyScheduler
+    num_shards: Optional[int]
+    shard_ids: Optional[List[int]]
+    ipc: Optional[IPCClient]
+    session_store: Optional[SessionStore]
+    cache_snapshot: Optional[str]
     _events: Dict[str, _C]
     session_id: Optional[str]
     gateway_version: Optional[Union[str, int]]
@@ -64,6 +82,7 @@ class Client(object):
     def dispatch(self, event_name: str, *args, **kwargs) -> None: ...
     @overload
     async def resume(self) -> None: ...
+    def should_parse_event(self, event: str) -> bool: ...
     @overload
     def wait_for(self, event: str) -> _C: ...
     @overload
@@ -0,0 +1,272 @@
+# Runs shards across multiple processes
+from __future__ import annotations
+
+import asyncio
+import logging
+import multiprocessing
+from typing import Any, Callable, Dict, List, Optional
+
+from pydantic import BaseModel
+
+from acord.core.ipc import IPCClient, IPCServer
+
+from .startup import IdentifyScheduler
+
+logger = logging.getLogger(__name__)
+
+
+class RemoteIdentifyScheduler(IdentifyScheduler):
+    """An :class:`IdentifyScheduler` which waits for the :class:`IPCServer`,
+    so identifies are spaced out between every cluster.
+
+    Parameters
+    ----------
+    ipc: :class:`IPCClient`
+        Connection to the server
+    """
+
+    def __init__(self, ipc: IPCClient, max_concurrency: int = 1) -> None:
+        super().__init__(max_concurrency)
+
+        self.ipc = ipc
+
+    def identify(self, shard_id: int) -> _RemoteIdentifyContext:
+        return _RemoteIdentifyContext(self, shard_id)
+
+
+class _RemoteIdentifyContext(object):
+    __slots__ = ("scheduler", "shard_id")
+
+    def __init__(self, scheduler: RemoteIdentifyScheduler, shard_id: int) -> None:
+        self.scheduler = scheduler
+        self.shard_id = shard_id
+
+    async def __aenter__(self) -> None:
+        await self.scheduler.ipc.identify(
+            self.shard_id, self.scheduler.max_concurrency
+        )
+
+    async def __aexit__(self, *_) -> None:
+        pass
+
+
+def _to_json(obj: Any) -> Any:
+    # Models hold a reference to the http client, which cant be sent
+    if isinstance(obj, BaseModel):
+        return {key: _to_json(value) for key, value in obj if key != "conn"}
+    if isinstance(obj, dict):
+        return {key: _to_json(value) for key, value in obj.items()}
+    if isinstance(obj, (list, tuple, set)):
+        return [_to_json(value) for value in obj]
+    return obj
+
+
+def setup_cluster(client, ipc: IPCClient) -> None:
+    """Attaches a client to a cluster,
+    registering the default IPC handlers.
+
+    ``guild_count``
+        Number of guilds cached by the cluster
+    ``get_guild``
+        A cached guild as a dict, or ``None``.
+        Takes the ID of the guild.
+
+    Parameters
+    ----------
+    client: :class:`Client`
+        Client running the shards of this cluster
+    ipc: :class:`IPCClient`
+        Connection to the server
+    """
+    client.ipc = ipc
+    client.shard_ids = ipc.shard_ids
+    client.identify_scheduler = RemoteIdentifyScheduler(ipc)
+
+    @ipc.handler("guild_count")
+    async def guild_count(_):
+        return sum(1 for _ in client.cache.guilds())
+
+    @ipc.handler("get_guild")
+    async def get_guild(guild_id):
+        guild = client.get_guild(int(guild_id))
+
+        if guild is None:
+            return None
+        return _to_json(guild)
+
+
+def _run_cluster(
+    factory: Callable[[], Any],
+    cluster_id: int,
+    shard_ids: List[int],
+    num_shards: int,
+    token: str,
+    host: str,
+    port: int,
+    run_kwds: Dict[str, Any],
+) -> None:
+    client = factory()
+    client.num_shards = num_shards
+
+    ipc = IPCClient(cluster_id, shard_ids, host=host, port=port)
+    setup_cluster(client, ipc)
+
+    client.loop.run_until_complete(ipc.connect())
+
+    logger.info(f"Cluster {cluster_id} starting shards {shard_ids}")
+
+    try:
+        client.run(token, **run_kwds)
+    finally:
+        client.loop.run_until_complete(ipc.close())
+
+
+class ShardCluster(object):
+    """Splits shards between multiple processes,
+    each process runs its own :class:`Client` with a subset of the shards.
+
+    Identifies are coordinated by the launching process,
+    which also routes requests between clusters, see :class:`IPCClient`.
+
+    .. note::
+        ``factory`` is called in the new process,
+        so it must be importable, i.e. a function defined at module level.
+
+    .. rubric:: Running a cluster
+
+    .. code-block:: py
+
+        def create_client():
+            client = Client(intents=Intents.ALL)
+
+            @client.on("message_create")
+            async def on_message(message):
+                counts = await client.ipc.broadcast("guild_count")
+                ...
+
+            return client
+
+        if __name__ == "__main__":
+            cluster = ShardCluster(create_client, num_shards=64, clusters=4)
+            cluster.run("token")
+
+    Parameters
+    ----------
+    factory: Callable[[], :class:`Client`]
+        Creates the client for a cluster
+    num_shards: :class:`int`
+        Total number of shards
+    clusters: :class:`int`
+        Number of processes to split the shards between,
+        defaults to the number of CPUs.
+    host: :class:`str`
+        Host the IPC server listens on
+    port: :class:`int`
+        Port the IPC server listens on, ``0`` picks a free port
+
+    Attributes
+    ----------
+    server: :class:`IPCServer`
+        Server clusters connect to
+    processes: Dict[:class:`int`, :class:`~multiprocessing.Process`]
+        Process running each cluster
+    """
+
+    def __init__(
+        self,
+        factory: Callable[[], Any],
+        *,
+        num_shards: int,
+        clusters: Optional[int] = None,
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ) -> None:
+        clusters = clusters or multiprocessing.cpu_count()
+
+        if num_shards < 1:
+            raise ValueError("At least 1 shard is required")
+
+        self.factory = factory
+        self.num_shards = num_shards
+        self.clusters = min(clusters, num_shards)
+
+        self.server = IPCServer(num_shards, host=host, port=port)
+        self.processes: Dict[int, multiprocessing.Process] = dict()
+
+    def shard_ids(self, cluster_id: int) -> List[int]:
+        """Gets the shards ran by a cluster"""
+        per_cluster, extra = divmod(self.num_shards, self.clusters)
+
+        start = cluster_id * per_cluster + min(cluster_id, extra)
+        end = start + per_cluster + (cluster_id < extra)
+
+        return list(range(start, end))
+
+    async def start(self, token: str, **run_kwds) -> None:
+        """|coro|
+
+        Starts the IPC server and launches every cluster,
+        returns once all clusters have exited.
+
+        Parameters
+        ----------
+        token: :class:`str`
+            Bot token
+        **run_kwds:
+            Additional kwargs passed through :meth:`Client.run`
+        """
+        await self.server.start()
+
+        context = multiprocessing.get_context("spawn")
+        loop = asyncio.get_event_loop()
+
+        for cluster_id in range(self.clusters):
+            process = context.Process(
+                target=_run_cluster,
+                args=(
+                    self.factory,
+                    cluster_id,
+                    self.shard_ids(cluster_id),
+                    self.num_shards,
+                    token,
+                    self.server.host,
+                    self.server.port,
+                    run_kwds,
+                ),
+                name=f"Acord cluster {cluster_id}",
+                daemon=True,
+            )
+            process.start()
+
+            self.processes[cluster_id] = process
+
+        try:
+            await asyncio.gather(
+                *(
+                    loop.run_in_executor(None, process.join)
+                    for process in self.processes.values()
+                )
+            )
+        finally:
+            await self.server.close()
+
+    def run(self, token: str, **run_kwds) -> None:
+        """Runs every cluster, loop blocking.
+
+        Parameters
+        ----------
+        token: :class:`str`
+            Bot token
+        **run_kwds:
+            Additional kwargs passed through :meth:`Client.run`
+        """
+        loop = asyncio.new_event_loop()
+
+        try:
+            loop.run_until_complete(self.start(token, **run_kwds))
+        finally:
+            for process in self.processes.values():
+                if process.is_alive():
+                    process.terminate()
+
+            loop.close()
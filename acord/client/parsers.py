@@ -0,0 +1,796 @@
+# Parsers for gateway dispatch events
+from __future__ import annotations
+
+import asyncio
+import datetime
+import logging
+from typing import Any, Callable, Coroutine, Dict, Optional, Union
+
+from acord.core.signals import gateway
+from acord.voice.core import VoiceConnection
+from acord.utils import _d_to_channel
+from acord.models import *
+from acord.bases import *
+
+logger = logging.getLogger(__name__)
+
+Parser = Callable[[Any, Dict[str, Any]], Union[Coroutine[Any, Any, Any], Any]]
+
+
+class EventParsers(dict):
+    """A mapping of gateway event names to parsers.
+
+    A parser takes the :class:`Shard` which received the event and the ``d`` field of the payload.
+    It is responsible for updating the cache and dispatching the event,
+    and may be either a function or a coroutine function.
+
+    .. rubric:: Adding or overriding a parser
+
+    .. code-block:: py
+
+        client = Client(..., )
+
+        @client.parsers.register("TYPING_START")
+        def parse_typing_start(shard, data):
+            shard.client.dispatch("typing_start", data)
+
+    .. note::
+        Each :class:`Client` has its own copy of the default parsers,
+        so overriding a parser will not affect other clients.
+    """
+
+    def register(self, event: str) -> Callable[[Parser], Parser]:
+        """Registers a parser for an event, overwriting any existing parser.
+
+        This is a decorator.
+
+        Parameters
+        ----------
+        event: :class:`str`
+            Name of the gateway event, e.g. ``MESSAGE_CREATE``
+        """
+
+        def inner(func: Parser) -> Parser:
+            self[event] = func
+            return func
+
+        return inner
+
+    def copy(self) -> EventParsers:
+        return EventParsers(self)
+
+
+DEFAULT_PARSERS = EventParsers()
+parser = DEFAULT_PARSERS.register
+
+
+@parser("READY")
+def parse_ready(shard, DATA):
+    client = shard.client
+    client.dispatch("ready")
+
+    shard.session_id = DATA["session_id"]
+    shard.resume_url = DATA.get("resume_gateway_url")
+    shard.gateway_version = DATA["v"]
+    client.user = User(conn=client.http, **DATA["user"])
+
+    shard.unavailable_guilds = {i["id"]: i["unavailable"] for i in DATA["guilds"]}
+    client.cache.add_user(client.user)
+
+    shard.ready_event.set()
+
+
+@parser("RESUMED")
+def parse_resumed(shard, DATA):
+    shard.resuming = False
+    shard.ready_event.set()
+
+    shard.client.dispatch("resume")
+
+
+# NOTE: Interactions
+
+
+@parser("INTERACTION_CREATE")
+async def parse_interaction_create(shard, DATA):
+    from acord.rest.rest import get_slash_options, get_command, exec_handler
+
+    client = shard.client
+    data = Interaction(conn=client.http, **DATA)
+
+    if data.type == InteractionType.APPLICATION_COMMAND_AUTOCOMPLETE:
+        udac = get_command(client, data.data.name, data.data.type)
+
+        if not udac:
+            return
+
+        # Command is a slash command so were good with __pre_calls__
+        handlers = udac.__pre_calls__.get("__autocompleters__")
+
+        if not handlers:
+            udac.auto_complete_handlers()
+            # Should be defined now
+            handlers = udac.__pre_calls__["__autocompleters__"]
+
+        d = []
+
+        for option in data.data.options:
+            if not option.focused:
+                continue
+            handler = handlers.get("*", handlers.get(option.name))
+
+            if not handler:
+                continue
+            result, dev_handled = await exec_handler(handler, data, option)
+
+            if dev_handled or not result:
+                continue
+
+            if isinstance(result, list):
+                d.extend(result)
+            else:
+                d.append(result)
+
+        await data.respond_to_autocomplete(d)
+
+    elif data.type == InteractionType.APPLICATION_COMMAND:
+        udac = get_command(client, data.data.name, data.data.type)
+
+        if not udac:
+            return
+
+        args, kwds = (), {}
+        if data.data.type == ApplicationCommandType.CHAT_INPUT:
+            kwds = get_slash_options(data)
+        elif data.data.type == ApplicationCommandType.MESSAGE:
+            message = client.get_message(data.channel_id, data.data.target_id)
+            if not message:
+                message = data.data.target_id
+            args = (message,)
+        else:
+            user = client.get_user(data.data.target_id)
+            if not user:
+                user = data.data.target_id
+            args = (user,)
+
+        fut = client.loop.create_future()
+        client.loop.create_task(
+            udac.dispatcher(data, fut, *args, **kwds),
+            name=f"app_cmd dispatcher : {udac.name}",
+        )
+
+        possible_exc = await asyncio.wait_for(fut, None)
+        if isinstance(possible_exc, Exception):
+            client.on_error(
+                f"app_cmd dispatcher : {udac.name}",
+                err=(
+                    type(possible_exc),
+                    possible_exc,
+                    possible_exc.__traceback__,
+                ),
+            )
+
+    client.dispatch("interaction_create", data)
+
+
+@parser("INTERACTION_UPDATE")
+def parse_interaction_update(shard, DATA):
+    client = shard.client
+    data = Interaction(conn=client.http, **DATA)
+
+    client.dispatch("interaction_update", data)
+
+
+@parser("INTERACTION_DELETE")
+def parse_interaction_delete(shard, DATA):
+    try:
+        id, guild_id, application_id = DATA.values()
+    except ValueError:
+        id, guild_id, application_id = DATA.values(), None
+
+    shard.client.dispatch("interaction_delete", id, guild_id, application_id)
+
+
+# NOTE: Messages
+
+
+@parser("MESSAGE_CREATE")
+def parse_message_create(shard, DATA):
+    client = shard.client
+    message = Message(conn=client.http, **DATA)
+
+    try:
+        if hasattr(message.channel, "last_message_id"):
+            message.channel.last_message_id = message.id
+    except ValueError:
+        pass
+
+    client.cache.add_message_payload(message, DATA)
+
+    client.dispatch("message_create", message)
+
+
+@parser("MESSAGE_UPDATE")
+def parse_message_update(shard, DATA):
+    client = shard.client
+    pre_existing: Message = client.get_message(
+        int(DATA["channel_id"]), int(DATA["id"])
+    )
+    if not pre_existing:
+        client.dispatch("partial_message_update", DATA)
+        return
+
+    stored = None
+
+    if client.cache.materializer is not None:
+        stored = client.cache["messages"].get(
+            (int(DATA["channel_id"]), int(DATA["id"]))
+        )
+
+    if isinstance(stored, RawPayload):
+        # Updates may be partial, so they are merged into the stored payload
+        data = {**stored.data, **DATA}
+        message = Message(conn=client.http, **data)
+        client.cache.add_message_payload(message, data)
+    else:
+        message = pre_existing.copy(update=DATA)
+        client.cache.add_message(message)
+
+    client.dispatch("message_update", message)
+
+
+@parser("MESSAGE_DELETE")
+def parse_message_delete(shard, DATA):
+    client = shard.client
+    message = client.cache.remove_message(
+        int(DATA["channel_id"]), int(DATA["id"]), None
+    )
+    if message:
+        client.dispatch("message_delete", message)
+    else:
+        client.dispatch(
+            "partial_message_delete",
+            Snowflake(DATA["channel_id"]),
+            Snowflake(DATA["id"]),
+            Snowflake(DATA["guild_id"]) if DATA["guild_id"] is not None else None,
+        )
+
+
+@parser("MESSAGE_DELETE_BULK")
+def parse_message_delete_bulk(shard, DATA):
+    client = shard.client
+    channel_id = int(DATA["channel_id"])
+
+    removed = client.cache.remove_messages(channel_id, map(int, DATA["ids"]))
+    messages = [
+        message or Snowflake(id) for message, id in zip(removed, DATA["ids"])
+    ]
+
+    client.dispatch(
+        "bulk_message_delete",
+        messages,
+        Snowflake(DATA["channel_id"]),
+        Snowflake(DATA["guild_id"]) if DATA["guild_id"] is not None else None,
+    )
+
+
+@parser("MESSAGE_REACTION_ADD")
+def parse_message_reaction_add(shard, DATA):
+    reaction = MessageReaction(**DATA)
+
+    shard.client.dispatch("message_reaction_create", reaction)
+
+
+@parser("MESSAGE_REACTION_REMOVE")
+def parse_message_reaction_remove(shard, DATA):
+    reaction = MessageReaction(**DATA)
+
+    shard.client.dispatch("message_reaction_remove", reaction)
+
+
+@parser("MESSAGE_REACTION_REMOVE_ALL")
+def parse_message_reaction_remove_all(shard, DATA):
+    shard.client.dispatch(
+        "message_reactions_clear",
+        Snowflake(DATA["channel_id"]),
+        Snowflake(DATA["message_id"]),
+        Snowflake(DATA["guild_id"]) if DATA.get("guild_id") is not None else None,
+    )
+
+
+@parser("MESSAGE_REACTION_REMOVE_EMOJI")
+def parse_message_reaction_remove_emoji(shard, DATA):
+    reaction = MessageReaction(**DATA)
+
+    shard.client.dispatch("message_reaction_emoji_clear", reaction)
+
+
+@parser("CHANNEL_PINS_UPDATE")
+def parse_channel_pins_update(shard, DATA):
+    client = shard.client
+    channel = client.get_channel(int(DATA["channel_id"]))
+    ts = datetime.datetime.fromisoformat(DATA["last_pin_timestamp"])
+
+    client.dispatch("message_pin", channel, ts)
+
+
+# NOTE: invites
+
+
+@parser("INVITE_CREATE")
+def parse_invite_create(shard, DATA):
+    client = shard.client
+    invite = Invite(conn=client.http, **DATA)
+    client.dispatch("invite_create", invite)
+
+
+@parser("INVITE_DELETE")
+def parse_invite_delete(shard, DATA):
+    client = shard.client
+    channel_id = DATA["channel_id"]
+    guild_id = DATA.get("guild_id", 0)
+    code = DATA["code"]
+
+    channel = client.get_channel(channel_id) or Snowflake(channel_id)
+    guild = client.get_guild(guild_id) or (
+        Snowflake(guild_id) if guild_id is not None else None
+    )
+
+    client.dispatch("invite_delete", channel, guild, code)
+
+
+# NOTE: Guilds
+
+
+@parser("GUILD_CREATE")
+def parse_guild_create(shard, DATA):
+    client = shard.client
+    guild = Guild(conn=client.http, **DATA)
+
+    if DATA["id"] in shard.unavailable_guilds:
+        shard.unavailable_guilds.pop(DATA["id"])
+        client.dispatch("guild_recv", guild)
+    else:
+        client.dispatch("guild_create", guild)
+
+    client.cache.add_guild(guild)
+
+
+@parser("GUILD_DELETE")
+def parse_guild_delete(shard, DATA):
+    client = shard.client
+
+    if DATA.get("unavailable", None) is not None:
+        guild = Guild(conn=client.http, **DATA)
+        shard.unavailable_guilds.pop(DATA["id"], None)
+        client.dispatch("guild_outage", guild)
+
+        client.cache.add_guild(guild)
+    else:
+        guild = client.cache.remove_guild(int(DATA["id"]), None)
+        client.dispatch("guild_remove", guild)
+
+
+@parser("GUILD_UPDATE")
+def parse_guild_update(shard, DATA):
+    client = shard.client
+    guild = Guild(conn=client.http, **DATA)
+
+    client.cache.add_guild(guild)
+    client.dispatch("guild_update", guild)
+
+
+@parser("GUILD_BAN_ADD")
+def parse_guild_ban_add(shard, DATA):
+    client = shard.client
+    guild = client.get_guild(int(DATA["guild_id"]))
+    user = User(conn=client.http, **DATA["user"])
+
+    guild.members.pop(user.id, None)
+
+    client.cache.add_user_payload(user, DATA["user"])
+    client.dispatch("guild_ban", guild, user)
+
+
+@parser("GUILD_BAN_REMOVE")
+def parse_guild_ban_remove(shard, DATA):
+    client = shard.client
+    guild = client.get_guild(int(DATA["guild_id"]))
+    user = User(conn=client.http, **DATA["user"])
+
+    client.cache.add_user_payload(user, DATA["user"])
+    client.dispatch("guild_ban_remove", guild, user)
+
+
+@parser("GUILD_EMOJIS_UPDATE")
+def parse_guild_emojis_update(shard, DATA):
+    client = shard.client
+    guild = client.get_guild(int(DATA["guild_id"]))
+    emojis = DATA["emojis"]
+    bulk = list()
+
+    for emoji in emojis:
+        e = Emoji(conn=client.http, guild_id=guild.id, **emoji)
+        guild.emojis.update({e.id: e})
+        bulk.append(e)
+
+        client.dispatch("guild_emoji_update", e)
+
+    client.dispatch("guild_emojis_update", bulk)
+
+
+@parser("GUILD_STICKERS_UPDATE")
+def parse_guild_stickers_update(shard, DATA):
+    client = shard.client
+    guild = client.get_guild(int(DATA["guild_id"]))
+    stickers = DATA["stickers"]
+    bulk = list()
+
+    for sticker in stickers:
+        s = Sticker(conn=client.http, guild_id=guild.id, **sticker)
+        guild.stickers.update({s.id: s})
+        bulk.append(s)
+
+        client.dispatch("guild_sticker_update", s)
+
+    client.dispatch("guild_stickers_update", bulk)
+
+
+@parser("GUILD_INTEGRATIONS_UPDATE")
+def parse_guild_integrations_update(shard, DATA):
+    client = shard.client
+    guild = client.get_guild(int(DATA["guild_id"]))
+    if guild is None:
+        guild = Snowflake(DATA["guild_id"])
+    client.dispatch("guild_integrations_update", guild)
+
+
+@parser("GUILD_MEMBER_ADD")
+def parse_guild_member_add(shard, DATA):
+    client = shard.client
+    member = Member(conn=client.http, **DATA)
+    guild = client.get_guild(member.guild_id)
+
+    if guild is None:
+        guild = Snowflake(DATA["guild_id"])
+    else:
+        guild._cache_member(member, DATA)
+
+    client.dispatch("member_join", member, guild)
+
+
+@parser("GUILD_MEMBER_REMOVE")
+def parse_guild_member_remove(shard, DATA):
+    client = shard.client
+    guild = client.get_guild(int(DATA["guild_id"]))
+    user = User(conn=client.http, **DATA["user"])
+
+    if guild is not None:
+        user = guild.members.pop(user.id, user)
+    else:
+        guild = Snowflake(DATA["guild_id"])
+
+    client.dispatch("member_remove", user, guild)
+
+
+@parser("GUILD_MEMBER_UPDATE")
+async def parse_guild_member_update(shard, DATA):
+    client = shard.client
+    guild = client.get_guild(int(DATA["guild_id"]))
+
+    if guild is None:
+        client.dispatch("u_member_update", DATA)
+        return
+
+    b_member = guild.get_member(int(DATA["user"]["id"]))
+    if not b_member:
+        b_member = await guild.fetch_member(int(DATA["user"]["id"]))
+    a_member = b_member.copy(update=DATA)
+
+    client.dispatch("member_update", b_member, a_member, guild)
+
+
+@parser("GUILD_ROLE_CREATE")
+def parse_guild_role_create(shard, DATA):
+    client = shard.client
+    guild = client.get_guild(int(DATA["guild_id"]))
+    role = Role(conn=client.http, **(DATA["role"]))
+
+    guild.roles.update({role.id: role})
+
+    client.dispatch("role_create", role, guild)
+
+
+@parser("GUILD_ROLE_UPDATE")
+def parse_guild_role_update(shard, DATA):
+    client = shard.client
+    guild = client.get_guild(int(DATA["guild_id"]))
+    a_role = Role(conn=client.http, **(DATA["role"]))
+    b_role = guild.roles.get(a_role.id)
+
+    guild.roles.update({a_role.id: a_role})
+
+    client.dispatch("role_update", a_role, b_role, guild)
+
+
+@parser("GUILD_ROLE_DELETE")
+def parse_guild_role_delete(shard, DATA):
+    client = shard.client
+    guild = client.get_guild(int(DATA["guild_id"]))
+    role = guild.roles.get(Snowflake(DATA["role_id"]))
+
+    client.dispatch("role_delete", role, guild)
+
+
+# NOTE: Guild scheduled events
+
+
+@parser("GUILD_SCHEDULED_EVENT_CREATE")
+def parse_guild_scheduled_event_create(shard, DATA):
+    client = shard.client
+    event = GuildScheduledEvent(conn=client.http, **DATA)
+    guild = client.get_guild(event.guild_id)
+    guild.guild_scheduled_events.update({event.id: event})
+
+    client.dispatch("guild_scheduled_event_create", event, guild)
+
+
+@parser("GUILD_SCHEDULED_EVENT_UPDATE")
+def parse_guild_scheduled_event_update(shard, DATA):
+    client = shard.client
+    event = GuildScheduledEvent(conn=client.http, **DATA)
+    guild = client.get_guild(event.guild_id)
+    guild.guild_scheduled_events.update({event.id: event})
+
+    client.dispatch("guild_scheduled_event_update", event, guild)
+
+
+@parser("GUILD_SCHEDULED_EVENT_DELETE")
+def parse_guild_scheduled_event_delete(shard, DATA):
+    client = shard.client
+    event = GuildScheduledEvent(conn=client.http, **DATA)
+    guild = client.get_guild(event.guild_id)
+
+    event = guild.scheduled_events.pop(event.id, event)
+
+    client.dispatch("guild_scheduled_event_delete", event, guild)
+
+
+# NOTE: Integrations
+
+
+@parser("ON_INTEGRATION_CREATE")
+def parse_integration_create(shard, DATA):
+    client = shard.client
+    d = Integration(conn=client.http, **DATA)
+
+    client.dispatch("guild_integration_create", d.guild_id, d)
+
+
+@parser("ON_INTEGRATION_UPDATE")
+def parse_integration_update(shard, DATA):
+    client = shard.client
+    d = Integration(conn=client.http, **DATA)
+
+    client.dispatch("guild_integration_update", d.guild_id, d)
+
+
+@parser("ON_INTEGRATION_DELETE")
+def parse_integration_delete(shard, DATA):
+    integration_id = Snowflake(DATA["id"])
+    guild_id = Snowflake(DATA["guild_id"])
+
+    if application_id := DATA.pop("application_id", None):
+        application_id = Snowflake(application_id)
+
+    shard.client.dispatch(
+        "guild_integration_delete", integration_id, guild_id, application_id
+    )
+
+
+# NOTE: Invites
+
+
+@parser("ON_INVITE_CREATE")
+def parse_on_invite_create(shard, DATA):
+    client = shard.client
+    inv = Invite(conn=client.http, **DATA)
+
+    client.dispatch("invite_create", inv)
+
+
+@parser("ON_INVITE_DELETE")
+def parse_on_invite_delete(shard, DATA):
+    channel_id = Snowflake(DATA["channel_id"])
+    code = DATA["code"]
+
+    if guild_id := DATA.pop("guild_id", None):
+        guild_id = Snowflake(guild_id)
+
+    shard.client.dispatch("invite_delete", code, channel_id, guild_id)
+
+
+# NOTE: channels
+
+
+@parser("CHANNEL_CREATE")
+def parse_channel_create(shard, DATA):
+    client = shard.client
+    channel, _ = _d_to_channel(DATA, client.http)
+
+    client.cache.add_channel(channel)
+    client.dispatch("channel_create", channel)
+
+
+@parser("CHANNEL_UPDATE")
+def parse_channel_update(shard, DATA):
+    client = shard.client
+    channel, _ = _d_to_channel(DATA, client.http)
+
+    client.cache.add_channel(channel)
+    client.dispatch("channel_update", channel)
+
+
+@parser("CHANNEL_DELETE")
+def parse_channel_delete(shard, DATA):
+    client = shard.client
+    channel = client.cache.remove_channel(int(DATA["id"]), None)
+    client.cache.purge_channel(int(DATA["id"]))
+    client.dispatch("channel_delete", channel)
+
+
+# NOTE: threads
+
+
+@parser("THREAD_CREATE")
+def parse_thread_create(shard, DATA):
+    client = shard.client
+    thread = Thread(conn=client.http, **DATA)
+    client.cache.add_channel(thread)
+
+    guild = client.get_guild(thread.guild_id)
+    guild.threads.update({thread.id: thread})
+
+    client.dispatch("thread_create", thread)
+
+
+@parser("THREAD_UPDATE")
+def parse_thread_update(shard, DATA):
+    client = shard.client
+    thread = Thread(conn=client.http, **DATA)
+    client.cache.add_channel(thread)
+
+    guild = client.get_guild(thread.guild_id)
+    guild.threads.update({thread.id: thread})
+
+    client.dispatch("thread_update", thread)
+
+
+@parser("THREAD_DELETE")
+def parse_thread_delete(shard, DATA):
+    client = shard.client
+    guild = client.get_guild(int(DATA["guild_id"]))
+    thread = guild.threads.pop(int(DATA["id"]), None)
+    client.cache.remove_channel(int(DATA["id"]), None)
+    client.cache.purge_channel(int(DATA["id"]))
+
+    client.dispatch("thread_delete")
+
+
+@parser("THREAD_SYNC_LIST")
+def parse_thread_sync_list(shard, DATA):
+    client = shard.client
+    guild = client.get_guild(int(DATA["guild_id"]))
+    threads = list()
+
+    for thread in DATA["threads"]:
+        tr = Thread(conn=client.http, **thread)
+        threads.append(tr)
+
+        guild.threads.update({tr.id: tr})
+        client.cache.add_channel(tr)
+
+    client.dispatch("thread_sync", threads)
+
+
+@parser("THREAD_MEMBER_UPDATE")
+def parse_thread_member_update(shard, DATA):
+    client = shard.client
+    guild = client.get_guild(int(DATA.pop("guild_id")))
+    member = ThreadMember(**DATA)
+
+    guild.threads[member.id].members.update({member.user_id: member})
+
+    client.dispatch("thread_member_update", member)
+
+
+@parser("THREAD_MEMBERS_UPDATE")
+def parse_thread_members_update(shard, DATA):
+    client = shard.client
+    guild = client.get_guild(int(DATA.pop("guild_id")))
+    thread = guild.threads[int(DATA.pop("id"))]
+
+    thread.member_count = DATA["member_count"]
+
+    for member in DATA["added_members"]:
+        trm = ThreadMember(**member)
+        thread.members.update({trm.id: trm})
+
+    for member in DATA["removed_member_ids"]:
+        thread.members.pop(int(member), None)
+        # Not all members may be in the thread
+
+    client.dispatch("thread_members_update", thread)
+
+
+@parser("VOICE_STATE_UPDATE")
+async def parse_voice_state_update(shard, DATA):
+    client = shard.client
+    client.awaiting_voice_connections.update(
+        {DATA["guild_id"]: (DATA["session_id"], DATA["channel_id"])}
+    )
+
+    voice_state = {key: value for key, value in DATA.items() if key != "member"}
+    m = Member(
+        conn=client.http,
+        guild_id=DATA["guild_id"],
+        voice_state=voice_state,
+        **DATA["member"],
+    )
+
+    if m.user.id == client.user.id:
+        # call manual disconnect if OP 13 has not already been recieved
+        conn = client.voice_connections.pop(DATA["guild_id"], None)
+        if conn is not None:
+            await conn.disconnect()
+
+    guild = client.cache.get_guild(m.guild_id)
+
+    if not guild:
+        return
+
+    guild._cache_member(m, {**DATA["member"], "voice_state": voice_state})
+    channel_id = DATA["channel_id"]
+
+    client.dispatch("voice_state_update", channel_id, m)
+
+
+# NOTE: Presences
+
+
+@parser("PRESENCE_UPDATE")
+def parse_presence_update(shard, DATA):
+    client = shard.client
+    user_id = DATA.pop("user").get("id")
+    presence = MemberPresence(user_id=user_id, **DATA)
+
+    guild = client.get_guild(presence.guild_id)
+
+    if guild and (member := guild.get_member(presence.user_id)):
+        member.presence = presence
+
+    client.dispatch("presence_update", presence)
+
+
+# NOTE: VOICE EVENTS
+
+
+@parser("VOICE_SERVER_UPDATE")
+def parse_voice_server_update(shard, DATA):
+    client = shard.client
+    session_id, channel_id = client.awaiting_voice_connections.pop(
+        DATA["guild_id"], (None, None)
+    )
+
+    if not session_id:
+        return
+    DATA["session_id"] = session_id
+    DATA["user_id"] = client.user.id
+
+    data = {"op": gateway.DISPATCH, "t": "VOICE_SERVER_UPDATE", "d": DATA}
+
+    vc = VoiceConnection(data, client.loop, client, channel_id)
+    client.voice_connections.update({DATA["guild_id"]: vc})
+
+    # Handled by default handler in Client.on_voice_server_update
+    client.dispatch("voice_server_update", vc)
@@ -0,0 +1,236 @@
+# Bounded queue between a shards websocket reader and its event workers
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class EventQueueStats(object):
+    """Backpressure metrics for an :class:`EventQueue`
+
+    Attributes
+    ----------
+    enqueued: :class:`int`
+        Number of events put in the queue
+    processed: :class:`int`
+        Number of events which have been parsed
+    failed: :class:`int`
+        Number of events whose parser raised an error
+    blocked: :class:`int`
+        Number of times the reader had to wait for space in the queue
+    blocked_for: :class:`float`
+        Total time in seconds the reader has spent waiting for space
+    max_depth: :class:`int`
+        Highest number of events waiting to be processed at once
+    """
+
+    __slots__ = (
+        "enqueued",
+        "processed",
+        "failed",
+        "blocked",
+        "blocked_for",
+        "max_depth",
+    )
+
+    def __init__(self) -> None:
+        self.enqueued = 0
+        self.processed = 0
+        self.failed = 0
+        self.blocked = 0
+        self.blocked_for = 0.0
+        self.max_depth = 0
+
+    @property
+    def pending(self) -> int:
+        """Number of events waiting to be processed"""
+        return self.enqueued - self.processed
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = {key: getattr(self, key) for key in self.__slots__}
+        data["pending"] = self.pending
+
+        return data
+
+    def __repr__(self) -> str:
+        return f"EventQueueStats(pending={self.pending}, processed={self.processed}, blocked={self.blocked})"
+
+
+def routing_key(event: str, data: Any) -> int:
+    """Gets the key used to pick a worker for an event,
+    events for the same guild always have the same key.
+    """
+    if not isinstance(data, dict):
+        return 0
+
+    guild_id = data.get("guild_id")
+
+    if guild_id is None and event.startswith("GUILD_"):
+        guild_id = data.get("id")
+
+    if guild_id is None:
+        return 0
+
+    # Guilds on a shard share (id >> 22) % num_shards,
+    # so mix the snowflake before it is split between workers.
+    return ((int(guild_id) * 0x9E3779B97F4A7C15) & 0xFFFFFFFFFFFFFFFF) >> 32
+
+
+class EventQueue(object):
+    """A bounded queue of dispatch events for a :class:`Shard`.
+
+    Events are split between ``workers`` queues by guild,
+    so events for a single guild are always parsed in the order they were received.
+
+    Parameters
+    ----------
+    shard: :class:`Shard`
+        Shard events are received from
+    workers: :class:`int`
+        Number of workers parsing events
+    maxsize: :class:`int`
+        Maximum number of events each worker can have queued,
+        the reader will wait for space once reached.
+        ``0`` means the queue is unbounded.
+
+    Attributes
+    ----------
+    stats: :class:`EventQueueStats`
+        Backpressure metrics for this queue
+    """
+
+    def __init__(self, shard, *, workers: int = 1, maxsize: int = 0) -> None:
+        if workers < 1:
+            raise ValueError("At least 1 worker is required")
+
+        self.shard = shard
+        self.stats = EventQueueStats()
+
+        self._queues: List[asyncio.Queue] = [
+            asyncio.Queue(maxsize) for _ in range(workers)
+        ]
+        self._tasks: List[asyncio.Task] = []
+
+    @property
+    def depth(self) -> int:
+        """Number of events currently queued"""
+        return sum(queue.qsize() for queue in self._queues)
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks)
+
+    def start(self) -> None:
+        """Starts the workers, does nothing if they are already running"""
+        if self._tasks:
+            return
+
+        loop = self.shard.loop
+
+        for index, queue in enumerate(self._queues):
+            task = loop.create_task(
+                self._worker(queue),
+                name=f"Acord event worker {index} : shard {self.shard.shard_id}",
+            )
+            self._tasks.append(task)
+
+    def stop(self) -> None:
+        """Cancels the workers, interrupting any event being parsed.
+        Queued events are kept and parsed once the workers are started again,
+        use :meth:`EventQueue.close` to wait for them instead.
+        """
+        for task in self._tasks:
+            task.cancel()
+
+        self._tasks.clear()
+
+    async def close(self, timeout: Optional[float] = 5.0) -> None:
+        """|coro|
+
+        Waits for queued events to be parsed, then stops the workers.
+
+        Parameters
+        ----------
+        timeout: :class:`float`
+            Seconds to wait for, ``None`` to wait until the queue is empty.
+            Events left afterwards are kept as with :meth:`EventQueue.stop`.
+        """
+        if self._tasks:
+            try:
+                await asyncio.wait_for(self.join(), timeout)
+            except asyncio.TimeoutError:
+                logger.warning(
+                    f"Shard {self.shard.shard_id} closed with {self.depth} events still queued"
+                )
+
+        self.stop()
+
+    async def put(self, event: str, data: Any, parser: Callable) -> None:
+        """|coro|
+
+        Queues an event to be parsed,
+        waits if the queue for this event is full.
+
+        Parameters
+        ----------
+        event: :class:`str`
+            Name of the event
+        data: Any
+            Data of the event
+        parser: Callable
+            Parser to call with the event
+        """
+        queue = self._queues[routing_key(event, data) % len(self._queues)]
+        stats = self.stats
+        item = (event, data, parser)
+
+        if queue.full():
+            stats.blocked += 1
+            started = time.perf_counter()
+
+            await queue.put(item)
+
+            stats.blocked_for += time.perf_counter() - started
+            logger.debug(
+                f"Event queue for shard {self.shard.shard_id} is full, reader waited for space"
+            )
+        else:
+            queue.put_nowait(item)
+
+        stats.enqueued += 1
+
+        if (pending := stats.pending) > stats.max_depth:
+            stats.max_depth = pending
+
+    async def join(self) -> None:
+        """|coro|
+
+        Waits until all queued events have been parsed
+        """
+        for queue in self._queues:
+            await queue.join()
+
+    async def _worker(self, queue: asyncio.Queue) -> None:
+        shard = self.shard
+        stats = self.stats
+
+        while True:
+            event, data, parser = await queue.get()
+
+            try:
+                result = parser(shard, data)
+
+                if asyncio.iscoroutine(result):
+                    await result
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                stats.failed += 1
+                shard.client.on_error(f"parser for {event}")
+            finally:
+                stats.processed += 1
+                queue.task_done()
@@ -0,0 +1,246 @@
+# Persists gateway sessions so shards can resume after a restart
+from __future__ import annotations
+
+import os
+import sqlite3
+import time
+from abc import ABC, abstractmethod
+from typing import Dict, Iterable, Optional
+
+import pydantic
+
+from acord.core import serializers
+
+
+class SessionData(pydantic.BaseModel):
+    """A gateway session which can be resumed"""
+
+    shard_id: int
+    """ ID of the shard the session belongs to """
+    num_shards: int
+    """ Total number of shards when the session was created """
+    session_id: str
+    """ Session ID received in READY """
+    sequence: Optional[int]
+    """ Last sequence received """
+    resume_url: Optional[str]
+    """ URL to resume the session on, received in READY """
+    updated_at: float = pydantic.Field(default_factory=time.time)
+    """ Timestamp of when the session was saved """
+
+
+class SessionStore(ABC, pydantic.BaseModel):
+    """An ABC for persisting gateway sessions,
+    when provided to a client shards resume their previous session instead of identifying.
+
+    Sessions are saved periodically rather than on every event,
+    resuming with an older sequence only means discord replays a few more events.
+
+    .. rubric:: Example
+
+    .. code-block:: py
+
+        from acord import Client, FileSessionStore
+
+        client = Client(session_store=FileSessionStore(path="sessions.json"))
+    """
+
+    max_age: float = 120
+    """ Seconds after which a saved session is considered expired """
+    save_interval: float = 5
+    """ Seconds between saving the sessions of every shard """
+
+    def is_expired(self, session: SessionData) -> bool:
+        return (time.time() - session.updated_at) > self.max_age
+
+    def get(self, shard_id: int, num_shards: int) -> Optional[SessionData]:
+        """Gets a session which can be resumed,
+        ``None`` if there is no session or it can no longer be used.
+
+        Parameters
+        ----------
+        shard_id: :class:`int`
+            ID of the shard
+        num_shards: :class:`int`
+            Total number of shards, sessions created with a different number are ignored
+        """
+        session = self.load(shard_id)
+
+        if session is None:
+            return None
+
+        if session.num_shards != num_shards or self.is_expired(session):
+            self.delete(shard_id)
+            return None
+
+        return session
+
+    @abstractmethod
+    def load(self, shard_id: int) -> Optional[SessionData]:
+        """Loads the session saved for a shard
+
+        Parameters
+        ----------
+        shard_id: :class:`int`
+            ID of the shard
+        """
+
+    @abstractmethod
+    def save(self, session: SessionData) -> None:
+        """Saves a session, replacing any existing session for the shard
+
+        Parameters
+        ----------
+        session: :class:`SessionData`
+            Session to save
+        """
+
+    def save_many(self, sessions: Iterable[SessionData]) -> None:
+        """Saves many sessions at once,
+        stores should override this to write them in a single operation.
+
+        Parameters
+        ----------
+        sessions: Iterable[:class:`SessionData`]
+            Sessions to save
+        """
+        for session in sessions:
+            self.save(session)
+
+    @abstractmethod
+    def delete(self, shard_id: int) -> None:
+        """Deletes the session saved for a shard
+
+        Parameters
+        ----------
+        shard_id: :class:`int`
+            ID of the shard
+        """
+
+    def close(self) -> None:
+        """Closes any resources held by the store"""
+
+
+class FileSessionStore(SessionStore):
+    """Stores sessions in a JSON file,
+    the file is replaced atomically so a crash never leaves it half written.
+
+    .. note::
+        Processes sharing a file may overwrite each others sessions,
+        use :class:`SQLiteSessionStore` when running a :class:`ShardCluster`.
+    """
+
+    path: str = "acord_sessions.json"
+    """ Path to the file """
+
+    def _read(self) -> Dict[str, dict]:
+        try:
+            with open(self.path, "rb") as f:
+                return serializers.loads(f.read())
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def _write(self, sessions: Dict[str, dict]) -> None:
+        tmp = f"{self.path}.tmp"
+
+        with open(tmp, "w") as f:
+            f.write(serializers.dumps(sessions))
+
+        os.replace(tmp, self.path)
+
+    def load(self, shard_id: int) -> Optional[SessionData]:
+        data = self._read().get(str(shard_id))
+
+        if data is None:
+            return None
+        return SessionData(**data)
+
+    def save(self, session: SessionData) -> None:
+        self.save_many((session,))
+
+    def save_many(self, sessions: Iterable[SessionData]) -> None:
+        saved = self._read()
+
+        for session in sessions:
+            saved[str(session.shard_id)] = session.dict()
+
+        self._write(saved)
+
+    def delete(self, shard_id: int) -> None:
+        sessions = self._read()
+
+        if sessions.pop(str(shard_id), None) is not None:
+            self._write(sessions)
+
+
+class SQLiteSessionStore(SessionStore):
+    """Stores sessions in a sqlite database,
+    which can safely be shared by multiple processes.
+    """
+
+    path: str = "acord_sessions.db"
+    """ Path to the database """
+
+    _connection: Optional[sqlite3.Connection] = pydantic.PrivateAttr(None)
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        if self._connection is None:
+            self._connection = sqlite3.connect(self.path, isolation_level=None)
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS sessions ("
+                "shard_id INTEGER PRIMARY KEY, num_shards INTEGER, session_id TEXT, "
+                "sequence INTEGER, resume_url TEXT, updated_at REAL)"
+            )
+
+        return self._connection
+
+    def load(self, shard_id: int) -> Optional[SessionData]:
+        row = self.connection.execute(
+            "SELECT shard_id, num_shards, session_id, sequence, resume_url, updated_at "
+            "FROM sessions WHERE shard_id = ?",
+            (shard_id,),
+        ).fetchone()
+
+        if row is None:
+            return None
+
+        return SessionData(**dict(zip(SessionData.__fields__, row)))
+
+    def save(self, session: SessionData) -> None:
+        self.save_many((session,))
+
+    def save_many(self, sessions: Iterable[SessionData]) -> None:
+        connection = self.connection
+        rows = [
+            (
+                session.shard_id,
+                session.num_shards,
+                session.session_id,
+                session.sequence,
+                session.resume_url,
+                session.updated_at,
+            )
+            for session in sessions
+        ]
+
+        # A single transaction, so the batch is committed once
+        connection.execute("BEGIN")
+
+        try:
+            connection.executemany(
+                "INSERT OR REPLACE INTO sessions VALUES (?, ?, ?, ?, ?, ?)", rows
+            )
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+
+        connection.execute("COMMIT")
+
+    def delete(self, shard_id: int) -> None:
+        self.connection.execute("DELETE FROM sessions WHERE shard_id = ?", (shard_id,))
+
+    def close(self) -> None:
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
@@ -3,7 +3,7 @@
 from __future__ import annotations
 import asyncio
 import sys
-from typing import Any, Callable, Coroutine
+from typing import Any, Callable, Coroutine, Optional, Union
 import logging
 
 
@@ -11,7 +11,7 @@
 from acord.models import Snowflake
 
 from acord.core.signals import gateway
-from acord.core.decoders import decodeResponse
+from acord.core.decoders import Inflator, decodeResponse, encodePayload
 from acord.core.heartbeat import GatewayKeepAlive
 
 from acord.payloads import (
@@ -21,7 +21,9 @@
 from acord.bases import Presence
 
 from .handler import handle_websocket
+from .queue import EventQueue
 from .ratelimiter import GatewayRatelimiter
+from .sessions import SessionData
 
 logger = logging.getLogger(__name__)
 
@@ -107,12 +109,24 @@ class Shard:
         value should be changed by user else unexpected errors may occur
     session_id: :class:`str`
         Session ID, used for resuming. Dont change it.
+    resume_url: Optional[:class:`str`]
+        Gateway URL to resume the session on, received in READY
     gateway_version: :class:`str`
         Gateway version client is using
     resuming: :class:`bool`
         Whether the shard is in a resuming state
+    unavailable_guilds: Dict[:class:`int`, :class:`bool`]
+        Guilds received in READY which have not been sent yet
+    event_queue: :class:`EventQueue`
+        Queue between the websocket reader and the workers parsing events,
+        its ``stats`` can be used to check if parsing is falling behind
     ratelimit_key: :class:`int`
         Ratelimit key used for bucket ratelimiting gateway requests
+    inflator: Optional[:class:`Inflator`]
+        Zlib inflater used for this connection,
+        ``None`` if compression is disabled
+    encoding: :class:`str`
+        Encoding used when sending payloads, either ``JSON`` or ``ETF``
     """
 
     def __init__(
@@ -131,6 +145,8 @@ def __init__(
         self.handler = handler
 
         self.ws = None
+        self.inflator = Inflator() if client.compress else None
+        self.encoding = client.encoding.upper()
         self.ready_event = asyncio.Event()
         self.loop: asyncio.AbstractEventLoop = asyncio.get_event_loop()
 
@@ -139,8 +155,14 @@ def __init__(
 
         self.sequence = None
         self.session_id = None
+        self.resume_url = None
         self.gateway_version = None
         self.resuming = False
+        self.unavailable_guilds = dict()
+
+        self.event_queue = EventQueue(
+            self, workers=client.event_workers, maxsize=client.event_queue_size
+        )
 
     def contains_guild(self, guild_id: Snowflake, /) -> bool:
         return ((guild_id >> 22) % self.num_shards) == self.shard_id
@@ -152,23 +174,65 @@ async def wait_until_ready(self):
         """
         await self._ready_event.wait()
 
-    async def connect(self, **kwds) -> None:
+    @property
+    def resume_gateway_url(self) -> str:
+        """URL to connect to when resuming,
+        falls back to :attr:`Shard.url` if discord did not provide one.
+        """
+        if not self.resume_url:
+            return self.url
+
+        # The resume url doesn't include the query params we connected with
+        _, _, query = self.url.partition("?")
+        return f"{self.resume_url.rstrip('/')}/?{query}"
+
+    def session_data(self) -> Optional[SessionData]:
+        """Gets the current session, ``None`` if the shard has not received READY"""
+        if self.session_id is None:
+            return None
+
+        return SessionData(
+            shard_id=self.shard_id,
+            num_shards=self.num_shards,
+            session_id=self.session_id,
+            sequence=self.sequence,
+            resume_url=self.resume_url,
+        )
+
+    def restore_session(self, session: SessionData) -> None:
+        """Restores a saved session,
+        :meth:`Shard.resume` can then be used instead of identifying.
+
+        Parameters
+        ----------
+        session: :class:`SessionData`
+            Session to restore
+        """
+        self.session_id = session.session_id
+        self.sequence = session.sequence
+        self.resume_url = session.resume_url
+
+    async def connect(self, url: str = None, **kwds) -> None:
         """|coro|
 
         Connects to gateway
 
         Parameters
         ----------
-        token: :class:`str`
-            Token to be used for identity packet
+        url: :class:`str`
+            URL to connect to, defaults to :attr:`Shard.url`
         **kwds:
             Additional kwargs to be passed through ``ws_connect``
         """
         logger.debug(f"Attempting to create a connection for shard {self.shard_id}")
 
-        self.ws = await self.session.ws_connect(self.url, **kwds)
+        self.ws = await self.session.ws_connect(url or self.url, **kwds)
         self._snd_kwds = kwds
 
+        # New connections start a new zlib stream
+        if self.inflator is not None:
+            self.inflator.reset()
+
         logger.info(f"Shard {self.shard_id} has connected successfully")
 
     async def receive_hello(self):
@@ -180,11 +244,14 @@ async def receive_hello(self):
         logger.debug(f"Receiving hello packet for Shard {self.shard_id}")
 
         packet = await self.ws.receive()
-        data = decodeResponse(packet.data)
+        data = decodeResponse(packet.data, self.inflator)
 
         if not data.get("op", 0) == gateway.HELLO:
             raise GatewayError(f"Invalid op code recieved")
 
+        if getattr(self, "_keep_alive", None) is not None:
+            self._keep_alive.end()
+
         self._keep_alive = GatewayKeepAlive(
             self, data["d"]["heartbeat_interval"], self.loop
         )
@@ -228,10 +295,31 @@ async def send_identity(
 
             lock.increment(self.ratelimit_key, lock_if_exceed=True)
 
-        await self.ws.send_str(payload.json())
+        async with self.client.identify_scheduler.identify(self.shard_id):
+            await self.send(payload)
 
         logger.info(f"Sent identity packet for Shard {self.shard_id}")
 
+    async def send(self, payload: Union[dict, GenericWebsocketPayload]) -> None:
+        """|coro|
+
+        Encodes a payload using :attr:`Shard.encoding` and sends it to the gateway.
+
+        .. note::
+            This does not go through the gateway ratelimiter
+
+        Parameters
+        ----------
+        payload: Union[:class:`dict`, :class:`GenericWebsocketPayload`]
+            Payload to send
+        """
+        data = encodePayload(payload, self.encoding)
+
+        if type(data) is bytes:
+            await self.ws.send_bytes(data)
+        else:
+            await self.ws.send_str(data)
+
     def listen(self, **kwds):
         """Generates task using handler,
         this task is automatically terminated by :meth:`Shard.disconnect`.
@@ -251,7 +339,8 @@ async def disconnect(self):
         """
         logger.info(f"Disconnecting from shard {self.shard_id}")
 
-        self._keep_alive._ended = True
+        if getattr(self, "_keep_alive", None) is not None:
+            self._keep_alive.end()
 
         await self.ws.close(code=4000)
 
@@ -270,9 +359,7 @@ async def resume(self, *, restart: bool = False):
         """
         if restart:
             await self.ws.close(code=4000)
-            await self.connect(**self._snd_kwds)
-
-            self._keep_alive._ws = self.ws
+            await self.connect(self.resume_gateway_url, **self._snd_kwds)
 
         async with self.ratelimiter as lock:
             if lock.exceeded(self.ratelimit_key):
@@ -282,7 +369,7 @@ async def resume(self, *, restart: bool = False):
 
         self.resuming = True
 
-        await self.ws.send_json(
+        await self.send(
             {
                 "op": gateway.RESUME,
                 "d": {
@@ -317,7 +404,7 @@ async def change_presence(self, presence: Presence) -> None:
 
             lock.increment(self.ratelimit_key, lock_if_exceed=True)
 
-        await self.ws.send_str(payload.json())
+        await self.send(payload)
 
     async def update_voice_state(self, **data) -> None:
         """|coro|
@@ -344,7 +431,7 @@ async def update_voice_state(self, **data) -> None:
 
             lock.increment(self.ratelimit_key, lock_if_exceed=True)
 
-        await self.ws.send_str(payload.json())
+        await self.send(payload)
 
     @property
     def ratelimit_key(self):
@@ -0,0 +1,110 @@
+# Spaces out identifies to honor discords max_concurrency
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Dict, Iterable, List
+
+logger = logging.getLogger(__name__)
+
+
+class IdentifyScheduler(object):
+    """Controls when shards are allowed to identify.
+
+    Discord allows ``max_concurrency`` shards to identify every 5 seconds,
+    a shard belongs to the bucket ``shard_id % max_concurrency``.
+    Shards in different buckets identify in parallel,
+    whilst shards in the same bucket wait for each other.
+
+    .. rubric:: Identifying with the scheduler
+
+    .. code-block:: py
+
+        scheduler = IdentifyScheduler(16)
+
+        async with scheduler.identify(shard.shard_id):
+            await shard.send(payload)
+
+    Parameters
+    ----------
+    max_concurrency: :class:`int`
+        Number of buckets, as returned by ``/gateway/bot``
+    delay: :class:`float`
+        Seconds a bucket must wait between identifies
+    """
+
+    def __init__(self, max_concurrency: int = 1, *, delay: float = 5.0) -> None:
+        self.max_concurrency = max_concurrency
+        self.delay = delay
+
+        self._locks: Dict[int, asyncio.Lock] = dict()
+        self._available_at: Dict[int, float] = dict()
+
+    def bucket(self, shard_id: int) -> int:
+        """Gets the bucket a shard identifies in"""
+        return shard_id % self.max_concurrency
+
+    def buckets(self, shard_ids: Iterable[int]) -> List[List[int]]:
+        """Groups shard ids by bucket,
+        each bucket is sorted in the order its shards should identify.
+
+        Parameters
+        ----------
+        shard_ids: Iterable[:class:`int`]
+            Shards to group
+        """
+        buckets: Dict[int, List[int]] = dict()
+
+        for shard_id in sorted(shard_ids):
+            buckets.setdefault(self.bucket(shard_id), []).append(shard_id)
+
+        return list(buckets.values())
+
+    def identify(self, shard_id: int) -> _IdentifyContext:
+        """Returns an async context manager,
+        which blocks until the shard may identify.
+
+        Parameters
+        ----------
+        shard_id: :class:`int`
+            Shard which is identifying
+        """
+        return _IdentifyContext(self, self.bucket(shard_id))
+
+    async def _acquire(self, bucket: int) -> None:
+        lock = self._locks.get(bucket)
+
+        if lock is None:
+            lock = self._locks[bucket] = asyncio.Lock()
+
+        await lock.acquire()
+
+        loop = asyncio.get_event_loop()
+        wait = self._available_at.get(bucket, 0) - loop.time()
+
+        if wait > 0:
+            logger.debug(f"Identify bucket {bucket} is waiting {wait:.2f} seconds")
+
+            try:
+                await asyncio.sleep(wait)
+            except BaseException:
+                lock.release()
+                raise
+
+    def _release(self, bucket: int) -> None:
+        self._available_at[bucket] = asyncio.get_event_loop().time() + self.delay
+        self._locks[bucket].release()
+
+
+class _IdentifyContext(object):
+    __slots__ = ("scheduler", "bucket")
+
+    def __init__(self, scheduler: IdentifyScheduler, bucket: int) -> None:
+        self.scheduler = scheduler
+        self.bucket = bucket
+
+    async def __aenter__(self) -> None:
+        await self.scheduler._acquire(self.bucket)
+
+    async def __aexit__(self, *_) -> None:
+        self.scheduler._release(self.bucket)
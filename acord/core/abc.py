@@ -1,9 +1,10 @@
 """
 All version related info for connecting to the gateway.
 """
-from functools import wraps
+from functools import lru_cache, wraps
+from string import Formatter
 import yarl
-from typing import Optional, Literal, Type, Union
+from typing import Optional, Literal, Tuple, Type, Union
 
 API_VERSION = 10
 BASE_API_URL = "https://discord.com/api"
@@ -11,6 +12,13 @@
 DISCORD_EPOCH = 1420070400000
 
 
+def _query_value(value) -> str:
+    # Discord expects lowercase booleans
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return str(value)
+
+
 def buildURL(*paths, **parameters) -> Union[str, yarl.URL]:
     URI = f"{BASE_API_URL}/v{API_VERSION}"
     for path in paths:
@@ -23,7 +31,7 @@ def buildURL(*paths, **parameters) -> Union[str, yarl.URL]:
 
     for key, value in parameters.items():
         if value:
-            URI += f"{key}={value}&"
+            URI += f"{key}={_query_value(value)}&"
 
     return yarl.URL(URI)
 
@@ -58,8 +66,31 @@ def inner(*args, **kwargs):
     return inner
 
 
+# Path segments followed by a major parameter,
+# discord ratelimits routes separately for each major parameter.
+MAJOR_PARAMETERS = {
+    "channels": "channel_id",
+    "guilds": "guild_id",
+    "webhooks": "webhook_id",
+    "interactions": "interaction_id",
+}
+
+# Path segments followed by a parameter which is not a snowflake,
+# replaced by a placeholder so every emoji or invite code doesnt become its own route.
+NAMED_PARAMETERS = {
+    "reactions": "emoji",
+    "invites": "code",
+    "templates": "code",
+}
+
+
 class Route(object):
-    """Simple object representing a route"""
+    """Simple object representing a route
+
+    .. note::
+        Routes made often should use a :class:`RouteTemplate` from :meth:`Route.compile`,
+        which parses the path once instead of on every request.
+    """
 
     def __init__(
         self, method: str = "GET", bucket: dict = dict(), *paths, path="/", **parameters
@@ -78,6 +109,158 @@ def __init__(
         self.webhook_id: Optional[int] = bucket.get("webhook_id")
         self.webhook_token: Optional[str] = bucket.get("webhook_token")
 
+        self.template, self.major_parameters = self._parse_path()
+
+    def _parse_path(self):
+        template = []
+        major = []
+        segments = [segment for segment in self.paths if segment]
+
+        for index, segment in enumerate(segments):
+            previous = segments[index - 1] if index else None
+            name = MAJOR_PARAMETERS.get(previous)
+
+            if name is not None and not major and isInt(segment):
+                template.append(f"{{{name}}}")
+                major.append(segment)
+            elif (
+                index == 2
+                and major
+                and segments[0] in ("webhooks", "interactions")
+                and not isInt(segment)
+            ):
+                # Webhook and interaction tokens are part of the major parameter
+                template.append("{token}")
+                major.append(segment)
+            elif isInt(segment):
+                template.append("{id}")
+            elif previous in NAMED_PARAMETERS:
+                template.append(f"{{{NAMED_PARAMETERS[previous]}}}")
+            else:
+                template.append(segment)
+
+        return f"{self.method} /{'/'.join(template)}", ":".join(major)
+
     @property
     def bucket(self):
         return f"{self.channel_id}:{self.guild_id}:{self.path}"
+
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def compile(method: str, path: str) -> "RouteTemplate":
+        """Compiles a path with ``{field}`` placeholders into a :class:`RouteTemplate`,
+        templates are cached so compiling the same path twice is free.
+
+        .. code-block:: py
+
+            GET_MESSAGE = Route.compile("GET", "/channels/{channel_id}/messages/{message_id}")
+
+            route = GET_MESSAGE.format(channel_id=channel_id, message_id=message_id)
+
+        Parameters
+        ----------
+        method: :class:`str`
+            Method of the route
+        path: :class:`str`
+            Path of the route, e.g. ``/channels/{channel_id}/messages``
+        """
+        return RouteTemplate(method, path)
+
+
+class RouteTemplate(object):
+    """A route with its path parsed ahead of time,
+    created with :meth:`Route.compile`.
+
+    Attributes
+    ----------
+    method: :class:`str`
+        Method of the route
+    path: :class:`str`
+        Path with ``{field}`` placeholders
+    template: :class:`str`
+        Same as :attr:`Route.template` of formatted routes,
+        identifies the route for ratelimits and metrics.
+        Fields which are not major parameters, tokens, emojis or codes
+        must be formatted with snowflakes for this to hold.
+    fields: Tuple[:class:`str`, ...]
+        Names of the placeholders in :attr:`RouteTemplate.path`
+    """
+
+    __slots__ = ("method", "path", "template", "fields", "_base_url", "_major")
+
+    def __init__(self, method: str, path: str) -> None:
+        self.method = method
+        self.path = path.strip("/")
+
+        template = []
+        major = []
+        fields = []
+        segments = [segment for segment in self.path.split("/") if segment]
+
+        for index, segment in enumerate(segments):
+            _, field, _, _ = next(iter(Formatter().parse(segment)), ("", None, "", ""))
+
+            if field is None:
+                template.append(segment)
+                continue
+
+            fields.append(field)
+            previous = segments[index - 1] if index else None
+            name = MAJOR_PARAMETERS.get(previous)
+
+            if name is not None and not major:
+                template.append(f"{{{name}}}")
+                major.append(field)
+            elif index == 2 and major and segments[0] in ("webhooks", "interactions"):
+                template.append("{token}")
+                major.append(field)
+            elif previous in NAMED_PARAMETERS:
+                template.append(f"{{{NAMED_PARAMETERS[previous]}}}")
+            else:
+                template.append("{id}")
+
+        self.template = f"{method} /{'/'.join(template)}"
+        self.fields: Tuple[str, ...] = tuple(fields)
+
+        self._base_url = f"{BASE_API_URL}/v{API_VERSION}/"
+        self._major: Tuple[str, ...] = tuple(major)
+
+    def __repr__(self) -> str:
+        return f"RouteTemplate({self.template!r})"
+
+    def format(self, *, bucket: dict = None, **parameters) -> Route:
+        """Creates a route from this template
+
+        Parameters
+        ----------
+        bucket: :class:`dict`
+            Same as ``bucket`` of :class:`Route`
+        **parameters:
+            Values for each field of the path,
+            other parameters are sent as the query string.
+        """
+        values = {field: parameters.pop(field) for field in self.fields}
+        path = self.path.format(**values)
+        url = self._base_url + path
+
+        query = {
+            key: _query_value(value) for key, value in parameters.items() if value
+        }
+
+        route = Route.__new__(Route)
+        route.path = "/" + path
+        route.paths = route.path.split("/")
+        route.parameters = parameters
+        route.method = self.method
+        route.url = yarl.URL(url).with_query(query) if query else url
+
+        bucket = bucket or {}
+        route.channel_id = bucket.get("channel_id")
+        route.guild_id = bucket.get("guild_id")
+        route.webhook_id = bucket.get("webhook_id")
+        route.webhook_token = bucket.get("webhook_token")
+
+        route.template = self.template
+        route.major_parameters = ":".join(str(values[field]) for field in self._major)
+
+        return route
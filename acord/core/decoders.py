@@ -1,45 +1,175 @@
+import re
 import zlib
-import json
+from typing import Any, Optional, Tuple, Union
+
+from . import etf, serializers
 
 ZLIB_SUFFIX = b"\x00\x00\xff\xff"
-INFLATOR = zlib.decompressobj()
 
+_ENVELOPE_PATTERNS = {
+    str: (
+        '"d":',
+        re.compile(r'"op":\s*(\d+)'),
+        re.compile(r'"t":\s*(?:null|"([A-Z_]+)")'),
+        re.compile(r'"s":\s*(null|\d+)'),
+    ),
+    bytes: (
+        b'"d":',
+        re.compile(rb'"op":\s*(\d+)'),
+        re.compile(rb'"t":\s*(?:null|"([A-Z_]+)")'),
+        re.compile(rb'"s":\s*(null|\d+)'),
+    ),
+}
+
+
+class Inflator(object):
+    """Streaming zlib inflater for a single gateway connection.
+
+    Discord shares one zlib context across every message sent on a connection,
+    so each :class:`Shard` must own its own inflater.
+    Partial frames are gathered until :data:`ZLIB_SUFFIX` arrives.
+
+    .. note::
+        A new inflater should be created whenever the underlying
+        websocket is re-created, as discord starts a new zlib stream.
+
+    Attributes
+    ----------
+    buffer: :class:`bytearray`
+        Reused buffer holding partial frames
+    """
+
+    __slots__ = ("buffer", "_inflator")
+
+    def __init__(self) -> None:
+        self.buffer = bytearray()
+        self._inflator = zlib.decompressobj()
+
+    def decompress(self, msg: bytes):
+        """Feeds a frame into the inflater,
+        returns ``None`` until a complete message has been received.
 
-def decompressResponse(msg):
-    BUFFER = bytearray()
+        Parameters
+        ----------
+        msg: :class:`bytes`
+            Frame received from the gateway
+        """
+        buffer = self.buffer
 
-    if type(msg) is bytes:
-        BUFFER.extend(msg)
+        if not buffer and msg[-4:] == ZLIB_SUFFIX:
+            # Full message in a single frame, no need to copy it
+            return self._inflator.decompress(msg)
 
-        if len(msg) < 4 or msg[-4:] != b"\x00\x00\xff\xff":
+        buffer.extend(msg)
+
+        if len(buffer) < 4 or buffer[-4:] != ZLIB_SUFFIX:
             return
-        msg = INFLATOR.decompress(BUFFER)
-        msg = msg.decode("utf-8")
+
+        try:
+            return self._inflator.decompress(buffer)
+        finally:
+            # Keeps the allocation around for the next partial frame
+            del buffer[:]
+
+    def reset(self) -> None:
+        """Resets the inflater, should be called on reconnect"""
+        self.buffer.clear()
+        self._inflator = zlib.decompressobj()
+
+
+def decompressResponse(msg, inflator: Inflator = None):
+    if type(msg) is bytes and inflator is not None:
+        return inflator.decompress(msg)
 
     return msg
 
 
-def decodeResponse(data) -> dict:
-    if type(data) is bytes:
-        try:
-            data = decompressResponse(data)
-        except Exception:
-            data = None
+def decodeResponse(data, inflator: Inflator = None) -> dict:
+    """Decodes a payload received from discord,
+    ETF payloads are detected using the version header.
+
+    Parameters
+    ----------
+    data: Union[:class:`str`, :class:`bytes`]
+        Payload to decode
+    inflator: :class:`Inflator`
+        Inflater to use if the payload is zlib compressed
+    """
+    try:
+        data = decompressResponse(data, inflator)
+    except zlib.error:
+        data = None
 
     if not data:
         return {}
 
-    if not data.startswith("{"):
-        data = ETF(data)
+    if type(data) is not str and data[0] == etf.FORMAT_VERSION:
+        return ETF(data)
+
+    return JSON(data)
+
+
+def peekEnvelope(data) -> Optional[Tuple[int, Optional[str], Optional[int]]]:
+    """Reads the ``op``, ``t`` and ``s`` fields of a JSON payload without decoding it.
+
+    Returns ``None`` if the fields could not be read cheaply,
+    in which case the payload should be decoded normally.
+
+    Parameters
+    ----------
+    data: Union[:class:`str`, :class:`bytes`]
+        An uncompressed JSON payload
+    """
+    patterns = _ENVELOPE_PATTERNS.get(type(data))
+
+    if patterns is None:
+        return
+
+    d_key, op_pattern, t_pattern, s_pattern = patterns
+
+    # The first "d" key is always the top level one,
+    # anything before it can only contain the other top level fields.
+    index = data.find(d_key)
+    head = data if index == -1 else data[:index]
+
+    op = op_pattern.search(head)
+    t = t_pattern.search(head)
+    s = s_pattern.search(head)
+
+    if op is None or t is None or s is None:
+        return
+
+    event = t.group(1)
+    sequence = s.group(1)
+
+    if type(data) is bytes:
+        event = event.decode() if event is not None else None
+        sequence = None if sequence == b"null" else int(sequence)
     else:
-        data = JSON(data)
+        sequence = None if sequence == "null" else int(sequence)
+
+    return int(op.group(1)), event, sequence
+
+
+def encodePayload(payload: Any, encoding: str = "JSON") -> Union[str, bytes]:
+    """Encodes a payload to be sent to the gateway
+
+    Parameters
+    ----------
+    payload: Union[:class:`dict`, :class:`~pydantic.BaseModel`]
+        Payload to encode
+    encoding: :class:`str`
+        Either ``ETF`` or ``JSON``
+    """
+    if encoding.upper() == "ETF":
+        return etf.pack(payload)
 
-    return data
+    return serializers.dumps(payload)
 
 
 def ETF(msg):
-    raise NotImplementedError()
+    return etf.unpack(msg)
 
 
 def JSON(msg):
-    return json.loads(msg)
+    return serializers.loads(msg)
@@ -0,0 +1,291 @@
+"""
+Erlang Term Format (ETF) encoding for the gateway.
+
+If `erlpack <https://github.com/discord/erlpack>`_ is installed it will be used,
+else we fall back to the pure python implementation below.
+"""
+from __future__ import annotations
+
+from struct import Struct
+from typing import Any
+import zlib
+
+from pydantic.json import pydantic_encoder
+
+try:
+    import erlpack  # type: ignore
+
+    HAS_ERLPACK = True
+except ImportError:
+    HAS_ERLPACK = False
+
+
+FORMAT_VERSION = 131
+
+NEW_FLOAT_EXT = 70
+COMPRESSED = 80
+SMALL_INTEGER_EXT = 97
+INTEGER_EXT = 98
+FLOAT_EXT = 99
+ATOM_EXT = 100
+SMALL_TUPLE_EXT = 104
+LARGE_TUPLE_EXT = 105
+NIL_EXT = 106
+STRING_EXT = 107
+LIST_EXT = 108
+BINARY_EXT = 109
+SMALL_BIG_EXT = 110
+LARGE_BIG_EXT = 111
+SMALL_ATOM_EXT = 115
+MAP_EXT = 116
+ATOM_UTF8_EXT = 118
+SMALL_ATOM_UTF8_EXT = 119
+
+ATOMS = {"nil": None, "true": True, "false": False}
+
+_UINT16 = Struct(">H")
+_INT32 = Struct(">i")
+_UINT32 = Struct(">I")
+_DOUBLE = Struct(">d")
+
+_u16 = _UINT16.unpack_from
+_i32 = _INT32.unpack_from
+_u32 = _UINT32.unpack_from
+_f64 = _DOUBLE.unpack_from
+
+
+class ETFDecodeError(ValueError):
+    """Raised when an invalid term is received"""
+
+
+def _atom(name: str) -> Any:
+    return ATOMS.get(name, name)
+
+
+def _decode(data, pos: int):
+    tag = data[pos]
+    pos += 1
+
+    if tag == BINARY_EXT:
+        (size,) = _u32(data, pos)
+        pos += 4
+        return data[pos : pos + size].decode("utf-8"), pos + size
+
+    if tag == SMALL_INTEGER_EXT:
+        return data[pos], pos + 1
+
+    if tag == MAP_EXT:
+        (arity,) = _u32(data, pos)
+        pos += 4
+        d = {}
+
+        for _ in range(arity):
+            key, pos = _decode(data, pos)
+            d[key], pos = _decode(data, pos)
+
+        return d, pos
+
+    if tag == SMALL_ATOM_UTF8_EXT or tag == SMALL_ATOM_EXT:
+        size = data[pos]
+        pos += 1
+        return _atom(data[pos : pos + size].decode("utf-8")), pos + size
+
+    if tag == ATOM_UTF8_EXT or tag == ATOM_EXT:
+        (size,) = _u16(data, pos)
+        pos += 2
+        return _atom(data[pos : pos + size].decode("utf-8")), pos + size
+
+    if tag == LIST_EXT:
+        (length,) = _u32(data, pos)
+        pos += 4
+        items = []
+
+        for _ in range(length):
+            item, pos = _decode(data, pos)
+            items.append(item)
+
+        # Tail of a proper list is always NIL_EXT
+        if data[pos] == NIL_EXT:
+            pos += 1
+        else:
+            _, pos = _decode(data, pos)
+
+        return items, pos
+
+    if tag == NIL_EXT:
+        return [], pos
+
+    if tag == INTEGER_EXT:
+        return _i32(data, pos)[0], pos + 4
+
+    if tag == SMALL_BIG_EXT or tag == LARGE_BIG_EXT:
+        # Snowflakes are sent as big integers
+        if tag == SMALL_BIG_EXT:
+            size = data[pos]
+            pos += 1
+        else:
+            (size,) = _u32(data, pos)
+            pos += 4
+
+        sign = data[pos]
+        pos += 1
+        value = int.from_bytes(data[pos : pos + size], "little")
+
+        return (-value if sign else value), pos + size
+
+    if tag == STRING_EXT:
+        # Erlang encodes lists of small integers as strings
+        (size,) = _u16(data, pos)
+        pos += 2
+        return list(data[pos : pos + size]), pos + size
+
+    if tag == NEW_FLOAT_EXT:
+        return _f64(data, pos)[0], pos + 8
+
+    if tag == FLOAT_EXT:
+        return float(data[pos : pos + 31].rstrip(b"\x00")), pos + 31
+
+    if tag == SMALL_TUPLE_EXT or tag == LARGE_TUPLE_EXT:
+        if tag == SMALL_TUPLE_EXT:
+            arity = data[pos]
+            pos += 1
+        else:
+            (arity,) = _u32(data, pos)
+            pos += 4
+
+        items = []
+        for _ in range(arity):
+            item, pos = _decode(data, pos)
+            items.append(item)
+
+        return tuple(items), pos
+
+    raise ETFDecodeError(f"Unknown ETF tag {tag} at position {pos - 1}")
+
+
+def _unpack(data: bytes) -> Any:
+    if not data or data[0] != FORMAT_VERSION:
+        raise ETFDecodeError("Missing ETF version header")
+
+    if data[1] == COMPRESSED:
+        data = bytes([FORMAT_VERSION]) + zlib.decompress(data[6:])
+
+    value, _ = _decode(data, 1)
+    return value
+
+
+def _encode(obj: Any, buffer: bytearray) -> None:
+    if obj is None:
+        buffer += b"\x77\x03nil"
+    elif obj is True:
+        buffer += b"\x77\x04true"
+    elif obj is False:
+        buffer += b"\x77\x05false"
+    elif isinstance(obj, str):
+        data = obj.encode("utf-8")
+        buffer.append(BINARY_EXT)
+        buffer += _UINT32.pack(len(data))
+        buffer += data
+    elif isinstance(obj, int):
+        if 0 <= obj <= 255:
+            buffer.append(SMALL_INTEGER_EXT)
+            buffer.append(obj)
+        elif -(2**31) <= obj < 2**31:
+            buffer.append(INTEGER_EXT)
+            buffer += _INT32.pack(obj)
+        else:
+            value = abs(obj)
+            data = value.to_bytes((value.bit_length() + 7) // 8, "little")
+
+            if len(data) > 255:
+                buffer.append(LARGE_BIG_EXT)
+                buffer += _UINT32.pack(len(data))
+            else:
+                buffer.append(SMALL_BIG_EXT)
+                buffer.append(len(data))
+
+            buffer.append(1 if obj < 0 else 0)
+            buffer += data
+    elif isinstance(obj, float):
+        buffer.append(NEW_FLOAT_EXT)
+        buffer += _DOUBLE.pack(obj)
+    elif isinstance(obj, dict):
+        buffer.append(MAP_EXT)
+        buffer += _UINT32.pack(len(obj))
+
+        for key, value in obj.items():
+            _encode(key, buffer)
+            _encode(value, buffer)
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        if not obj:
+            buffer.append(NIL_EXT)
+            return
+
+        buffer.append(LIST_EXT)
+        buffer += _UINT32.pack(len(obj))
+
+        for item in obj:
+            _encode(item, buffer)
+
+        buffer.append(NIL_EXT)
+    elif isinstance(obj, (bytes, bytearray)):
+        buffer.append(BINARY_EXT)
+        buffer += _UINT32.pack(len(obj))
+        buffer += obj
+    else:
+        # Models, enums, datetimes etc
+        _encode(pydantic_encoder(obj), buffer)
+
+
+def _normalise(obj: Any) -> Any:
+    # erlpack only encodes builtin types,
+    # everything else is converted the same way as by _encode
+    if obj is None or obj is True or obj is False:
+        return obj
+    if isinstance(obj, str):
+        return str(obj)
+    if isinstance(obj, int):
+        return int(obj)
+    if isinstance(obj, (float, bytes, bytearray)):
+        return obj
+    if isinstance(obj, dict):
+        return {_normalise(key): _normalise(value) for key, value in obj.items()}
+    if isinstance(obj, (list, tuple, set, frozenset)):
+        return [_normalise(item) for item in obj]
+    return _normalise(pydantic_encoder(obj))
+
+
+def _pack(obj: Any) -> bytes:
+    buffer = bytearray((FORMAT_VERSION,))
+    _encode(obj, buffer)
+
+    return bytes(buffer)
+
+
+def unpack(data: bytes) -> Any:
+    """Decodes an ETF payload.
+
+    Binaries are decoded as :class:`str`,
+    and snowflakes are returned as :class:`int`.
+
+    Parameters
+    ----------
+    data: :class:`bytes`
+        Data received from discord
+    """
+    if HAS_ERLPACK:
+        return erlpack.unpack(data, encoding="utf-8", encode_binary_ext=True)
+    return _unpack(data)
+
+
+def pack(obj: Any) -> bytes:
+    """Encodes an object into ETF.
+
+    Parameters
+    ----------
+    obj: Any
+        Object to encode, pydantic models are converted to dicts.
+    """
+    if HAS_ERLPACK:
+        return erlpack.pack(_normalise(obj))
+    return _pack(obj)
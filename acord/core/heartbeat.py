@@ -1,87 +1,253 @@
 # Basic heartbeat controller
+from __future__ import annotations
+
 from abc import ABC, abstractmethod
-from threading import Thread
+from typing import List, Optional, Set, Tuple
 import asyncio
+import heapq
+import itertools
+import random
 import time
+import weakref
 from .signals import gateway  # type: ignore
 import logging
 
 logger = logging.getLogger(__name__)
 
 
-class KeepAlive(Thread, ABC):
+class HeartbeatScheduler(object):
+    """Drives heartbeats for every :class:`KeepAlive` running on a loop.
+
+    Rather than each connection owning a thread,
+    due heartbeats are kept in a heap and a single timer
+    is armed for whichever heartbeat is due next.
+
+    .. note::
+        You shouldn't need to create this yourself,
+        use :func:`get_scheduler` to get the scheduler for a loop.
+
+    Parameters
+    ----------
+    loop: :obj:`py:asyncio.AbstractEventLoop`
+        Loop heartbeats are sent on
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop) -> None:
+        self.loop = loop
+
+        self._heap: List[Tuple[float, int, KeepAlive]] = []
+        self._counter = itertools.count()
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._timer_at: Optional[float] = None
+        self._tasks: Set[asyncio.Task] = set()
+
+    def __len__(self) -> int:
+        return sum(1 for _, _, keep_alive in self._heap if keep_alive.is_scheduled())
+
+    def schedule(self, keep_alive: KeepAlive, delay: float) -> None:
+        """Schedules the next heartbeat of a keep alive
+
+        Parameters
+        ----------
+        keep_alive: :class:`KeepAlive`
+            Keep alive to schedule
+        delay: :class:`float`
+            Seconds until the heartbeat is sent
+        """
+        when = self.loop.time() + delay
+        keep_alive._due = when
+
+        # Entries which are rescheduled or ended are left in the heap,
+        # and skipped once they reach the top.
+        heapq.heappush(self._heap, (when, next(self._counter), keep_alive))
+        self._arm()
+
+    def _arm(self) -> None:
+        heap = self._heap
+
+        while heap and not heap[0][2].is_scheduled(heap[0][0]):
+            heapq.heappop(heap)
+
+        if not heap:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = self._timer_at = None
+            return
+
+        when = heap[0][0]
+
+        if self._timer is not None:
+            if self._timer_at <= when:
+                return
+            self._timer.cancel()
+
+        self._timer = self.loop.call_at(when, self._fire)
+        self._timer_at = when
+
+    def _fire(self) -> None:
+        self._timer = self._timer_at = None
+
+        heap = self._heap
+        now = self.loop.time()
+
+        while heap and heap[0][0] <= now:
+            when, _, keep_alive = heapq.heappop(heap)
+
+            if not keep_alive.is_scheduled(when):
+                continue
+
+            self.schedule(keep_alive, keep_alive._interval)
+
+            task = self.loop.create_task(keep_alive.beat())
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+        self._arm()
+
+
+_schedulers: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+
+
+def get_scheduler(loop: asyncio.AbstractEventLoop = None) -> HeartbeatScheduler:
+    """Gets the :class:`HeartbeatScheduler` for a loop,
+    creating it if needed.
+
+    Parameters
+    ----------
+    loop: :obj:`py:asyncio.AbstractEventLoop`
+        Loop to get the scheduler for, defaults to the current loop
+    """
+    loop = loop or asyncio.get_event_loop()
+
+    try:
+        return _schedulers[loop]
+    except KeyError:
+        scheduler = _schedulers[loop] = HeartbeatScheduler(loop)
+        return scheduler
+
+
+class KeepAlive(ABC):
     """Represents a keep alive handler.
 
+    Heartbeats are sent by the :class:`HeartbeatScheduler` of :attr:`KeepAlive._loop`,
+    the first heartbeat is delayed by a random fraction of the interval.
+    If a heartbeat is due before the previous one was acknowledged,
+    the connection is considered a zombie and :meth:`KeepAlive.on_zombie` is called.
+
     .. DANGER::
-        If you are not overwriting :meth:`KeepAlive.run`,
-        you will need to provide the following attrs.
+        Subclasses need to provide the following attrs.
 
     Attributes
     ----------
     _ended: :class:`bool`
         Whether heartbeating has ended
-    _interval: :class:`int`
+    _interval: :class:`float`
         Time to wait between heartbeats,
         in seconds.
+    _loop: :obj:`py:asyncio.AbstractEventLoop`
+        Loop heartbeats are sent on
+    missed: :class:`int`
+        Number of heartbeats which were never acknowledged
     """
 
     _ended: bool
-    _interval: int
+    _interval: float
+    _loop: asyncio.AbstractEventLoop
+    _due: Optional[float] = None
+    _waiting_for_ack: bool = False
+
+    sent_at: Optional[float] = None
+    latency: float = float("inf")
+    missed: int = 0
+
+    def is_scheduled(self, when: float = None) -> bool:
+        if self._ended:
+            return False
+        return self._due is not None and (when is None or self._due == when)
+
+    def start(self) -> None:
+        """Starts heartbeating, the first heartbeat is jittered"""
+        self._ended = False
+        self._waiting_for_ack = False
+
+        get_scheduler(self._loop).schedule(self, self._interval * random.random())
+
+    def restart(self, interval: float = None) -> None:
+        """Restarts heartbeating, should be called after reconnecting
+
+        Parameters
+        ----------
+        interval: :class:`float`
+            New interval in milliseconds, as sent by discord
+        """
+        if interval is not None:
+            self._interval = interval / 1000
+
+        self.start()
 
-    def run(self):
-        """Default .run function,
-        calls :meth:`KeepAlive.send_heartbeat` every n seconds.
+    def end(self) -> None:
+        """Stops heartbeating"""
+        self._ended = True
+        self._due = None
 
-        .. note::
-            Once ended,
-            ``.join`` is called within this function
+    async def beat(self) -> None:
+        """|coro|
+
+        Called by the scheduler when a heartbeat is due
         """
-        while not self._ended:
-            self.send_heartbeat()
+        if self._waiting_for_ack:
+            self.missed += 1
+            self._waiting_for_ack = False
+
+            logger.warning(
+                f"Heartbeat was not acknowledged for {self!r}, connection is a zombie"
+            )
 
-            time.sleep(self._interval)
+            await self.on_zombie()
+            return
 
-        self.join()
+        try:
+            await self.send_heartbeat()
+        except Exception as exc:
+            logger.warning(f"Failed to send heartbeat for {self!r}", exc_info=exc)
+
+    def ack(self):
+        """Called when server responds with an ACK to our heartbeat"""
+        self._waiting_for_ack = False
+
+        if self.sent_at is not None:
+            self.latency = time.perf_counter() - self.sent_at
 
     @abstractmethod
-    def send_heartbeat(self):
-        """Sends a heartbeat"""
+    async def send_heartbeat(self):
+        """|coro|
+
+        Sends a heartbeat
+        """
 
     @abstractmethod
     def get_payload(self):
         """Gets heartbeat payload"""
 
     @abstractmethod
-    def ack(self):
-        """Called when server responds with an ACK to our heartbeat"""
+    async def on_zombie(self):
+        """|coro|
+
+        Called when a heartbeat was not acknowledged,
+        the connection should be closed and resumed.
+        """
 
 
 class GatewayKeepAlive(KeepAlive):
-    def __init__(self, shard, interval, loop=asyncio.get_event_loop()):
-        self.sent_at = None
-        self.latency = float("inf")
+    def __init__(self, shard, interval, loop=None):
         self.shard = shard
 
-        self._loop: asyncio.AbstractEventLoop = loop
-        self._ws = shard.ws
+        self._loop: asyncio.AbstractEventLoop = loop or asyncio.get_event_loop()
         self._interval = interval / 1000
-
         self._ended = False
-        self._waiting_for_ack = False
-
-        super().__init__(daemon=True)
 
-    def run(self):
-        while not self._ended:
-            self.send_heartbeat()
-
-            time.sleep(self._interval)
-
-        self.join()
-
-    def send_heartbeat(self):
-        coro = self._ws.send_json(self.get_payload())
-        asyncio.run_coroutine_threadsafe(coro, self._loop)
+    async def send_heartbeat(self):
+        await self.shard.send(self.get_payload())
 
         self.sent_at = time.perf_counter()
         self._waiting_for_ack = True
@@ -93,43 +259,42 @@ def send_heartbeat(self):
     def get_payload(self):
         return {"op": gateway.HEARTBEAT, "d": self.shard.sequence}
 
-    def ack(self):
-        d = time.perf_counter()
-        self._waiting_for_ack = False
+    async def on_zombie(self):
+        # Closing with a non 1000 code keeps the session resumable,
+        # the reader picks up the close and resumes.
+        await self.shard.ws.close(code=4000)
 
-        self.latency = d - self.sent_at
+    def __repr__(self):
+        return f"GatewayKeepAlive(shard={self.shard.shard_id}, interval={self._interval})"
 
 
 class VoiceKeepAlive(KeepAlive):
-    def __init__(self, connection, packet, loop=asyncio.get_event_loop()) -> None:
+    def __init__(self, connection, packet, loop=None) -> None:
         self.integer_nonce = 0
-        self.sent_at = None
-        self.latency = float("inf")
         self.connection = connection
 
-        self._loop = loop
+        self._loop = loop or asyncio.get_event_loop()
         self._interval = packet["d"]["heartbeat_interval"] / 1000
         self._ended = False
-        self._ws = connection._ws
 
-    def send_heartbeat(self):
-        coro = self._ws.send_json(self.get_payload())
-        asyncio.run_coroutine_threadsafe(coro, self._loop)
+    async def send_heartbeat(self):
+        await self.connection._ws.send_json(self.get_payload())
 
         self.sent_at = time.perf_counter()
         self._waiting_for_ack = True
 
-        logger.info(f"Sent Heartbeat to voice channel, conn_id={self.connection}")
-
-    def ack(self):
-        d = time.perf_counter()
-        self._waiting_for_ack = False
-
-        self.latency = d - self.sent_at
+        logger.info(
+            f"Sent Heartbeat to voice channel, conn_id={self.connection._conn_id}"
+        )
 
     def get_payload(self):
         self.integer_nonce += 1
         return {"op": 3, "d": self.integer_nonce}
 
-    def end(self):
-        self._ended = True
+    async def on_zombie(self):
+        # Resuming ends this keep alive, a new one is started on HELLO
+        self.end()
+        self._loop.create_task(self.connection.resume())
+
+    def __repr__(self):
+        return f"VoiceKeepAlive(conn_id={self.connection._conn_id}, interval={self._interval})"
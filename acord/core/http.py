@@ -15,12 +15,16 @@
         2,
     )
 
+from collections import Counter
 import asyncio
+import contextlib
+import contextvars
 import typing
 import aiohttp
 import acord
 import sys
 import logging
+import time
 
 from acord.errors import (
     BadRequest,
@@ -30,17 +34,37 @@
     NotFound,
 )
 from acord.models import User
-from . import abc
+from . import abc, serializers
 from .decoders import *
 from .ratelimiter import (
     DefaultHTTPRatelimiter,
+    GlobalRatelimit,
     HTTPRatelimiter,
+    RequestPriority,
+    is_priority_route,
     parse_ratelimit_headers,
 )
+from .response_cache import ResponseCache
+from .retry import CONNECTION_ERRORS, RetryPolicy, rebuild_body, snapshot_body
+from .tracing import HTTPTracer
 from aiohttp import FormData
 
 logger = logging.getLogger(__name__)
 
+# Priority of requests made in the current context, set by HTTPClient.with_priority
+_request_priority: contextvars.ContextVar[
+    typing.Optional[RequestPriority]
+] = contextvars.ContextVar("acord_request_priority", default=None)
+
+
+class ClientResponse(aiohttp.ClientResponse):
+    """Response class used by :class:`HTTPClient`,
+    decodes JSON using the backend set in :mod:`acord.core.serializers`.
+    """
+
+    async def json(self, *, loads=None, **kwds) -> typing.Any:
+        return await super().json(loads=loads or serializers.loads, **kwds)
+
 
 class HTTPClient(object):
     """
@@ -58,6 +82,26 @@ class HTTPClient(object):
         Loop to be used
     ratelimiter: :class:`HTTPRatelimiter`
         A ratelimiter for client to use.
+    global_ratelimit: :class:`GlobalRatelimit`
+        Limits the number of requests made per second across every route,
+        defaults to a new bucket of 50 requests per second with 5 reserved for interactions.
+        ``False`` disables it.
+    base_url: :class:`str`
+        URL to send requests to instead of the discord API,
+        such as a :class:`~acord.rest.proxy.RESTProxy`.
+    response_cache: :class:`ResponseCache`
+        Caches the responses of GET requests to the routes it is configured for,
+        defaults to no caching.
+    retry_policy: :class:`RetryPolicy`
+        Decides which failed requests are retried,
+        defaults to 3 attempts with exponential backoff.
+        ``None`` disables retrying, including ratelimited requests.
+    background_concurrency: :class:`int`
+        Maximum number of background requests in flight at once,
+        see :class:`RequestPriority`.
+    tracer: :class:`HTTPTracer`
+        Records the timings of every request and sends them to its sinks,
+        defaults to no tracing.
 
     Attributes
     ----------
@@ -68,7 +112,30 @@ class HTTPClient(object):
     connection: :class:`~aiohttp.BaseConnector`
         A connector class to be used with the session
     ratelimiter: :class:`DefaultHTTPRatelimiter`
-        Ratelimiter being used by this HTTPClient
+        Ratelimiter being used by this HTTPClient,
+        defaults to a new :class:`DefaultHTTPRatelimiter`
+    global_ratelimit: Optional[:class:`GlobalRatelimit`]
+        Token bucket every request passes through,
+        its ``tokens`` can be checked to see how close the client is to the global limit.
+        Defaults to a new :class:`GlobalRatelimit`, pass ``False`` to disable it.
+    base_url: Optional[:class:`str`]
+        URL requests are sent to, ``None`` if they are sent to discord
+    metrics: :class:`~collections.Counter`
+        Counters of requests made through this client,
+        ``requests`` counts calls to :meth:`HTTPClient.request`
+        and ``coalesced`` counts GET requests which shared an in flight response.
+        ``cache_hits`` and ``cache_misses`` count cacheable GET requests
+        answered from and missing :attr:`HTTPClient.response_cache`.
+        ``retries`` counts retried requests, split by reason into ``retries_ratelimited``,
+        ``retries_server_error`` and ``retries_connection_error``,
+        ``retries_exhausted`` counts requests which failed after being retried.
+    retry_policy: Optional[:class:`RetryPolicy`]
+        Policy used to retry failed requests
+    tracer: Optional[:class:`HTTPTracer`]
+        Tracer of requests made by this client
+    response_cache: Optional[:class:`ResponseCache`]
+        Cache of GET responses, invalidated by requests modifying the same objects
+        and by gateway events.
     user_agent: :class:`str`
         Default user agent to be sent with all requests.
 
@@ -84,21 +151,80 @@ def __init__(
         token: str = None,
         connecter: aiohttp.BaseConnector = None,
         loop: asyncio.AbstractEventLoop = asyncio.get_event_loop(),
-        ratelimiter: HTTPRatelimiter = DefaultHTTPRatelimiter(
-            max_requests=(10000, (60 * 10))
-        ),
+        ratelimiter: typing.Optional[HTTPRatelimiter] = None,
+        global_ratelimit: typing.Union[GlobalRatelimit, bool, None] = None,
+        base_url: typing.Optional[str] = None,
+        response_cache: typing.Optional[ResponseCache] = None,
+        retry_policy: typing.Optional[RetryPolicy] = RetryPolicy(),
+        background_concurrency: int = 2,
+        tracer: typing.Optional[HTTPTracer] = None,
     ) -> None:
         self.client = client
         self.token = token
         self.loop = loop
         self.connector = connecter
+        # Created per client, ratelimits are per token
+        if ratelimiter is None:
+            ratelimiter = DefaultHTTPRatelimiter(max_requests=(10000, (60 * 10)))
+        if global_ratelimit is None:
+            global_ratelimit = GlobalRatelimit()
+
         self.ratelimiter = ratelimiter
+        self.global_ratelimit = global_ratelimit or None
+        self.base_url = base_url.rstrip("/") if base_url else None
+        self.response_cache = response_cache
+        self.retry_policy = retry_policy
+        self._background = asyncio.Semaphore(background_concurrency)
+        self.tracer = tracer
+
+        self.metrics: typing.Counter[str] = Counter()
+        self._default_headers: typing.Tuple[tuple, typing.Dict[str, str]] = ((), {})
+        self._inflight: typing.Dict[tuple, asyncio.Future] = dict()
 
         user_agent = "ACord - https://github.com/Mecha-Karen/ACord {0} Python{1[0]}.{1[1]} aiohttp/{2}"
         self.user_agent = user_agent.format(
             acord.__version__, sys.version, aiohttp.__version__
         )
 
+    def _get_default_headers(self) -> typing.Dict[str, str]:
+        # Rebuilt only when the token or user agent changes
+        key, headers = self._default_headers
+
+        if key != (self.token, self.user_agent):
+            headers = {
+                "Authorization": "Bot " + self.token,
+                "User-Agent": self.user_agent,
+            }
+            self._default_headers = ((self.token, self.user_agent), headers)
+
+        return headers
+
+    @staticmethod
+    @contextlib.contextmanager
+    def with_priority(priority: RequestPriority) -> typing.Iterator[None]:
+        """Sets the priority of requests made in this context,
+        requests made by tasks created inside it use it too.
+
+        .. rubric:: Assigning roles in the background
+
+        .. code-block:: py
+
+            with client.http.with_priority(RequestPriority.BACKGROUND):
+                for member in guild.members:
+                    await member.add_role(role)
+
+        Parameters
+        ----------
+        priority: :class:`RequestPriority`
+            Priority of the requests
+        """
+        token = _request_priority.set(priority)
+
+        try:
+            yield
+        finally:
+            _request_priority.reset(token)
+
     async def login(self, *, token: str = None, **kwds) -> dict:
         """|coro|
 
@@ -116,6 +242,15 @@ async def login(self, *, token: str = None, **kwds) -> dict:
             .. warning::
                 You may not include ``connector`` and ``loop`` kwargs.
         """
+        kwds.setdefault("response_class", ClientResponse)
+        kwds.setdefault("json_serialize", serializers.dumps)
+
+        if self.tracer is not None:
+            kwds["trace_configs"] = [
+                *kwds.get("trace_configs", ()),
+                self.tracer.trace_config,
+            ]
+
         self._session = aiohttp.ClientSession(
             connector=self.connector, loop=self.loop, **kwds
         )
@@ -162,12 +297,20 @@ async def request(
         route: abc.Route,
         data: typing.Union[dict, FormData, typing.Any] = None,
         headers: dict = dict(),
+        *,
+        coalesce: bool = True,
+        cache: bool = True,
+        priority: typing.Optional[RequestPriority] = None,
         **kwds,
     ) -> aiohttp.ClientResponse:
         """|coro|
 
         Sends a request to the desired route.
 
+        Identical GET requests made whilst one is already in flight
+        share its response instead of making another request,
+        and are answered from :attr:`HTTPClient.response_cache` when its configured.
+
         Parameters
         ----------
         route: :class:`Route`
@@ -176,67 +319,273 @@ async def request(
             Data to be sent with request
         headers: :class:`dict`
             Headers to send with request
+        coalesce: :class:`bool`
+            Whether a GET request may share the response of an identical request in flight
+        cache: :class:`bool`
+            Whether a GET request may be answered from :attr:`HTTPClient.response_cache`,
+            the fresh response is still cached.
+        priority: :class:`RequestPriority`
+            Lane of the request, defaults to the priority set by :meth:`HTTPClient.with_priority`,
+            otherwise interactive for interaction and webhook routes and normal for the rest.
         **kwds:
             Additional kwargs to be passed through :meth:`~aiohttp.ClientSession.request`
         """
-        if self.ratelimiter.global_lock:
-            await self.ratelimiter.hold_global_lock()
+        self.metrics["requests"] += 1
 
-        if self.ratelimiter.bucket_is_limited(route.bucket):
-            await self.ratelimiter.hold_bucket(route.bucket)
+        if priority is None:
+            priority = _request_priority.get()
 
-        headers = kwds.pop("headers", None) or headers
+            if priority is None:
+                priority = (
+                    RequestPriority.INTERACTIVE
+                    if is_priority_route(route)
+                    else RequestPriority.NORMAL
+                )
 
-        if data is not None:
-            kwds["data"] = data
-
-        headers["Authorization"] = "Bot " + self.token
-        headers["User-Agent"] = self.user_agent
+        response_cache = self.response_cache
 
-        kwargs = dict()
-        kwargs["headers"] = headers
+        if route.method != "GET" or data is not None:
+            resp = await self._request(
+                route, data, headers, priority=priority, **kwds
+            )
 
-        kwargs.update(kwds)
+            if response_cache is not None and route.method != "GET":
+                response_cache.invalidate_route(route)
+            return resp
 
-        resp = await self._session.request(method=route.method, url=route.url, **kwargs)
-        logger.info(f"Request made at {route.path:>20} returned {resp.status}")
+        cacheable = response_cache is not None and response_cache.ttl_for(route) is not None
 
-        ratelimit_headers = parse_ratelimit_headers(resp.headers)
+        if cacheable and cache:
+            if (resp := response_cache.get(route, self.token)) is not None:
+                self.metrics["cache_hits"] += 1
+                return resp
+            self.metrics["cache_misses"] += 1
 
-        if ratelimit_headers:
-            self.ratelimiter.add_bucket(route.bucket, ratelimit_headers)
+        if not coalesce:
+            resp = await self._request(
+                route, data, headers, priority=priority, **kwds
+            )
 
-        if 200 <= resp.status < 300:
+            if cacheable:
+                await resp.read()
+                response_cache.set(route, self.token, resp)
             return resp
 
-        respData = decodeResponse(await resp.read())
+        key = (route.method, str(route.url), self.token)
 
-        if 500 <= resp.status < 600:
-            raise DiscordError(str(respData))
+        while (future := self._inflight.get(key)) is not None:
+            self.metrics["coalesced"] += 1
+            # Shielded so a cancelled waiter doesn't cancel the request for everyone
+            resp = await asyncio.shield(future)
 
-        if resp.status == 429:
-            if respData.get("global", False):
-                self.ratelimiter.global_lock_set(respData["retry_after"])
-                raise HTTPException(429, "HTTP API is being ratelimited globally")
+            if resp is not None:
+                return resp
+            # Whoever sent the request was cancelled, so it is sent again
+
+        future = self._inflight[key] = asyncio.get_event_loop().create_future()
+
+        try:
+            resp = await self._request(
+                route, data, headers, priority=priority, **kwds
+            )
+            # Read now so every waiter can read the body
+            await resp.read()
+        except asyncio.CancelledError:
+            # Waiters send the request again instead of being cancelled with us
+            future.set_result(None)
+            raise
+        except BaseException as exc:
+            future.set_exception(exc)
+            # Marks the exception as retrieved if nobody else was waiting
+            future.exception()
+            raise
+        else:
+            if cacheable:
+                response_cache.set(route, self.token, resp)
+
+            future.set_result(resp)
+            return resp
+        finally:
+            self._inflight.pop(key, None)
+
+    async def _request(
+        self,
+        route: abc.Route,
+        data: typing.Union[dict, FormData, typing.Any] = None,
+        headers: dict = dict(),
+        *,
+        priority: RequestPriority = RequestPriority.NORMAL,
+        **kwds,
+    ) -> aiohttp.ClientResponse:
+        tracer = self.tracer
 
+        if tracer is None:
+            trace = None
+        else:
+            trace = kwds["trace_request_ctx"] = tracer.start(route)
+
+        try:
+            if priority is not RequestPriority.BACKGROUND:
+                resp = await self._retry(route, data, headers, priority, **kwds)
             else:
-                await asyncio.sleep(respData["retry_after"])
+                # Background jobs are capped so they never take every connection and bucket
+                started_at = time.perf_counter()
+
+                async with self._background:
+                    if trace is not None:
+                        trace.ratelimit_wait += time.perf_counter() - started_at
+
+                    resp = await self._retry(route, data, headers, priority, **kwds)
+        except BaseException as exc:
+            if trace is not None:
+                tracer.finish(trace, bucket=self._bucket_label(route), error=exc)
+            raise
+
+        if trace is not None:
+            tracer.finish(trace, bucket=self._bucket_label(route), response=resp)
+
+        return resp
+
+    def _bucket_label(self, route: abc.Route) -> typing.Optional[str]:
+        routes = getattr(self.ratelimiter, "routes", None)
+        return routes.get(route.template) if routes else None
+
+    async def _retry(
+        self,
+        route: abc.Route,
+        data: typing.Union[dict, FormData, typing.Any],
+        headers: dict,
+        priority: RequestPriority,
+        **kwds,
+    ) -> aiohttp.ClientResponse:
+        policy = self.retry_policy
+        snapshot = snapshot_body(data)
+        attempt = 0
+
+        while True:
+            attempt += 1
+
+            if attempt > 1:
+                try:
+                    data = rebuild_body(data, snapshot)
+                except ValueError as exc:
+                    logger.debug(f"Cannot retry request to {route.path}: {exc}")
+                    self.metrics["retries_exhausted"] += 1
+                    raise error from exc
+
+            if (trace := kwds.get("trace_request_ctx")) is not None:
+                trace.start_attempt()
 
             try:
-                return await self.request(route, data, headers, **kwds)
-            except RuntimeError:
-                # Form Data has been processed already
-                n_data = FormData()
-                n_data._fields = data._fields
+                resp = await self._send(route, data, headers, priority, **kwds)
+            except CONNECTION_ERRORS as exc:
+                if policy is None or not policy.should_retry(
+                    route.method, attempt, error=exc
+                ):
+                    raise
+
+                error, delay = exc, policy.delay(attempt)
+                self.metrics["retries_connection_error"] += 1
+            else:
+                if 200 <= resp.status < 300:
+                    return resp
+
+                body = await resp.read()
+
+                try:
+                    respData = decodeResponse(body)
+                except ValueError:
+                    respData = {"message": body.decode("utf-8", "replace")}
+
+                error = self._make_error(resp.status, respData)
+
+                if policy is None or not policy.should_retry(
+                    route.method, attempt, status=resp.status
+                ):
+                    if attempt > 1:
+                        self.metrics["retries_exhausted"] += 1
+                    raise error
+
+                if resp.status == 429:
+                    delay = float(respData.get("retry_after", 1))
+
+                    if respData.get("global", False):
+                        # Every request waits on the lock, not just this one
+                        self.ratelimiter.global_lock_set(delay)
+                        delay = 0
+
+                    self.metrics["retries_ratelimited"] += 1
+                else:
+                    delay = policy.delay(attempt)
+                    self.metrics["retries_server_error"] += 1
+
+            self.metrics["retries"] += 1
+            logger.warning(
+                f"Request to {route.path} failed on attempt {attempt}, retrying in {delay:.2f}s"
+            )
+
+            await asyncio.sleep(delay)
+
+    @staticmethod
+    def _make_error(status: int, respData: dict) -> Exception:
+        if 500 <= status < 600:
+            return DiscordError(str(respData))
 
-                return await self.request(route, n_data, headers, **kwds)
+        if status == 429:
+            if respData.get("global", False):
+                return HTTPException(429, "HTTP API is being ratelimited globally")
+            return HTTPException(429, "Route is being ratelimited")
+
+        if status == 403:
+            return Forbidden(str(respData), payload=respData, status_code=403)
+        if status == 404:
+            return NotFound(str(respData), payload=respData, status_code=404)
+
+        return BadRequest(str(respData), payload=respData, status_code=status)
+
+    async def _send(
+        self,
+        route: abc.Route,
+        data: typing.Union[dict, FormData, typing.Any],
+        headers: dict,
+        priority: RequestPriority,
+        **kwds,
+    ) -> aiohttp.ClientResponse:
+        started_at = time.perf_counter()
+
+        await self.ratelimiter.acquire(route, priority=priority)
+
+        if self.global_ratelimit is not None:
+            # Taken after the route bucket, so tokens aren't held whilst waiting on it
+            await self.global_ratelimit.acquire(priority=priority)
+
+        if (trace := kwds.get("trace_request_ctx")) is not None:
+            trace.ratelimit_wait += time.perf_counter() - started_at
+
+        headers = kwds.pop("headers", None) or headers
+
+        if data is not None:
+            kwds["data"] = data
+
+        kwds["headers"] = {**headers, **self._get_default_headers()}
+
+        url = route.url
+
+        if self.base_url is not None:
+            url = self.base_url + str(url)[len(abc.BASE_API_URL) :]
+
+        try:
+            resp = await self._session.request(method=route.method, url=url, **kwds)
+        except BaseException:
+            # Frees the request reserved for this route
+            self.ratelimiter.update(route, {})
+            raise
+
+        logger.info(f"Request made at {route.path:>20} returned {resp.status}")
 
-        if resp.status == 403:
-            raise Forbidden(str(respData), payload=respData, status_code=403)
-        if resp.status == 404:
-            raise NotFound(str(respData), payload=respData, status_code=404)
+        self.ratelimiter.update(route, parse_ratelimit_headers(resp.headers))
 
-        raise BadRequest(str(respData), payload=respData, status_code=resp.status)
+        return resp
 
     async def __aenter__(self) -> HTTPClient:
         return self
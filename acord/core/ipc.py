@@ -0,0 +1,448 @@
+"""
+Inter-process communication between clusters of shards.
+
+Processes talk to a single :class:`IPCServer` using newline separated JSON,
+the server routes requests between clusters and coordinates identifies.
+
+.. rubric:: Handling requests from other clusters
+
+.. code-block:: py
+
+    ipc = IPCClient(cluster_id, shard_ids, port=port)
+
+    @ipc.handler("member_count")
+    async def member_count(data):
+        return sum(guild.member_count for guild in client.cache.guilds())
+
+    await ipc.connect()
+
+    counts = await ipc.broadcast("member_count")
+"""
+from __future__ import annotations
+
+import asyncio
+import itertools
+import logging
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from acord.errors import IPCError
+
+from . import serializers
+
+logger = logging.getLogger(__name__)
+
+IPCHandler = Callable[[Any], Awaitable[Any]]
+
+
+class IPCConnection(object):
+    """A connection to another process,
+    both ends can make requests to the other.
+
+    Parameters
+    ----------
+    reader: :class:`~asyncio.StreamReader`
+        Reader of the connection
+    writer: :class:`~asyncio.StreamWriter`
+        Writer of the connection
+    handlers: Dict[:class:`str`, Callable[[Any], Awaitable[Any]]]
+        Handlers for requests received on this connection
+    """
+
+    def __init__(
+        self,
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter,
+        handlers: Dict[str, IPCHandler],
+    ) -> None:
+        self.reader = reader
+        self.writer = writer
+        self.handlers = handlers
+
+        self._nonces = itertools.count()
+        self._pending: Dict[int, asyncio.Future] = dict()
+        self._tasks = set()
+
+    @property
+    def closed(self) -> bool:
+        return self.writer.is_closing()
+
+    async def _send(self, message: dict) -> None:
+        self.writer.write(serializers.dumps(message).encode("utf-8") + b"\n")
+        await self.writer.drain()
+
+    async def request(self, op: str, data: Any = None) -> Any:
+        """|coro|
+
+        Sends a request and waits for its response
+
+        Parameters
+        ----------
+        op: :class:`str`
+            Name of the handler to call
+        data: Any
+            JSON serializable data passed to the handler
+
+        Raises
+        ------
+        IPCError
+            The handler raised an error, or the connection was closed
+        """
+        nonce = next(self._nonces)
+        future = self._pending[nonce] = asyncio.get_event_loop().create_future()
+
+        try:
+            await self._send({"op": op, "d": data, "nonce": nonce})
+            return await future
+        finally:
+            self._pending.pop(nonce, None)
+
+    async def listen(self) -> None:
+        """|coro|
+
+        Reads the connection until it is closed,
+        requests are handled in their own task so slow handlers dont block responses.
+        """
+        try:
+            while True:
+                try:
+                    line = await self.reader.readline()
+                except ConnectionError:
+                    break
+
+                if not line:
+                    break
+
+                message = serializers.loads(line)
+
+                if message["op"] == "response":
+                    future = self._pending.get(message["nonce"])
+
+                    if future is None or future.done():
+                        continue
+
+                    if message.get("error") is not None:
+                        future.set_exception(IPCError(message["error"]))
+                    else:
+                        future.set_result(message.get("d"))
+                else:
+                    task = asyncio.get_event_loop().create_task(self._handle(message))
+                    self._tasks.add(task)
+                    task.add_done_callback(self._tasks.discard)
+        finally:
+            for future in self._pending.values():
+                if not future.done():
+                    future.set_exception(IPCError("IPC connection closed"))
+
+            self.close()
+
+    async def _handle(self, message: dict) -> None:
+        response = {"op": "response", "nonce": message["nonce"]}
+        handler = self.handlers.get(message["op"])
+
+        try:
+            if handler is None:
+                raise IPCError(f"No handler registered for {message['op']!r}")
+
+            response["d"] = await handler(message.get("d"))
+        except Exception as exc:
+            logger.debug(f"IPC handler for {message['op']} failed", exc_info=exc)
+            response["error"] = (
+                str(exc)
+                if isinstance(exc, IPCError)
+                else f"{type(exc).__name__}: {exc}"
+            )
+
+        if not self.closed:
+            await self._send(response)
+
+    def close(self) -> None:
+        if not self.closed:
+            self.writer.close()
+
+
+class IPCServer(object):
+    """Routes requests between clusters,
+    ran by the process which launched the clusters.
+
+    Parameters
+    ----------
+    num_shards: :class:`int`
+        Total number of shards between all clusters
+    host: :class:`str`
+        Host to listen on
+    port: :class:`int`
+        Port to listen on, ``0`` picks a free port
+    identify_scheduler: :class:`IdentifyScheduler`
+        Scheduler shared by every cluster when identifying
+
+    Attributes
+    ----------
+    clusters: Dict[:class:`int`, :class:`IPCConnection`]
+        Connected clusters
+    shards: Dict[:class:`int`, :class:`int`]
+        Mapping of shard ids to the cluster running them
+    """
+
+    def __init__(
+        self,
+        num_shards: int,
+        *,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        identify_scheduler=None,
+    ) -> None:
+        from acord.client.startup import IdentifyScheduler
+
+        self.num_shards = num_shards
+        self.host = host
+        self.port = port
+        self.identify_scheduler = identify_scheduler or IdentifyScheduler()
+
+        self.clusters: Dict[int, IPCConnection] = dict()
+        self.shards: Dict[int, int] = dict()
+
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    async def start(self) -> None:
+        """|coro|
+
+        Starts listening for clusters,
+        :attr:`IPCServer.port` is updated if a free port was picked.
+        """
+        self._server = await asyncio.start_server(
+            self._on_connection, self.host, self.port
+        )
+        self.port = self._server.sockets[0].getsockname()[1]
+
+        logger.info(f"IPC server listening on {self.host}:{self.port}")
+
+    async def close(self) -> None:
+        """|coro|
+
+        Closes the server and every cluster connection
+        """
+        for connection in self.clusters.values():
+            connection.close()
+
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+
+    def cluster_for(self, guild_id: int) -> int:
+        """Gets the id of the cluster running the shard for a guild"""
+        shard_id = (int(guild_id) >> 22) % self.num_shards
+
+        try:
+            return self.shards[shard_id]
+        except KeyError:
+            raise IPCError(f"No cluster is running shard {shard_id}") from None
+
+    async def _on_connection(self, reader, writer) -> None:
+        cluster_id = None
+
+        async def register(data):
+            nonlocal cluster_id
+
+            cluster_id = data["cluster_id"]
+            self.clusters[cluster_id] = connection
+
+            for shard_id in data["shard_ids"]:
+                self.shards[shard_id] = cluster_id
+
+            logger.info(f"Cluster {cluster_id} connected to IPC server")
+
+        handlers = {
+            "register": register,
+            "identify": self._identify,
+            "request": self._request,
+            "broadcast": self._broadcast,
+        }
+        connection = IPCConnection(reader, writer, handlers)
+
+        try:
+            await connection.listen()
+        finally:
+            if cluster_id is not None and self.clusters.get(cluster_id) is connection:
+                self.clusters.pop(cluster_id)
+                logger.info(f"Cluster {cluster_id} disconnected from IPC server")
+
+    async def _identify(self, data) -> None:
+        scheduler = self.identify_scheduler
+        scheduler.max_concurrency = data["max_concurrency"]
+
+        async with scheduler.identify(data["shard_id"]):
+            pass
+
+    async def _request(self, data) -> Any:
+        cluster_id = data.get("cluster_id")
+
+        if cluster_id is None:
+            cluster_id = self.cluster_for(data["guild_id"])
+
+        try:
+            connection = self.clusters[cluster_id]
+        except KeyError:
+            raise IPCError(f"Cluster {cluster_id} is not connected") from None
+
+        return await connection.request(data["op"], data.get("d"))
+
+    async def _broadcast(self, data) -> Dict[int, Any]:
+        clusters = list(self.clusters.items())
+
+        results = await asyncio.gather(
+            *(connection.request(data["op"], data.get("d")) for _, connection in clusters),
+            return_exceptions=True,
+        )
+
+        return {
+            cluster_id: (None if isinstance(result, Exception) else result)
+            for (cluster_id, _), result in zip(clusters, results)
+        }
+
+
+class IPCClient(object):
+    """Connection from a cluster to the :class:`IPCServer`
+
+    Parameters
+    ----------
+    cluster_id: :class:`int`
+        ID of this cluster
+    shard_ids: List[:class:`int`]
+        Shards this cluster runs
+    host: :class:`str`
+        Host of the server
+    port: :class:`int`
+        Port of the server
+
+    Attributes
+    ----------
+    handlers: Dict[:class:`str`, Callable[[Any], Awaitable[Any]]]
+        Handlers for requests from other clusters
+    """
+
+    def __init__(
+        self,
+        cluster_id: int,
+        shard_ids: List[int],
+        *,
+        host: str = "127.0.0.1",
+        port: int,
+    ) -> None:
+        self.cluster_id = cluster_id
+        self.shard_ids = list(shard_ids)
+        self.host = host
+        self.port = port
+
+        self.handlers: Dict[str, IPCHandler] = dict()
+
+        self._connection: Optional[IPCConnection] = None
+        self._listener: Optional[asyncio.Task] = None
+
+    def handler(self, op: str):
+        """Registers a handler for requests from other clusters,
+        handlers receive the request data and return a JSON serializable result.
+
+        Parameters
+        ----------
+        op: :class:`str`
+            Name of the request
+        """
+
+        def inner(func: IPCHandler) -> IPCHandler:
+            self.handlers[op] = func
+            return func
+
+        return inner
+
+    async def connect(self) -> None:
+        """|coro|
+
+        Connects and registers with the server
+        """
+        reader, writer = await asyncio.open_connection(self.host, self.port)
+
+        self._connection = IPCConnection(reader, writer, self.handlers)
+        self._listener = asyncio.get_event_loop().create_task(
+            self._connection.listen()
+        )
+
+        await self._connection.request(
+            "register", {"cluster_id": self.cluster_id, "shard_ids": self.shard_ids}
+        )
+
+    async def close(self) -> None:
+        """|coro|
+
+        Closes the connection to the server
+        """
+        if self._connection is not None:
+            self._connection.close()
+
+        if self._listener is not None:
+            self._listener.cancel()
+
+    def _get_connection(self) -> IPCConnection:
+        if self._connection is None or self._connection.closed:
+            raise IPCError("Not connected to the IPC server")
+        return self._connection
+
+    async def identify(self, shard_id: int, max_concurrency: int) -> None:
+        """|coro|
+
+        Waits until the server allows a shard to identify
+        """
+        await self._get_connection().request(
+            "identify", {"shard_id": shard_id, "max_concurrency": max_concurrency}
+        )
+
+    async def request(
+        self,
+        op: str,
+        data: Any = None,
+        *,
+        cluster_id: int = None,
+        guild_id: int = None,
+    ) -> Any:
+        """|coro|
+
+        Sends a request to another cluster
+
+        Parameters
+        ----------
+        op: :class:`str`
+            Name of the request
+        data: Any
+            JSON serializable data to send
+        cluster_id: :class:`int`
+            Cluster to send the request to
+        guild_id: :class:`int`
+            Alternatively, send the request to the cluster running this guild
+        """
+        if cluster_id is None and guild_id is None:
+            raise ValueError("Either cluster_id or guild_id must be provided")
+
+        return await self._get_connection().request(
+            "request",
+            {"op": op, "d": data, "cluster_id": cluster_id, "guild_id": guild_id},
+        )
+
+    async def broadcast(self, op: str, data: Any = None) -> Dict[int, Any]:
+        """|coro|
+
+        Sends a request to every cluster, including this one.
+        Returns a mapping of cluster ids and their responses,
+        clusters which failed to respond are mapped to ``None``.
+
+        Parameters
+        ----------
+        op: :class:`str`
+            Name of the request
+        data: Any
+            JSON serializable data to send
+        """
+        results = await self._get_connection().request(
+            "broadcast", {"op": op, "d": data}
+        )
+
+        # JSON keys are always strings
+        return {int(cluster_id): result for cluster_id, result in results.items()}
@@ -0,0 +1,307 @@
+"""
+REST ratelimits shared between processes using the same token.
+
+Buckets are kept by a :class:`RatelimitServer` listening on a local port,
+processes acquire buckets through it using :class:`SharedHTTPRatelimiter`.
+As the server handles every acquisition on a single event loop,
+acquiring a bucket is atomic across processes.
+
+.. rubric:: Sharing ratelimits
+
+.. code-block:: py
+
+    from acord.core.ratelimit_server import SharedHTTPRatelimiter
+
+    # Every process uses the same port,
+    # the first process to start hosts the server.
+    client.http = HTTPClient(
+        client,
+        ratelimiter=SharedHTTPRatelimiter(port=6132),
+        global_ratelimit=False,
+    )
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Any, NamedTuple, Optional, Set
+
+from pydantic import PrivateAttr
+
+from acord.errors import IPCError
+
+from .ipc import IPCConnection
+from .ratelimiter import (
+    DefaultHTTPRatelimiter,
+    GlobalRatelimit,
+    HTTPRatelimiter,
+    RequestPriority,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class _RouteKey(NamedTuple):
+    # What the ratelimiter needs to know about a route
+    template: str
+    major_parameters: str
+
+
+class RatelimitServer(object):
+    """Holds ratelimit state for every connected process.
+
+    Parameters
+    ----------
+    host: :class:`str`
+        Host to listen on
+    port: :class:`int`
+        Port to listen on
+    global_ratelimit: :class:`GlobalRatelimit`
+        Token bucket shared by every process, ``None`` to disable it
+
+    Attributes
+    ----------
+    ratelimiter: :class:`DefaultHTTPRatelimiter`
+        Ratelimiter holding the shared buckets
+    """
+
+    def __init__(
+        self,
+        *,
+        host: str = "127.0.0.1",
+        port: int,
+        global_ratelimit: Optional[GlobalRatelimit] = None,
+    ) -> None:
+        self.host = host
+        self.port = port
+        self.global_ratelimit = global_ratelimit or GlobalRatelimit()
+
+        self.ratelimiter = DefaultHTTPRatelimiter(max_requests=(10000, (60 * 10)))
+        self.connections: Set[IPCConnection] = set()
+
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    async def start(self) -> None:
+        """|coro|
+
+        Starts listening for processes
+
+        Raises
+        ------
+        OSError
+            The port is already in use
+        """
+        self._server = await asyncio.start_server(
+            self._on_connection, self.host, self.port
+        )
+
+        logger.info(f"Ratelimit server listening on {self.host}:{self.port}")
+
+    async def close(self) -> None:
+        """|coro|
+
+        Stops the server
+        """
+        for connection in self.connections:
+            connection.close()
+
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+
+    async def _on_connection(self, reader, writer) -> None:
+        handlers = {
+            "acquire": self._acquire,
+            "update": self._update,
+            "global": self._global,
+        }
+        connection = IPCConnection(reader, writer, handlers)
+
+        self.connections.add(connection)
+
+        try:
+            await connection.listen()
+        finally:
+            self.connections.discard(connection)
+
+    async def _acquire(self, data) -> None:
+        route = _RouteKey(data["template"], data["major_parameters"])
+        priority = RequestPriority(data.get("priority", RequestPriority.NORMAL))
+
+        await self.ratelimiter.acquire(route, priority=priority)
+
+        if self.global_ratelimit is not None:
+            await self.global_ratelimit.acquire(priority=priority)
+
+    async def _update(self, data) -> None:
+        route = _RouteKey(data["template"], data["major_parameters"])
+
+        self.ratelimiter.update(route, data["headers"])
+
+    async def _global(self, data) -> None:
+        self.ratelimiter.global_lock_set(data["retry_after"])
+
+
+class SharedHTTPRatelimiter(HTTPRatelimiter):
+    """A ratelimiter which keeps its buckets in a :class:`RatelimitServer`,
+    can be used as a drop in for the ``ratelimiter`` of :class:`HTTPClient`.
+
+    If no server is listening and ``host_server`` is true,
+    this process starts one. Should the server become unreachable,
+    requests fall back to a local :class:`DefaultHTTPRatelimiter`
+    until a connection can be made again.
+
+    .. note::
+        The server also applies a :class:`GlobalRatelimit` shared by every process,
+        so ``global_ratelimit`` of the :class:`HTTPClient` should be disabled.
+    """
+
+    max_requests: Any = (10000, (60 * 10))
+    host: str = "127.0.0.1"
+    """ Host of the server """
+    port: int
+    """ Port of the server """
+    host_server: bool = True
+    """ Whether to start the server if it isnt running """
+
+    _connection: Optional[IPCConnection] = PrivateAttr(None)
+    _server: Optional[RatelimitServer] = PrivateAttr(None)
+    _connect_lock: Optional[asyncio.Lock] = PrivateAttr(None)
+    _fallback: DefaultHTTPRatelimiter = PrivateAttr(None)
+    _tasks: Set[asyncio.Task] = PrivateAttr(default_factory=set)
+
+    def __init__(self, **kwds) -> None:
+        super().__init__(**kwds)
+
+        self._fallback = DefaultHTTPRatelimiter(max_requests=self.max_requests)
+
+    @property
+    def connected(self) -> bool:
+        return self._connection is not None and not self._connection.closed
+
+    async def _connect(self) -> Optional[IPCConnection]:
+        if self.connected:
+            return self._connection
+
+        if self._connect_lock is None:
+            self._connect_lock = asyncio.Lock()
+
+        async with self._connect_lock:
+            if self.connected:
+                return self._connection
+
+            try:
+                reader, writer = await asyncio.open_connection(self.host, self.port)
+            except OSError:
+                if not self.host_server or self._server is not None:
+                    return None
+
+                # Nobody is hosting the server, so we host it
+                server = RatelimitServer(host=self.host, port=self.port)
+
+                try:
+                    await server.start()
+                    self._server = server
+                except OSError:
+                    # Another process started it first
+                    pass
+
+                try:
+                    reader, writer = await asyncio.open_connection(
+                        self.host, self.port
+                    )
+                except OSError:
+                    return None
+
+            self._connection = connection = IPCConnection(reader, writer, {})
+            self._spawn(connection.listen())
+
+            logger.info(f"Connected to ratelimit server on {self.host}:{self.port}")
+            return connection
+
+    def _spawn(self, coro) -> None:
+        task = asyncio.get_event_loop().create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def _drop(self, connection: IPCConnection) -> None:
+        # Closes a broken connection so the next request reconnects
+        connection.close()
+
+        if self._connection is connection:
+            self._connection = None
+
+    async def _send(self, op: str, data: Any) -> None:
+        connection = None
+
+        try:
+            connection = await self._connect()
+
+            if connection is not None:
+                await connection.request(op, data)
+        except (IPCError, OSError) as exc:
+            logger.debug(f"Failed to send {op} to ratelimit server", exc_info=exc)
+
+            if connection is not None and isinstance(exc, OSError):
+                self._drop(connection)
+
+    async def acquire(
+        self, route, *, priority: RequestPriority = RequestPriority.NORMAL
+    ) -> None:
+        connection = await self._connect()
+
+        if connection is not None:
+            try:
+                return await connection.request(
+                    "acquire",
+                    {
+                        "template": route.template,
+                        "major_parameters": route.major_parameters,
+                        "priority": int(priority),
+                    },
+                )
+            except (IPCError, OSError) as exc:
+                # Writes to a dead server raise ConnectionResetError or BrokenPipeError
+                logger.warning("Lost connection to ratelimit server, using local buckets")
+
+                if isinstance(exc, OSError):
+                    self._drop(connection)
+
+        await self._fallback.acquire(route, priority=priority)
+
+    def update(self, route, headers: dict) -> None:
+        # Keeps the local buckets warm in case the server is lost
+        self._fallback.update(route, headers)
+
+        self._spawn(
+            self._send(
+                "update",
+                {
+                    "template": route.template,
+                    "major_parameters": route.major_parameters,
+                    "headers": headers,
+                },
+            )
+        )
+
+    def increment(self, bucket: str, /) -> None:
+        self._fallback.increment(bucket)
+
+    def add_bucket(self, bucket: str, data: dict, /) -> None:
+        self._fallback.add_bucket(bucket, data)
+
+    def bucket_is_limited(self, bucket: str, /) -> bool:
+        return self._fallback.bucket_is_limited(bucket)
+
+    async def hold_bucket(self, bucket: str, /) -> None:
+        await self._fallback.hold_bucket(bucket)
+
+    def global_lock_set(self, released_at: int, /) -> None:
+        self._fallback.global_lock_set(released_at)
+        self._spawn(self._send("global", {"retry_after": released_at}))
+
+    async def hold_global_lock(self) -> None:
+        await self._fallback.hold_global_lock()
+
+    def should_lock(self) -> bool:
+        return self._fallback.should_lock()
@@ -1,16 +1,19 @@
 # Basic ratelimiter for acord
 from __future__ import annotations
 
-from typing import Any, List, Tuple
+from typing import Any, Dict, List, Optional, Tuple, Union
 
 from abc import ABC, abstractmethod
-from pydantic import BaseModel
-from asyncio import get_event_loop, sleep
+from enum import IntEnum
+from pydantic import BaseModel, PrivateAttr
+import asyncio
+import heapq
+import itertools
 import logging
+import time
 
 
 logger = logging.getLogger(__name__)
-loop = get_event_loop()
 
 
 def parse_ratelimit_headers(headers: dict) -> dict:
@@ -36,6 +39,96 @@ def parse_ratelimit_headers(headers: dict) -> dict:
     return d
 
 
+class RequestPriority(IntEnum):
+    """Lanes requests wait in,
+    lower priorities are let through first when waiting on a bucket or the global limit.
+    """
+
+    INTERACTIVE = 0
+    """ Requests a user is waiting on, such as interaction responses """
+    NORMAL = 1
+    """ Default priority of requests """
+    BACKGROUND = 2
+    """ Bulk jobs, such as pruning or editing many members """
+
+
+class PriorityLock(object):
+    """An :class:`asyncio.Lock` which is handed to waiters in priority order,
+    waiters with the same priority are let through in the order they arrived.
+    """
+
+    __slots__ = ("_locked", "_waiters", "_counter")
+
+    def __init__(self) -> None:
+        self._locked = False
+        self._waiters: List[list] = []
+        self._counter = itertools.count()
+
+    def locked(self) -> bool:
+        return self._locked
+
+    @property
+    def waiting(self) -> int:
+        """Number of callers waiting for the lock"""
+        return sum(1 for *_, future in self._waiters if not future.done())
+
+    async def acquire(
+        self, priority: int = RequestPriority.NORMAL, order: Optional[int] = None
+    ) -> int:
+        """|coro|
+
+        Waits for the lock, returns the position of the caller in its lane.
+        Passing the position back in keeps the place of a caller which released the lock early.
+        """
+        if order is None:
+            order = next(self._counter)
+
+        if not self._locked and not self._waiters:
+            self._locked = True
+            return order
+
+        future = asyncio.get_event_loop().create_future()
+        heapq.heappush(self._waiters, [priority, order, future])
+
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # Lock was handed to us as we were cancelled, pass it on
+                self.release()
+            raise
+
+        return order
+
+    def preempted(self, priority: int, order: int) -> bool:
+        """Whether a caller waiting for the lock is ahead of the holder"""
+        waiters = self._waiters
+
+        while waiters and waiters[0][2].done():
+            # Cancelled waiters
+            heapq.heappop(waiters)
+
+        return bool(waiters) and (waiters[0][0], waiters[0][1]) < (priority, order)
+
+    def release(self) -> None:
+        while self._waiters:
+            *_, future = heapq.heappop(self._waiters)
+
+            if not future.done():
+                # Ownership moves straight to the waiter, the lock stays locked
+                future.set_result(None)
+                return
+
+        self._locked = False
+
+
+def _lane(priority: Union[bool, int]) -> RequestPriority:
+    # Booleans predate lanes, ``True`` meant an interactive request
+    if isinstance(priority, bool):
+        return RequestPriority.INTERACTIVE if priority else RequestPriority.NORMAL
+    return RequestPriority(priority)
+
+
 class HTTPRatelimiter(ABC, BaseModel):
     """An ABC for building ratelimiters.
 
@@ -133,91 +226,419 @@ async def hold_global_lock(self) -> None:
     def should_lock(self) -> bool:
         """Checks whether requests should be locked"""
 
+    async def acquire(
+        self, route, *, priority: RequestPriority = RequestPriority.NORMAL
+    ) -> None:
+        """|coro|
+
+        Called before a request is made to a route,
+        blocks until the request can be made.
+
+        By default this checks the global lock and :attr:`Route.bucket`,
+        override it along with :meth:`HTTPRatelimiter.update` for more control.
+
+        Parameters
+        ----------
+        route: :class:`Route`
+            Route the request is being made to
+        priority: :class:`RequestPriority`
+            Lane of the request, requests in lower lanes should be let through first
+        """
+        if self.global_lock:
+            await self.hold_global_lock()
+
+        if self.bucket_is_limited(route.bucket):
+            await self.hold_bucket(route.bucket)
+
+    def update(self, route, headers: dict) -> None:
+        """Called once a request has been made to a route,
+        with the output of :func:`parse_ratelimit_headers`.
+
+        .. note::
+            This is also called if the request failed,
+            in which case ``headers`` is empty.
+
+        Parameters
+        ----------
+        route: :class:`Route`
+            Route the request was made to
+        headers: :class:`dict`
+            Ratelimit headers sent by discord
+        """
+        if headers:
+            self.add_bucket(route.bucket, headers)
+
+
+class GlobalRatelimit(object):
+    """A token bucket limiting the number of requests made across every route.
+
+    Tokens refill continuously at ``rate`` per ``per`` seconds,
+    ``reserve`` tokens can only be used by priority requests such as interaction callbacks,
+    so bursts of normal requests never delay responding to an interaction.
+
+    Parameters
+    ----------
+    rate: :class:`int`
+        Number of requests allowed per ``per`` seconds, defaults to ``50``
+    per: :class:`float`
+        Seconds over which ``rate`` requests are allowed, defaults to ``1``
+    reserve: :class:`int`
+        Tokens kept back for priority requests, defaults to ``5``
+    """
+
+    __slots__ = ("rate", "per", "reserve", "_tokens", "_updated_at", "_lock")
+
+    def __init__(self, rate: int = 50, per: float = 1.0, *, reserve: int = 5) -> None:
+        if reserve >= rate:
+            raise ValueError("Reserve must be lower than the rate")
+
+        self.rate = rate
+        self.per = per
+        self.reserve = reserve
+
+        self._tokens = float(rate)
+        self._updated_at = time.monotonic()
+        self._lock = PriorityLock()
+
+    def __repr__(self) -> str:
+        return f"GlobalRatelimit(tokens={self.tokens:.2f}, rate={self.rate}, per={self.per})"
+
+    def _refill(self) -> float:
+        now = time.monotonic()
+
+        self._tokens = min(
+            self.rate, self._tokens + (now - self._updated_at) * (self.rate / self.per)
+        )
+        self._updated_at = now
+
+        return self._tokens
+
+    @property
+    def tokens(self) -> float:
+        """Number of tokens currently available, including the reserve"""
+        return self._refill()
+
+    @property
+    def available(self) -> float:
+        """Number of tokens available to normal requests"""
+        return max(self._refill() - self.reserve, 0.0)
+
+    async def _wait(self, floor: int) -> None:
+        while (tokens := self._refill()) < floor + 1:
+            await asyncio.sleep((floor + 1 - tokens) * (self.per / self.rate))
+
+    async def _take(self, floor: int) -> None:
+        await self._wait(floor)
+        self._tokens -= 1
+
+    async def acquire(self, *, priority: Union[bool, RequestPriority] = False) -> None:
+        """|coro|
+
+        Takes a token, waiting until one is available
+
+        Parameters
+        ----------
+        priority: Union[:class:`bool`, :class:`RequestPriority`]
+            Lane of the request, ``True`` is the same as :attr:`RequestPriority.INTERACTIVE`.
+            Interactive requests may use the reserve and skip the queue,
+            normal requests are let through before background requests.
+        """
+        lane = _lane(priority)
+
+        if lane is RequestPriority.INTERACTIVE:
+            return await self._take(0)
+
+        order = await self._lock.acquire(lane)
+
+        try:
+            while True:
+                await self._wait(self.reserve)
+
+                if self._lock.preempted(lane, order):
+                    # A higher lane arrived whilst we waited, it goes first
+                    self._lock.release()
+                    await self._lock.acquire(lane, order)
+                    continue
+
+                self._tokens -= 1
+                return
+        finally:
+            self._lock.release()
+
+
+def is_priority_route(route) -> bool:
+    """Whether a route may use the reserve of :class:`GlobalRatelimit`,
+    true for interaction callbacks and webhook token routes.
+    """
+    _, _, path = route.template.partition(" ")
+
+    return path.startswith(("/interactions/", "/webhooks/{webhook_id}/{token}"))
+
 
 # Default implementations
 
 
+class RatelimitBucket(object):
+    """Ratelimit state of a single bucket.
+
+    Callers reserve a request with :meth:`RatelimitBucket.acquire`,
+    which waits in order of priority then arrival when the bucket has no requests remaining.
+    Until discord has sent the limits of a bucket,
+    only one request is allowed in flight.
+
+    Attributes
+    ----------
+    key: :class:`str`
+        Key of the bucket, ``bucket_hash:major_parameters``
+    limit: Optional[:class:`int`]
+        Number of requests allowed per window, ``None`` if not known yet
+    remaining: :class:`int`
+        Number of requests which can still be made in this window
+    reset_at: Optional[:class:`float`]
+        :func:`time.monotonic` timestamp of when the window resets
+    """
+
+    __slots__ = ("key", "limit", "remaining", "reset_at", "_lock", "_updated")
+
+    UPDATE_TIMEOUT = 30
+
+    def __init__(self, key: str) -> None:
+        self.key = key
+        self.limit: Optional[int] = None
+        self.remaining = 1
+        self.reset_at: Optional[float] = None
+
+        self._lock = PriorityLock()
+        self._updated = asyncio.Event()
+
+    def __repr__(self) -> str:
+        return f"RatelimitBucket(key={self.key!r}, remaining={self.remaining}, limit={self.limit})"
+
+    @property
+    def waiting(self) -> int:
+        """Number of requests waiting for this bucket"""
+        return self._lock.waiting + self._lock.locked()
+
+    def _refill(self, now: float) -> None:
+        if self.reset_at is not None and now >= self.reset_at:
+            self.remaining = self.limit if self.limit is not None else 1
+            self.reset_at = None
+
+    async def acquire(self, priority: RequestPriority = RequestPriority.NORMAL) -> None:
+        """|coro|
+
+        Reserves a request, waiting until one is available
+
+        Parameters
+        ----------
+        priority: :class:`RequestPriority`
+            Lane of the request
+        """
+        # The lock is held whilst waiting,
+        # so requests are let through in order of priority then arrival.
+        order = await self._lock.acquire(priority)
+
+        try:
+            while True:
+                now = time.monotonic()
+                self._refill(now)
+
+                if self.remaining > 0:
+                    if self._lock.preempted(priority, order):
+                        # A higher lane arrived whilst we waited, it goes first
+                        self._lock.release()
+                        await self._lock.acquire(priority, order)
+                        continue
+
+                    self.remaining -= 1
+                    return
+
+                if self.reset_at is None:
+                    # Waiting for an in flight request to tell us the limits
+                    self._updated.clear()
+
+                    try:
+                        await asyncio.wait_for(
+                            self._updated.wait(), self.UPDATE_TIMEOUT
+                        )
+                    except asyncio.TimeoutError:
+                        # The request never reported back, dont wait on it forever
+                        self.remaining += 1
+                else:
+                    logger.debug(
+                        f"Bucket {self.key} is exhausted, waiting {self.reset_at - now:.2f} seconds"
+                    )
+                    await asyncio.sleep(self.reset_at - now)
+        finally:
+            self._lock.release()
+
+    def update(self, data: dict) -> None:
+        """Updates the bucket from the headers of a response
+
+        Parameters
+        ----------
+        data: :class:`dict`
+            Output of :func:`parse_ratelimit_headers`,
+            an empty dict if the request failed.
+        """
+        if "remaining" not in data or "reset" not in data:
+            if self.limit is None:
+                # Request failed before we learnt anything, let the next one try
+                self.remaining += 1
+        else:
+            now = time.monotonic()
+            reset_at = now + data["reset"]
+            remaining = int(data["remaining"])
+
+            if self.reset_at is None or reset_at > self.reset_at + 0.5:
+                # New window
+                self.remaining = remaining
+            else:
+                # Responses can arrive out of order, trust the lowest count
+                self.remaining = min(self.remaining, remaining)
+
+            self.limit = int(data.get("limit", self.limit or 1))
+            self.reset_at = reset_at
+
+        self._updated.set()
+
+
 class DefaultHTTPRatelimiter(HTTPRatelimiter):
+    """Ratelimiter which follows discords bucket hashes.
+
+    Routes are identified by :attr:`Route.template`,
+    once a response for a route is received the bucket hash sent by discord is learnt.
+    Buckets are then keyed by the hash and :attr:`Route.major_parameters`,
+    so routes sharing a limit share a :class:`RatelimitBucket`.
+    """
+
     current_requests: int = 0
     global_lock: Any = None
 
+    routes: Dict[str, str] = {}
+    """ Learnt mapping of route templates to bucket hashes """
+
+    _buckets: Dict[str, RatelimitBucket] = PrivateAttr(default_factory=dict)
+    _global_reset_at: float = PrivateAttr(0.0)
+
+    def __init__(self, **kwds) -> None:
+        super().__init__(**kwds)
+
+        # Mutable defaults are shared between instances
+        self.routes = dict()
+        self.cache = self._buckets
+
+    def bucket_key(self, route) -> str:
+        """Gets the key of the bucket a route uses
+
+        Parameters
+        ----------
+        route: :class:`Route`
+            Route to get the key for
+        """
+        bucket_hash = self.routes.get(route.template, route.template)
+        return f"{bucket_hash}:{route.major_parameters}"
+
+    def get_bucket(self, route) -> RatelimitBucket:
+        """Gets the bucket for a route, creating it if needed"""
+        key = self.bucket_key(route)
+
+        try:
+            return self._buckets[key]
+        except KeyError:
+            bucket = self._buckets[key] = RatelimitBucket(key)
+            return bucket
+
+    async def acquire(
+        self, route, *, priority: RequestPriority = RequestPriority.NORMAL
+    ) -> None:
+        if self.global_lock:
+            await self.hold_global_lock()
+
+        await self.get_bucket(route).acquire(priority)
+
+        self.current_requests += 1
+
+    def update(self, route, headers: dict) -> None:
+        key = self.bucket_key(route)
+        bucket = self._buckets.get(key)
+
+        if bucket is None:
+            bucket = self._buckets[key] = RatelimitBucket(key)
+
+        bucket.update(headers)
+
+        bucket_hash = headers.get("bucket")
+
+        if bucket_hash is None or self.routes.get(route.template) == bucket_hash:
+            return
+
+        # Learnt which bucket this route belongs to,
+        # move its state so callers waiting on it keep their place.
+        self.routes[route.template] = bucket_hash
+
+        new_key = f"{bucket_hash}:{route.major_parameters}"
+        self._buckets.pop(key, None)
+
+        if new_key not in self._buckets:
+            bucket.key = new_key
+            self._buckets[new_key] = bucket
+
+        logger.debug(f"Route {route.template} uses bucket {bucket_hash}")
+
     def increment(self, bucket: str, /) -> None:
         self.current_requests += 1
 
-        if not (bucket := self.cache.get(bucket)):
-            bucket["remaining"] -= 1
+        if (_bucket := self._buckets.get(bucket)) is not None:
+            _bucket.remaining = max(_bucket.remaining - 1, 0)
 
     def add_bucket(self, bucket: str, data: dict, /) -> None:
-        self.cache[bucket] = data
+        _bucket = self._buckets.get(bucket)
+
+        if _bucket is None:
+            _bucket = self._buckets[bucket] = RatelimitBucket(bucket)
+
+        _bucket.update(data)
 
     def bucket_is_limited(self, bucket: str, /) -> bool:
-        _bucket = self.cache.get(bucket)
+        _bucket = self._buckets.get(bucket)
 
         if not _bucket:
             return False
 
-        if ((bck := _bucket.get("task")) is not None) or _bucket["remaining"] <= 0:
-            if not bck:
-                task = loop.create_task(self._release_bucket_ratelimit_task(bucket))
-                _bucket["task"] = task
-
-            return True
-        return False
+        _bucket._refill(time.monotonic())
+        return _bucket.remaining <= 0
 
     async def hold_bucket(self, bucket: str, /) -> None:
-        _bucket = self.cache.get(bucket)
+        _bucket = self._buckets.get(bucket)
 
-        if not bucket:
-            return
-
-        task = _bucket.get("task")
-
-        if not task:
+        if not _bucket or _bucket.reset_at is None:
             return
 
         logger.info(f"Bucket {bucket:<20} has been ratelimited, waiting")
 
-        await task
+        await asyncio.sleep(max(_bucket.reset_at - time.monotonic(), 0))
 
     def global_lock_set(self, released_at: int, /) -> None:
-        if self.global_lock is True:
-            raise RuntimeError("Lock has already been set")
-
         self.global_lock = True
         self.locked_until = released_at
 
-        self.global_task = loop.create_task(self._def_release_global_lock_task())
+        self._global_reset_at = max(
+            self._global_reset_at, time.monotonic() + released_at
+        )
 
     async def hold_global_lock(self) -> None:
         if not self.global_lock:
             return
         logger.info("REST Api has been ratelimited globally, waiting")
 
-        await self.global_task
+        while (wait := self._global_reset_at - time.monotonic()) > 0:
+            await asyncio.sleep(wait)
+
+        self.global_lock = False
+        self.locked_until = None
 
     def should_lock(self) -> bool:
         if self.current_requests >= self.max_requests[0]:
             return True
         return False
-
-    async def _reset_requests_task(self) -> None:
-        while True:
-            await sleep(self.max_requests[1])
-
-            self.current_requests = 0
-
-    async def _release_global_lock_task(self) -> None:
-        await sleep(self.locked_until)
-
-        self.locked_until = None
-        self.global_lock = False
-
-    async def _release_bucket_ratelimit_task(self, bucket: str) -> None:
-        _bucket = self.cache.get(bucket)
-
-        if not _bucket:
-            return
-
-        await sleep(_bucket["reset"])
-        # Just in case it was popped earlier
-        self.cache.pop(bucket, None)
@@ -0,0 +1,281 @@
+"""
+Caches the responses of GET requests for a configurable time.
+
+Caching is opt-in for each route template,
+entries are invalidated when the object they hold is changed
+through the same :class:`HTTPClient` or by a gateway event.
+
+.. rubric:: Caching guild roles and emojis
+
+.. code-block:: py
+
+    from acord.core.response_cache import ResponseCache
+
+    cache = ResponseCache(
+        {
+            "GET /guilds/{guild_id}/roles": 60,
+            "GET /guilds/{guild_id}/emojis": 300,
+        }
+    )
+    client.http = HTTPClient(client, response_cache=cache)
+"""
+from __future__ import annotations
+
+import time
+from collections import OrderedDict
+from typing import Any, Dict, NamedTuple, Optional, Set, Tuple
+
+# Gateway events mapped to the cached routes they change,
+# as (field of the event data holding the major parameter, path, match sub paths).
+GATEWAY_INVALIDATIONS: Dict[str, Tuple[Tuple[str, str, bool], ...]] = {
+    "GUILD_UPDATE": (("id", "/guilds/{guild_id}", False),),
+    "GUILD_DELETE": (("id", "/guilds/{guild_id}", True),),
+    "GUILD_ROLE_CREATE": (("guild_id", "/guilds/{guild_id}/roles", True),),
+    "GUILD_ROLE_UPDATE": (("guild_id", "/guilds/{guild_id}/roles", True),),
+    "GUILD_ROLE_DELETE": (("guild_id", "/guilds/{guild_id}/roles", True),),
+    "GUILD_EMOJIS_UPDATE": (("guild_id", "/guilds/{guild_id}/emojis", True),),
+    "GUILD_STICKERS_UPDATE": (("guild_id", "/guilds/{guild_id}/stickers", True),),
+    "GUILD_MEMBER_ADD": (("guild_id", "/guilds/{guild_id}/members", True),),
+    "GUILD_MEMBER_UPDATE": (("guild_id", "/guilds/{guild_id}/members", True),),
+    "GUILD_MEMBER_REMOVE": (("guild_id", "/guilds/{guild_id}/members", True),),
+    "GUILD_BAN_ADD": (("guild_id", "/guilds/{guild_id}/bans", True),),
+    "GUILD_BAN_REMOVE": (("guild_id", "/guilds/{guild_id}/bans", True),),
+    "GUILD_SCHEDULED_EVENT_CREATE": (
+        ("guild_id", "/guilds/{guild_id}/scheduled-events", True),
+    ),
+    "GUILD_SCHEDULED_EVENT_UPDATE": (
+        ("guild_id", "/guilds/{guild_id}/scheduled-events", True),
+    ),
+    "GUILD_SCHEDULED_EVENT_DELETE": (
+        ("guild_id", "/guilds/{guild_id}/scheduled-events", True),
+    ),
+    "CHANNEL_CREATE": (("guild_id", "/guilds/{guild_id}/channels", True),),
+    "CHANNEL_UPDATE": (
+        ("guild_id", "/guilds/{guild_id}/channels", True),
+        ("id", "/channels/{channel_id}", False),
+    ),
+    "CHANNEL_DELETE": (
+        ("guild_id", "/guilds/{guild_id}/channels", True),
+        ("id", "/channels/{channel_id}", True),
+    ),
+    "MESSAGE_UPDATE": (("channel_id", "/channels/{channel_id}/messages", True),),
+    "MESSAGE_DELETE": (("channel_id", "/channels/{channel_id}/messages", True),),
+    "MESSAGE_DELETE_BULK": (
+        ("channel_id", "/channels/{channel_id}/messages", True),
+    ),
+    "CHANNEL_PINS_UPDATE": (("channel_id", "/channels/{channel_id}/pins", True),),
+    "WEBHOOKS_UPDATE": (
+        ("guild_id", "/guilds/{guild_id}/webhooks", True),
+        ("channel_id", "/channels/{channel_id}/webhooks", True),
+    ),
+    "INVITE_CREATE": (("guild_id", "/guilds/{guild_id}/invites", True),),
+    "INVITE_DELETE": (("guild_id", "/guilds/{guild_id}/invites", True),),
+}
+
+
+class _Entry(NamedTuple):
+    expires_at: float
+    path: str
+    major_parameters: str
+    response: Any
+
+
+class ResponseCache(object):
+    """A TTL cache for the responses of GET requests
+
+    Parameters
+    ----------
+    ttls: Dict[:class:`str`, :class:`float`]
+        Mapping of :attr:`Route.template` to the seconds its responses are cached for,
+        e.g. ``{"GET /guilds/{guild_id}/roles": 60}``
+    default_ttl: :class:`float`
+        Seconds to cache routes not in ``ttls`` for, defaults to not caching them
+    max_size: :class:`int`
+        Maximum number of responses cached,
+        the oldest responses are removed first.
+
+    Attributes
+    ----------
+    hits: :class:`int`
+        Number of requests answered from the cache
+    misses: :class:`int`
+        Number of cacheable requests which were not cached
+    invalidations: :class:`int`
+        Number of responses removed before they expired
+    """
+
+    def __init__(
+        self,
+        ttls: Dict[str, float] = None,
+        *,
+        default_ttl: Optional[float] = None,
+        max_size: int = 1000,
+    ) -> None:
+        self.ttls = dict(ttls or {})
+        self.default_ttl = default_ttl
+        self.max_size = max_size
+
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+        self._entries: OrderedDict[tuple, _Entry] = OrderedDict()
+        self._by_major: Dict[str, Set[tuple]] = dict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def ttl_for(self, route) -> Optional[float]:
+        """Gets the seconds a route is cached for, ``None`` if it isnt cached"""
+        return self.ttls.get(route.template, self.default_ttl)
+
+    @staticmethod
+    def _key(route, token: str) -> tuple:
+        return (str(route.url), token)
+
+    def get(self, route, token: str) -> Optional[Any]:
+        """Gets a cached response for a route
+
+        Parameters
+        ----------
+        route: :class:`Route`
+            Route being requested
+        token: :class:`str`
+            Token the request is made with
+        """
+        key = self._key(route, token)
+        entry = self._entries.get(key)
+
+        if entry is None:
+            self.misses += 1
+            return None
+
+        if entry.expires_at <= time.monotonic():
+            self._remove(key)
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return entry.response
+
+    def set(self, route, token: str, response: Any) -> None:
+        """Caches a response, does nothing if the route is not cached
+
+        Parameters
+        ----------
+        route: :class:`Route`
+            Route which was requested
+        token: :class:`str`
+            Token the request was made with
+        response: :class:`~aiohttp.ClientResponse`
+            Response to cache, its body must have been read
+        """
+        ttl = self.ttl_for(route)
+
+        if ttl is None:
+            return
+
+        key = self._key(route, token)
+        _, _, path = route.template.partition(" ")
+
+        self._remove(key)
+        self._entries[key] = _Entry(
+            time.monotonic() + ttl, path, route.major_parameters, response
+        )
+        self._by_major.setdefault(route.major_parameters, set()).add(key)
+
+        while len(self._entries) > self.max_size:
+            self._remove(next(iter(self._entries)))
+
+    def _remove(self, key: tuple) -> None:
+        entry = self._entries.pop(key, None)
+
+        if entry is None:
+            return
+
+        keys = self._by_major.get(entry.major_parameters)
+
+        if keys is not None:
+            keys.discard(key)
+
+            if not keys:
+                del self._by_major[entry.major_parameters]
+
+    def invalidate(self, path: str, major_parameters: str, *, prefix: bool = True) -> int:
+        """Removes cached responses, returns the number removed
+
+        Parameters
+        ----------
+        path: :class:`str`
+            Path of the route template, e.g. ``/guilds/{guild_id}/roles``
+        major_parameters: :class:`str`
+            :attr:`Route.major_parameters` of the routes to remove
+        prefix: :class:`bool`
+            Whether routes under ``path`` are removed as well
+        """
+        keys = self._by_major.get(str(major_parameters))
+
+        if not keys:
+            return 0
+
+        removed = 0
+
+        for key in list(keys):
+            entry_path = self._entries[key].path
+
+            if entry_path == path or (
+                prefix and entry_path.startswith(path.rstrip("/") + "/")
+            ):
+                self._remove(key)
+                removed += 1
+
+        self.invalidations += removed
+        return removed
+
+    def invalidate_route(self, route) -> int:
+        """Removes responses changed by a request to a route,
+        such as a PATCH to a role removing the cached roles of the guild.
+
+        Parameters
+        ----------
+        route: :class:`Route`
+            Route a modifying request was made to
+        """
+        _, _, path = route.template.partition(" ")
+        segments = path.split("/")
+
+        # Modifying an object changes the collection its in
+        while segments and segments[-1] == "{id}":
+            segments.pop()
+
+        return self.invalidate("/".join(segments), route.major_parameters)
+
+    def invalidate_event(self, event: str, data: Any) -> int:
+        """Removes responses changed by a gateway event
+
+        Parameters
+        ----------
+        event: :class:`str`
+            Name of the event, e.g. ``GUILD_ROLE_UPDATE``
+        data: Any
+            Data of the event
+        """
+        rules = GATEWAY_INVALIDATIONS.get(event)
+
+        if not rules or not self._entries or not isinstance(data, dict):
+            return 0
+
+        removed = 0
+
+        for field, path, prefix in rules:
+            value = data.get(field)
+
+            if value is not None:
+                removed += self.invalidate(path, value, prefix=prefix)
+
+        return removed
+
+    def clear(self) -> None:
+        """Removes every cached response"""
+        self._entries.clear()
+        self._by_major.clear()
@@ -0,0 +1,191 @@
+"""
+Retrying REST requests which failed for reasons outside of the request itself.
+
+.. rubric:: Configuring retries
+
+.. code-block:: py
+
+    from acord.core.retry import RetryPolicy
+
+    client.http = HTTPClient(
+        client,
+        retry_policy=RetryPolicy(max_attempts=5, backoff=1.0),
+    )
+"""
+from __future__ import annotations
+
+import asyncio
+import io
+import random
+from typing import Any, FrozenSet, List, NamedTuple, Optional, Tuple
+
+import aiohttp
+from aiohttp import FormData
+
+# Methods which have the same effect when sent more than once
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+
+# Errors raised before a response was received
+CONNECTION_ERRORS = (aiohttp.ClientConnectionError, asyncio.TimeoutError)
+
+
+class RetryPolicy(object):
+    """Decides whether and when a failed request is retried.
+
+    Ratelimited requests were never processed by discord,
+    so they are retried regardless of their method.
+    Server errors and lost connections may have been processed,
+    so they are only retried for idempotent methods unless ``retry_non_idempotent`` is set.
+
+    Parameters
+    ----------
+    max_attempts: :class:`int`
+        Maximum number of times a request is sent, including the first attempt
+    backoff: :class:`float`
+        Seconds waited before the first retry, doubled for every retry after
+    max_backoff: :class:`float`
+        Maximum seconds waited between attempts
+    jitter: :class:`bool`
+        Whether to wait a random duration up to the backoff,
+        so clients failing at the same time dont retry at the same time
+    statuses: FrozenSet[:class:`int`]
+        Status codes which are retried, defaults to ``500``, ``502``, ``503`` and ``504``
+    retry_non_idempotent: :class:`bool`
+        Whether requests such as POST are retried after a server or connection error
+    """
+
+    __slots__ = (
+        "max_attempts",
+        "backoff",
+        "max_backoff",
+        "jitter",
+        "statuses",
+        "retry_non_idempotent",
+    )
+
+    def __init__(
+        self,
+        max_attempts: int = 3,
+        *,
+        backoff: float = 0.5,
+        max_backoff: float = 30.0,
+        jitter: bool = True,
+        statuses: FrozenSet[int] = frozenset({500, 502, 503, 504}),
+        retry_non_idempotent: bool = False,
+    ) -> None:
+        if max_attempts < 1:
+            raise ValueError("max_attempts must be at least 1")
+
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.jitter = jitter
+        self.statuses = frozenset(statuses)
+        self.retry_non_idempotent = retry_non_idempotent
+
+    def __repr__(self) -> str:
+        return f"RetryPolicy(max_attempts={self.max_attempts}, backoff={self.backoff})"
+
+    def is_idempotent(self, method: str) -> bool:
+        return self.retry_non_idempotent or method.upper() in IDEMPOTENT_METHODS
+
+    def should_retry(
+        self,
+        method: str,
+        attempt: int,
+        *,
+        status: Optional[int] = None,
+        error: Optional[BaseException] = None,
+    ) -> bool:
+        """Whether a request should be sent again
+
+        Parameters
+        ----------
+        method: :class:`str`
+            Method of the request
+        attempt: :class:`int`
+            Number of the attempt which failed, starting at ``1``
+        status: :class:`int`
+            Status of the response, ``None`` if no response was received
+        error: :class:`BaseException`
+            Error raised whilst sending the request
+        """
+        if attempt >= self.max_attempts:
+            return False
+
+        if status == 429:
+            return True
+
+        if error is not None:
+            return isinstance(error, CONNECTION_ERRORS) and self.is_idempotent(method)
+
+        return status in self.statuses and self.is_idempotent(method)
+
+    def delay(self, attempt: int) -> float:
+        """Gets the seconds to wait before retrying
+
+        Parameters
+        ----------
+        attempt: :class:`int`
+            Number of the attempt which failed, starting at ``1``
+        """
+        delay = min(self.backoff * (2 ** (attempt - 1)), self.max_backoff)
+
+        if self.jitter:
+            # Full jitter, spreads retries across the whole window
+            return random.uniform(0, delay)
+        return delay
+
+
+class BodySnapshot(NamedTuple):
+    # Fields of a form and the position of each file in it
+    fields: List[Any]
+    positions: List[Tuple[io.IOBase, int]]
+
+
+def snapshot_body(data: Any) -> Optional[BodySnapshot]:
+    """Records the fields of a :class:`~aiohttp.FormData` before it is sent,
+    so it can be rebuilt by :func:`rebuild_body`.
+    """
+    if not isinstance(data, FormData):
+        return None
+
+    positions = []
+
+    for _, _, value in data._fields:
+        if isinstance(value, io.IOBase) and value.seekable():
+            positions.append((value, value.tell()))
+
+    return BodySnapshot(list(data._fields), positions)
+
+
+def rebuild_body(data: Any, snapshot: Optional[BodySnapshot]) -> Any:
+    """Gets a body which can be sent again.
+
+    A :class:`~aiohttp.FormData` is consumed when sent,
+    so a new form is created from the snapshot with its files rewound.
+
+    Raises
+    ------
+    ValueError
+        A file in the body was closed or cannot be rewound
+    """
+    if snapshot is None:
+        return data
+
+    for value, position in snapshot.positions:
+        if value.closed:
+            raise ValueError("File in request body has been closed")
+        value.seek(position)
+
+    rewound = {id(value) for value, _ in snapshot.positions}
+
+    for _, _, value in snapshot.fields:
+        if isinstance(value, io.IOBase) and id(value) not in rewound:
+            raise ValueError("File in request body cannot be rewound")
+
+    form = FormData(quote_fields=data._quote_fields, charset=data._charset)
+    form._fields = list(snapshot.fields)
+    form._is_multipart = data._is_multipart
+
+    return form
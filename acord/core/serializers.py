@@ -0,0 +1,182 @@
+"""
+JSON backends used by acord for encoding and decoding payloads.
+
+The fastest installed library is picked automatically,
+in the order of ``orjson``, ``ujson`` and then the standard library.
+
+.. rubric:: Using a custom backend
+
+.. code-block:: py
+
+    from acord.core import serializers
+
+    class MyBackend(serializers.JSONBackend):
+        name = "my-backend"
+
+        def loads(self, data):
+            ...
+
+        def dumps(self, obj, *, default=None):
+            ...
+
+    serializers.set_backend(MyBackend())
+"""
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Optional, Union
+import json
+
+from pydantic import BaseModel
+from pydantic.json import pydantic_encoder
+
+
+class JSONBackend(ABC):
+    """An ABC for implementing JSON backends"""
+
+    name: str
+    """ Name of the backend """
+
+    @abstractmethod
+    def loads(self, data: Union[str, bytes]) -> Any:
+        """Decodes JSON data
+
+        Parameters
+        ----------
+        data: Union[:class:`str`, :class:`bytes`]
+            Data to decode
+        """
+
+    @abstractmethod
+    def dumps(self, obj: Any, *, default: Optional[Callable] = None) -> str:
+        """Encodes an object to JSON
+
+        Parameters
+        ----------
+        obj: Any
+            Object to encode
+        default: Callable[[Any], Any]
+            Called for objects which cannot be serialized natively
+        """
+
+    def __repr__(self) -> str:
+        return f"<JSONBackend name={self.name}>"
+
+
+class StdlibBackend(JSONBackend):
+    name = "json"
+
+    def loads(self, data: Union[str, bytes]) -> Any:
+        return json.loads(data)
+
+    def dumps(self, obj: Any, *, default: Optional[Callable] = None) -> str:
+        return json.dumps(obj, default=default, separators=(",", ":"))
+
+
+class OrjsonBackend(JSONBackend):
+    name = "orjson"
+
+    def __init__(self) -> None:
+        import orjson
+
+        self._orjson = orjson
+        self._options = orjson.OPT_NON_STR_KEYS
+
+    def loads(self, data: Union[str, bytes]) -> Any:
+        return self._orjson.loads(data)
+
+    def dumps(self, obj: Any, *, default: Optional[Callable] = None) -> str:
+        return self._orjson.dumps(obj, default=default, option=self._options).decode(
+            "utf-8"
+        )
+
+
+class UjsonBackend(JSONBackend):
+    name = "ujson"
+
+    def __init__(self) -> None:
+        import ujson
+
+        self._ujson = ujson
+
+    def loads(self, data: Union[str, bytes]) -> Any:
+        return self._ujson.loads(data)
+
+    def dumps(self, obj: Any, *, default: Optional[Callable] = None) -> str:
+        return self._ujson.dumps(obj, default=default, ensure_ascii=False)
+
+
+BACKENDS = {
+    "orjson": OrjsonBackend,
+    "ujson": UjsonBackend,
+    "json": StdlibBackend,
+}
+
+
+def _find_backend() -> JSONBackend:
+    for backend in BACKENDS.values():
+        try:
+            return backend()
+        except ImportError:
+            continue
+
+
+_backend: JSONBackend = _find_backend()
+
+
+def get_backend() -> JSONBackend:
+    """Returns the backend currently in use"""
+    return _backend
+
+
+def set_backend(backend: Union[str, JSONBackend]) -> JSONBackend:
+    """Sets the JSON backend used by acord
+
+    Parameters
+    ----------
+    backend: Union[:class:`str`, :class:`JSONBackend`]
+        A backend instance, or any of ``orjson``, ``ujson`` and ``json``
+
+    Raises
+    ------
+    ImportError
+        The requested library is not installed
+    """
+    global _backend
+
+    if isinstance(backend, str):
+        try:
+            backend = BACKENDS[backend]()
+        except KeyError:
+            raise ValueError(f"Unknown JSON backend {backend!r}") from None
+
+    if not isinstance(backend, JSONBackend):
+        raise TypeError("Backend must be an instance of JSONBackend")
+
+    _backend = backend
+    return backend
+
+
+def loads(data: Union[str, bytes]) -> Any:
+    """Decodes JSON data using the current backend"""
+    return _backend.loads(data)
+
+
+def dumps(obj: Any, **kwds) -> str:
+    """Encodes an object to JSON using the current backend.
+
+    Pydantic models are encoded the same way as :meth:`~pydantic.BaseModel.json`.
+
+    Parameters
+    ----------
+    obj: Any
+        Object to encode
+    **kwds:
+        Additional kwargs such as ``exclude``,
+        used when encoding models
+    """
+    if isinstance(obj, BaseModel):
+        data = dict(obj._iter(to_dict=True, **kwds))
+        return _backend.dumps(data, default=obj.__json_encoder__)
+
+    return _backend.dumps(obj, default=pydantic_encoder)
@@ -0,0 +1,421 @@
+"""
+Per request tracing for :class:`HTTPClient`.
+
+Traces are timed using :class:`aiohttp.TraceConfig`
+and sent to every sink of a :class:`HTTPTracer` once a request completes.
+
+.. rubric:: Exporting request latency to prometheus
+
+.. code-block:: py
+
+    from acord.core.tracing import HTTPTracer, HistogramSink, LoggingSink
+
+    histograms = HistogramSink()
+    client.http = HTTPClient(
+        client,
+        tracer=HTTPTracer(histograms, LoggingSink()),
+    )
+
+    # Served from your metrics endpoint
+    text = histograms.export()
+"""
+from __future__ import annotations
+
+import bisect
+import logging
+import time
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+import aiohttp
+
+logger = logging.getLogger(__name__)
+
+
+class RequestTrace(NamedTuple):
+    """Timings of a completed request, durations are in seconds.
+
+    Network timings are of the final attempt,
+    ``dns`` and ``connect`` are ``0`` when a pooled connection was reused.
+    """
+
+    route: str
+    """ :attr:`Route.template` of the request """
+    bucket: str
+    """ Bucket hash discord assigned the route, ``unknown`` until it is learnt """
+    status: Optional[int]
+    """ Status of the response, ``None`` if no response was received """
+    error: Optional[str]
+    """ Name of the error raised, if any """
+    total: float
+    """ Time from calling the request to receiving the response headers """
+    ratelimit_wait: float
+    """ Time spent waiting on buckets, the global ratelimit and the background lane """
+    dns: float
+    """ Time resolving the host """
+    connect: float
+    """ Time opening the connection, including the TLS handshake """
+    ttfb: float
+    """ Time from sending the request to receiving the response headers """
+    retries: int
+    """ Number of times the request was retried """
+    size: Optional[int]
+    """ Size of the response body, ``None`` if unknown """
+    reused_connection: bool
+    """ Whether a pooled connection was used """
+
+
+class _ActiveTrace(object):
+    # Mutable state of a request in flight, passed to aiohttp as trace_request_ctx
+    __slots__ = (
+        "route",
+        "started_at",
+        "ratelimit_wait",
+        "attempts",
+        "request_started_at",
+        "dns",
+        "connect",
+        "ttfb",
+        "reused_connection",
+    )
+
+    def __init__(self, route) -> None:
+        self.route = route
+        self.started_at = time.perf_counter()
+        self.ratelimit_wait = 0.0
+        self.attempts = 0
+        self._reset()
+
+    def _reset(self) -> None:
+        self.request_started_at = 0.0
+        self.dns = 0.0
+        self.connect = 0.0
+        self.ttfb = 0.0
+        self.reused_connection = False
+
+    def start_attempt(self) -> None:
+        self.attempts += 1
+        self._reset()
+
+
+class TraceSink(ABC):
+    """An ABC for receiving request traces.
+
+    .. note::
+        Sinks are called on the event loop, so should return quickly.
+    """
+
+    @abstractmethod
+    def emit(self, trace: RequestTrace) -> None:
+        """Called with every completed request
+
+        Parameters
+        ----------
+        trace: :class:`RequestTrace`
+            Trace of the request
+        """
+
+
+class CallbackSink(TraceSink):
+    """Calls a function with every trace
+
+    Parameters
+    ----------
+    callback: Callable[[:class:`RequestTrace`], None]
+        Function to call
+    """
+
+    def __init__(self, callback: Callable[[RequestTrace], None]) -> None:
+        self.callback = callback
+
+    def emit(self, trace: RequestTrace) -> None:
+        self.callback(trace)
+
+
+class LoggingSink(TraceSink):
+    """Logs every trace
+
+    Parameters
+    ----------
+    logger: :class:`logging.Logger`
+        Logger to log to, defaults to the logger of this module
+    level: :class:`int`
+        Level to log at
+    """
+
+    def __init__(
+        self, logger: Optional[logging.Logger] = None, level: int = logging.DEBUG
+    ) -> None:
+        self.logger = logger or logging.getLogger(__name__)
+        self.level = level
+
+    def emit(self, trace: RequestTrace) -> None:
+        if not self.logger.isEnabledFor(self.level):
+            return
+
+        self.logger.log(
+            self.level,
+            f"{trace.route} [{trace.bucket}] -> {trace.status or trace.error} "
+            f"total={trace.total * 1000:.1f}ms wait={trace.ratelimit_wait * 1000:.1f}ms "
+            f"dns={trace.dns * 1000:.1f}ms connect={trace.connect * 1000:.1f}ms "
+            f"ttfb={trace.ttfb * 1000:.1f}ms retries={trace.retries} size={trace.size}",
+        )
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: Tuple[Tuple[str, str], ...]) -> str:
+    return ",".join(f'{name}="{_escape(str(value))}"' for name, value in labels)
+
+
+class Histogram(object):
+    """A prometheus style histogram with labels
+
+    Parameters
+    ----------
+    name: :class:`str`
+        Name of the metric
+    description: :class:`str`
+        Help text of the metric
+    buckets: Tuple[:class:`float`, ...]
+        Upper bounds of each bucket
+    """
+
+    __slots__ = ("name", "description", "buckets", "_series")
+
+    def __init__(
+        self, name: str, description: str, buckets: Tuple[float, ...]
+    ) -> None:
+        self.name = name
+        self.description = description
+        self.buckets = tuple(sorted(buckets))
+        # labels -> [bucket counts..., overflow, sum, count]
+        self._series: Dict[Tuple[Tuple[str, str], ...], List[float]] = dict()
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = tuple(sorted(labels.items()))
+        series = self._series.get(key)
+
+        if series is None:
+            series = self._series[key] = [0] * (len(self.buckets) + 3)
+
+        # Values above every bound land in the overflow slot, counted by +Inf
+        series[bisect.bisect_left(self.buckets, value)] += 1
+        series[-2] += value
+        series[-1] += 1
+
+    def export(self) -> List[str]:
+        lines = [
+            f"# HELP {self.name} {self.description}",
+            f"# TYPE {self.name} histogram",
+        ]
+
+        for labels, series in self._series.items():
+            prefix = _format_labels(labels)
+            prefix = prefix + "," if prefix else ""
+            cumulative = 0
+
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{{{prefix}le="{bound}"}} {cumulative}')
+
+            lines.append(f'{self.name}_bucket{{{prefix}le="+Inf"}} {series[-1]}')
+            lines.append(f"{self.name}_sum{{{prefix.rstrip(',')}}} {series[-2]}")
+            lines.append(f"{self.name}_count{{{prefix.rstrip(',')}}} {series[-1]}")
+
+        return lines
+
+
+class HistogramSink(TraceSink):
+    """Keeps histograms of request timings in memory,
+    labelled by route template and bucket.
+
+    Parameters
+    ----------
+    buckets: Tuple[:class:`float`, ...]
+        Upper bounds in seconds of each histogram bucket
+    prefix: :class:`str`
+        Prefix of every metric name
+    """
+
+    DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+    def __init__(
+        self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS, *, prefix: str = "acord_http"
+    ) -> None:
+        self.prefix = prefix
+        self.histograms = {
+            "total": Histogram(
+                f"{prefix}_request_duration_seconds",
+                "Time taken by REST requests, including ratelimits and retries",
+                buckets,
+            ),
+            "ratelimit_wait": Histogram(
+                f"{prefix}_ratelimit_wait_seconds",
+                "Time REST requests waited on ratelimits",
+                buckets,
+            ),
+            "dns": Histogram(
+                f"{prefix}_dns_seconds", "Time resolving the API host", buckets
+            ),
+            "connect": Histogram(
+                f"{prefix}_connect_seconds",
+                "Time opening connections, including TLS",
+                buckets,
+            ),
+            "ttfb": Histogram(
+                f"{prefix}_ttfb_seconds",
+                "Time from sending a request to receiving its response headers",
+                buckets,
+            ),
+        }
+        # (name, labels) -> value
+        self.counters: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], float] = dict()
+
+    def _increment(self, name: str, value: float, **labels: str) -> None:
+        key = (f"{self.prefix}_{name}", tuple(sorted(labels.items())))
+        self.counters[key] = self.counters.get(key, 0) + value
+
+    def emit(self, trace: RequestTrace) -> None:
+        labels = {"route": trace.route, "bucket": trace.bucket}
+
+        for field, histogram in self.histograms.items():
+            if field in ("dns", "connect") and trace.reused_connection:
+                continue
+            histogram.observe(getattr(trace, field), **labels)
+
+        self._increment(
+            "requests_total", 1, **labels, status=str(trace.status or trace.error)
+        )
+
+        if trace.retries:
+            self._increment("retries_total", trace.retries, **labels)
+
+        if trace.size is not None:
+            self._increment("response_bytes_total", trace.size, **labels)
+
+    def export(self) -> str:
+        """Exports every metric in the prometheus text format"""
+        lines = []
+
+        for histogram in self.histograms.values():
+            lines.extend(histogram.export())
+
+        names = sorted({name for name, _ in self.counters})
+
+        for name in names:
+            lines.append(f"# TYPE {name} counter")
+
+            for (counter, labels), value in self.counters.items():
+                if counter == name:
+                    lines.append(f"{name}{{{_format_labels(labels)}}} {value}")
+
+        return "\n".join(lines) + "\n"
+
+
+class HTTPTracer(object):
+    """Traces requests made by a :class:`HTTPClient`
+
+    Parameters
+    ----------
+    *sinks: :class:`TraceSink`
+        Sinks to send traces to
+
+    Attributes
+    ----------
+    trace_config: :class:`aiohttp.TraceConfig`
+        Trace config added to the session of the client
+    """
+
+    def __init__(self, *sinks: TraceSink) -> None:
+        self.sinks: List[TraceSink] = list(sinks)
+
+        config = aiohttp.TraceConfig()
+        config.on_request_start.append(self._on_request_start)
+        config.on_dns_resolvehost_start.append(self._on_dns_start)
+        config.on_dns_resolvehost_end.append(self._on_dns_end)
+        config.on_connection_create_start.append(self._on_connect_start)
+        config.on_connection_create_end.append(self._on_connect_end)
+        config.on_connection_reuseconn.append(self._on_connection_reused)
+        config.on_request_end.append(self._on_request_end)
+
+        self.trace_config = config
+
+    def add_sink(self, sink: TraceSink) -> None:
+        self.sinks.append(sink)
+
+    def start(self, route) -> _ActiveTrace:
+        return _ActiveTrace(route)
+
+    def finish(
+        self,
+        trace: _ActiveTrace,
+        *,
+        bucket: Optional[str] = None,
+        response: Optional[aiohttp.ClientResponse] = None,
+        error: Optional[BaseException] = None,
+    ) -> None:
+        size = None
+
+        if response is not None:
+            size = response.content_length
+
+            if size is None and getattr(response, "_body", None) is not None:
+                size = len(response._body)
+
+        record = RequestTrace(
+            route=trace.route.template,
+            bucket=bucket or "unknown",
+            status=response.status if response is not None else None,
+            error=type(error).__name__ if error is not None else None,
+            total=time.perf_counter() - trace.started_at,
+            ratelimit_wait=trace.ratelimit_wait,
+            dns=trace.dns,
+            # Opening a connection includes resolving its host
+            connect=max(trace.connect - trace.dns, 0.0),
+            # Fired after the connection was opened
+            ttfb=max(trace.ttfb - trace.connect, 0.0),
+            retries=max(trace.attempts - 1, 0),
+            size=size,
+            reused_connection=trace.reused_connection,
+        )
+
+        for sink in self.sinks:
+            try:
+                sink.emit(record)
+            except Exception as exc:
+                logger.warning(f"Trace sink {sink!r} failed", exc_info=exc)
+
+    @staticmethod
+    def _get(ctx) -> Optional[_ActiveTrace]:
+        trace = ctx.trace_request_ctx
+        return trace if isinstance(trace, _ActiveTrace) else None
+
+    async def _on_request_start(self, session, ctx, params) -> None:
+        if (trace := self._get(ctx)) is not None:
+            trace.request_started_at = time.perf_counter()
+
+    async def _on_dns_start(self, session, ctx, params) -> None:
+        ctx.dns_started_at = time.perf_counter()
+
+    async def _on_dns_end(self, session, ctx, params) -> None:
+        if (trace := self._get(ctx)) is not None:
+            trace.dns += time.perf_counter() - ctx.dns_started_at
+
+    async def _on_connect_start(self, session, ctx, params) -> None:
+        ctx.connect_started_at = time.perf_counter()
+
+    async def _on_connect_end(self, session, ctx, params) -> None:
+        if (trace := self._get(ctx)) is not None:
+            trace.connect += time.perf_counter() - ctx.connect_started_at
+
+    async def _on_connection_reused(self, session, ctx, params) -> None:
+        if (trace := self._get(ctx)) is not None:
+            trace.reused_connection = True
+
+    async def _on_request_end(self, session, ctx, params) -> None:
+        if (trace := self._get(ctx)) is not None:
+            # Fired once the response headers have been received
+            trace.ttfb = time.perf_counter() - trace.request_started_at
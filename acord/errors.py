@@ -81,5 +81,11 @@ class VoiceError(BaseExc):
     """
 
 
+class IPCError(BaseExc):
+    """Raised when a request to another process fails,
+    or the other process raised an error whilst handling it.
+    """
+
+
 class CannotOverideTokenWarning(Warning):
     """Warned when cannot use provided token due to binded token present"""
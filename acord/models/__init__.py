@@ -38,6 +38,7 @@ def increment(self) -> int:
         return self & 0xFFF
 
 
+from .raw import RawPayload, RawMapping, Materializer, slim_payload
 from .partials import PartialChannel, PartialEmoji
 from .user import User
 from .application import Application
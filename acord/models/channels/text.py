@@ -5,6 +5,7 @@
 import pydantic
 
 from acord.core.abc import DISCORD_EPOCH, Route
+from acord.core.ratelimiter import RequestPriority
 from acord.models import Message, Snowflake
 from acord.payloads import (
     ChannelEditPayload,
@@ -24,12 +25,6 @@
 # Standard text channel in a guild
 
 
-async def _pop_task(client, channel_id, *messages) -> None:
-    # Create task to pop all messages in bulk deletion
-    for message in messages:
-        client.cache.remove_message(message.channel_id, message.id)
-
-
 class TextChannel(Channel, ExtendedTextMethods):
     guild_id: int
     """ ID of guild were text channel belongs """
@@ -215,12 +210,10 @@ async def bulk_delete(
             Route("POST", path=f"/channels/{self.id}/messages/bulk-delete"),
             data={"messages": list(ids)},
             headers=headers,
+            priority=RequestPriority.BACKGROUND,
         )
 
-        self.conn.client.loop.create_task(
-            _pop_task(self.conn.client, self.id, *ids),
-            name=f"acord: bulk delete: {len(ids)}",
-        )
+        self.conn.client.cache.remove_messages(self.id, ids)
 
     # Circular imports - Fix typehint when importing
     async def fetch_invites(self) -> List[Any]:
@@ -10,6 +10,11 @@
 from acord.payloads import MessageCreatePayload
 from acord.core.abc import Route
 
+GET_MESSAGE = Route.compile("GET", "/channels/{channel_id}/messages/{message_id}")
+CREATE_MESSAGE = Route.compile("POST", "/channels/{channel_id}/messages")
+TRIGGER_TYPING = Route.compile("POST", "/channels/{channel_id}/typing")
+GET_PINS = Route.compile("GET", "/channels/{channel_id}/pins")
+
 
 class ExtendedTextMethods:
     conn: Any
@@ -51,13 +56,11 @@ async def fetch_message(
         bucket = self._get_bucket()
 
         resp = await self.conn.request(
-            Route(
-                "GET", path=f"/channels/{self.id}/messages/{message_id}", bucket=bucket
-            )
+            GET_MESSAGE.format(channel_id=self.id, message_id=message_id, bucket=bucket)
         )
 
-        message = Message(**(await resp.json()))
-        self.conn.client.cache.add_message(message.channel_id, message.id)
+        message = Message(conn=self.conn, **(await resp.json()))
+        self.conn.client.cache.add_message(message)
 
         return message
 
@@ -114,7 +117,7 @@ async def send(self, **data) -> Optional[Message]:
         )
 
         r = await self.conn.request(
-            Route("POST", path=f"/channels/{self.id}/messages", bucket=bucket),
+            CREATE_MESSAGE.format(channel_id=self.id, bucket=bucket),
             data=form_data,
         )
 
@@ -129,7 +132,7 @@ async def trigger_typing(self) -> None:
         """
         bucket = self._get_bucket()
         await self.conn.request(
-            Route("POST", path=f"/channels/{self.id}/typing", bucket=bucket)
+            TRIGGER_TYPING.format(channel_id=self.id, bucket=bucket)
         )
 
     async def pins(self) -> Iterator[Message]:
@@ -139,11 +142,11 @@ async def pins(self) -> Iterator[Message]:
         """
         bucket = self._get_bucket()
         r = await self.conn.request(
-            Route("GET", path=f"/channels/{self.id}/pins", bucket=bucket)
+            GET_PINS.format(channel_id=self.id, bucket=bucket)
         )
         messages = await r.json()
 
         for message in messages:
             msg = Message(conn=self.conn, **message)
-            self.conn.client.cache.add_message(message)
+            self.conn.client.cache.add_message(msg)
             yield msg
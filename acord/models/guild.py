@@ -9,6 +9,7 @@
 import json
 
 from acord.core.abc import DISCORD_EPOCH, Route
+from acord.core.ratelimiter import RequestPriority
 from acord.bases import Hashable, ChannelTypes, AuditLogEvent
 from acord.models import (
     Channel,
@@ -27,6 +28,7 @@
     AuditLog,
     Snowflake,
 )
+from acord.models.raw import RawMapping, materializer_of
 
 from acord.utils import _d_to_channel, _payload_dict_to_json
 from acord.payloads import (
@@ -166,7 +168,8 @@ class Guild(pydantic.BaseModel, Hashable):
     """ Amount of members in this guild """
 
     members: Dict[Snowflake, Member] = {}
-    """ Mapping of all members in guild """
+    """ Mapping of all members in guild,
+    a :class:`RawMapping` when the cache stores payloads """
 
     mfa_level: MFALevel
     """required MFA level for the guild"""
@@ -227,6 +230,38 @@ class Guild(pydantic.BaseModel, Hashable):
     created_at: Optional[datetime.datetime]
     """ when the guild was created """
 
+    def __init__(self, **data: Any) -> None:
+        materializer = materializer_of(data.get("conn"))
+        members = None
+
+        if materializer is not None and isinstance(data.get("members"), list):
+            # Members are kept as payloads and built by get_member
+            members = data.pop("members")
+
+        super().__init__(**data)
+
+        if members is not None:
+            mapping = RawMapping(materializer)
+
+            for member in members:
+                mapping.store(
+                    int(member["user"]["id"]),
+                    Member,
+                    self.conn,
+                    {**member, "guild_id": self.id},
+                )
+
+            self.members = mapping
+
+    def _cache_member(self, member: Member, data: Dict[str, Any]) -> None:
+        # Compact guilds keep members as the payloads they are built from
+        if isinstance(self.members, RawMapping):
+            self.members.store(
+                member.user.id, Member, self.conn, {**data, "guild_id": self.id}
+            )
+        else:
+            self.members.update({member.user.id: member})
+
     @pydantic.validator("members", pre=True)
     def _validate_members(cls, members, **kwargs) -> Dict[Snowflake, Member]:
         conn = kwargs["values"]["conn"]
@@ -424,8 +459,9 @@ async def fetch_member(
                 bucket=dict(guild_id=self.id),
             )
         )
-        fetched_member = Member(conn=self.conn, **(await r.json()))
-        self.members.update({fetched_member.id: fetched_member})
+        data = await r.json()
+        fetched_member = Member(conn=self.conn, guild_id=self.id, **data)
+        self._cache_member(fetched_member, data)
         return fetched_member
 
     async def fetch_members(
@@ -453,8 +489,8 @@ async def fetch_members(
         members = await r.json()
 
         for member in members:
-            fmember = Member(conn=self.conn, **member)
-            self.members.update({fmember.id: fmember})
+            fmember = Member(conn=self.conn, guild_id=self.id, **member)
+            self._cache_member(fmember, member)
             yield fmember
 
     async def fetch_members_by_name(
@@ -482,8 +518,8 @@ async def fetch_members_by_name(
         members = await r.json()
 
         for member in members:
-            fmember = Member(conn=self.conn, **member)
-            self.members.update({fmember.id: fmember})
+            fmember = Member(conn=self.conn, guild_id=self.id, **member)
+            self._cache_member(fmember, member)
             yield fmember
 
     async def fetch_bans(self) -> Iterator[Ban]:
@@ -952,8 +988,9 @@ async def add_member(
         r = await self.conn.request(route, data=data, headers=headers)
 
         if r.status == 201:
-            member = Member(conn=self.conn, **(await r.json()))
-            self.members.update({member.id: member})
+            data = await r.json()
+            member = Member(conn=self.conn, guild_id=self.id, **data)
+            self._cache_member(member, data)
         else:
             member = self.members.get(user_id)
         return member
@@ -1129,6 +1166,7 @@ async def prune(
                 compute_prune_count=str(compute_prune_count).lower(),
             ),
             headers=headers,
+            priority=RequestPriority.BACKGROUND,
         )
 
         return (await r.json())["pruned"]
@@ -194,9 +194,10 @@ async def edit(self, *, reason: str = None, **data) -> Member:
             data=payload,
         )
 
-        member = Member(guild_id=self.guild_id, conn=self.conn, **(await r.json()))
+        data = await r.json()
+        member = Member(guild_id=self.guild_id, conn=self.conn, **data)
         guild = self.conn.client.get_guild(member.guild_id)
-        guild.members.update({member.id: member})
+        guild._cache_member(member, data)
 
         return member
 
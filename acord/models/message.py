@@ -20,6 +20,14 @@
 
 from typing import Any, Dict, List, Optional, Union
 
+DELETE_MESSAGE = Route.compile("DELETE", "/channels/{channel_id}/messages/{message_id}")
+ADD_REACTION = Route.compile(
+    "PUT", "/channels/{channel_id}/messages/{message_id}/reactions/{emoji}/@me"
+)
+REMOVE_REACTION = Route.compile(
+    "DELETE", "/channels/{channel_id}/messages/{message_id}/reactions/{emoji}/{user_id}"
+)
+
 
 async def _clean_reaction(string):
     if isinstance(string, str):
@@ -237,11 +245,14 @@ async def delete(self, *, reason: str = None) -> None:
             Reason for deleting message, shows up in AUDIT-LOGS
         """
         await self.conn.request(
-            Route("DELETE", path=f"/channels/{self.channel_id}/messages/{self.id}"),
+            DELETE_MESSAGE.format(
+                channel_id=self.channel_id,
+                message_id=self.id,
+                bucket=(await self._get_bucket()),
+            ),
             headers={
                 "X-Audit-Log-Reason": reason,
             },
-            bucket=(await self._get_bucket()),
         )
 
     async def pin(self, *, reason: str = "") -> None:
@@ -294,9 +305,10 @@ async def add_reaction(self, emoji: Union[str, Emoji]) -> None:
         #     return
 
         await self.conn.request(
-            Route(
-                "PUT",
-                path=f"/channels/{self.channel_id}/messages/{self.id}/reactions/{emoji}/@me",
+            ADD_REACTION.format(
+                channel_id=self.channel_id,
+                message_id=self.id,
+                emoji=emoji,
                 bucket={"channel_id": self.channel_id, "guild_id": self.guild_id},
             ),
         )
@@ -316,9 +328,11 @@ async def remove_reaction(
         emoji = await _clean_reaction(emoji)
 
         await self.conn.request(
-            Route(
-                "DELETE",
-                path=f"/channels/{self.channel_id}/messages/{self.id}/reactions/{emoji}/{user_id}",
+            REMOVE_REACTION.format(
+                channel_id=self.channel_id,
+                message_id=self.id,
+                emoji=emoji,
+                user_id=user_id,
                 bucket={"channel_id": self.channel_id, "guild_id": self.guild_id},
             ),
         )
@@ -0,0 +1,186 @@
+# Compact storage of models as the payloads they are built from
+from __future__ import annotations
+
+import sys
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple, Type
+
+_MISSING = object()
+
+
+def slim_payload(data: Any) -> Any:
+    """Removes ``None`` values from a payload and interns its keys,
+    so payloads of the same kind share their key strings.
+    """
+    if isinstance(data, dict):
+        return {
+            sys.intern(key): slim_payload(value)
+            for key, value in data.items()
+            if value is not None
+        }
+    if isinstance(data, list):
+        return [slim_payload(value) for value in data]
+    return data
+
+
+class RawPayload(object):
+    """A model stored as the payload it is built from
+
+    Parameters
+    ----------
+    model: Type[:class:`pydantic.BaseModel`]
+        Model to build
+    conn: Any
+        Connection passed to the model
+    data: Dict[:class:`str`, Any]
+        Payload of the model, see :func:`slim_payload`
+    """
+
+    __slots__ = ("model", "conn", "data")
+
+    def __init__(self, model: Type[Any], conn: Any, data: Dict[str, Any]) -> None:
+        self.model = model
+        self.conn = conn
+        self.data = data
+
+    def __repr__(self) -> str:
+        return f"RawPayload(model={self.model.__name__}, fields={len(self.data)})"
+
+    def build(self) -> Any:
+        return self.model(conn=self.conn, **self.data)
+
+
+class Materializer(object):
+    """Builds models from :class:`RawPayload`,
+    keeping built models for a short time so repeated lookups return the same object.
+
+    .. note::
+        Built models are copies,
+        changes to them are lost once they are dropped unless they are added back to the cache.
+
+    Parameters
+    ----------
+    ttl: :class:`float`
+        Seconds a built model is kept for
+    max_size: :class:`int`
+        Maximum number of built models kept
+
+    Attributes
+    ----------
+    built: :class:`int`
+        Number of models built
+    reused: :class:`int`
+        Number of lookups answered with a model already built
+    """
+
+    __slots__ = ("ttl", "max_size", "built", "reused", "_recent")
+
+    def __init__(self, ttl: float = 5.0, max_size: int = 256) -> None:
+        self.ttl = ttl
+        self.max_size = max_size
+
+        self.built = 0
+        self.reused = 0
+
+        self._recent: OrderedDict[RawPayload, Tuple[float, Any]] = OrderedDict()
+
+    def __repr__(self) -> str:
+        return f"Materializer(ttl={self.ttl}, built={self.built}, reused={self.reused})"
+
+    def load(self, value: Any) -> Any:
+        """Gets the model of a stored value, values which arent payloads are returned as is"""
+        if not isinstance(value, RawPayload):
+            return value
+
+        now = time.monotonic()
+        recent = self._recent.get(value)
+
+        if recent is not None and recent[0] > now:
+            self._recent.move_to_end(value)
+            self.reused += 1
+            return recent[1]
+
+        model = value.build()
+        self.built += 1
+
+        self._recent[value] = (now + self.ttl, model)
+        self._recent.move_to_end(value)
+
+        while len(self._recent) > self.max_size:
+            self._recent.popitem(last=False)
+
+        return model
+
+    def clear(self) -> None:
+        self._recent.clear()
+
+
+class RawMapping(dict):
+    """A dict of :class:`RawPayload`, models are built when items are read.
+    Models can be stored as well, they are returned as is.
+
+    Parameters
+    ----------
+    materializer: :class:`Materializer`
+        Materializer used to build models
+    """
+
+    __slots__ = ("materializer",)
+
+    def __init__(self, materializer: Materializer, *args, **kwds) -> None:
+        super().__init__(*args, **kwds)
+        self.materializer = materializer
+
+    def __getitem__(self, key: Any) -> Any:
+        return self.materializer.load(super().__getitem__(key))
+
+    def get(self, key: Any, default: Any = None) -> Any:
+        value = super().get(key, _MISSING)
+
+        if value is _MISSING:
+            return default
+        return self.materializer.load(value)
+
+    def pop(self, key: Any, *args) -> Any:
+        value = super().pop(key, _MISSING)
+
+        if value is _MISSING:
+            if args:
+                return args[0]
+            raise KeyError(key)
+        return self.materializer.load(value)
+
+    def values(self):
+        load = self.materializer.load
+        return [load(value) for value in super().values()]
+
+    def items(self):
+        load = self.materializer.load
+        return [(key, load(value)) for key, value in super().items()]
+
+    def store(
+        self, key: Any, model: Type[Any], conn: Any, data: Dict[str, Any]
+    ) -> None:
+        """Stores the payload of a model
+
+        Parameters
+        ----------
+        key: Any
+            Key to store payload under
+        model: Type[:class:`pydantic.BaseModel`]
+            Model the payload is for
+        conn: Any
+            Connection passed to the model
+        data: Dict[:class:`str`, Any]
+            Payload of the model
+        """
+        super().__setitem__(key, RawPayload(model, conn, slim_payload(data)))
+
+
+def materializer_of(conn: Any) -> Optional[Materializer]:
+    """Gets the :class:`Materializer` of the cache a connection belongs to,
+    ``None`` if the cache stores models.
+    """
+    cache = getattr(getattr(conn, "client", None), "cache", None)
+    return getattr(cache, "materializer", None)
@@ -1,2 +1,3 @@
 from .rest import RestApi
 from .server import InteractionServer
+from .proxy import RESTProxy
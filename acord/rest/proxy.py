@@ -0,0 +1,214 @@
+from __future__ import annotations
+
+import logging
+import re
+from typing import Dict, Optional
+
+import aiohttp
+from aiohttp import web
+
+from acord.core.abc import BASE_API_URL, Route
+from acord.core.ratelimiter import (
+    DefaultHTTPRatelimiter,
+    GlobalRatelimit,
+    RequestPriority,
+    is_priority_route,
+    parse_ratelimit_headers,
+)
+
+logger = logging.getLogger(__name__)
+
+_VERSION_PREFIX = re.compile(r"^/?v\d+/")
+
+# Headers which only apply to a single connection,
+# the body is also decompressed so its encoding and length may change.
+HOP_HEADERS = frozenset(
+    {
+        "connection",
+        "keep-alive",
+        "transfer-encoding",
+        "content-encoding",
+        "content-length",
+        "host",
+        "upgrade",
+    }
+)
+
+
+class RESTProxy(object):
+    """A REST proxy shared by every process of a bot.
+
+    The proxy holds a single pooled :class:`~aiohttp.ClientSession`
+    and the ratelimit state of every token using it,
+    so workers only open a connection to the proxy instead of to discord.
+
+    .. rubric:: Running the proxy
+
+    .. code-block:: py
+
+        proxy = RESTProxy(port=8800)
+        proxy.run()
+
+    .. rubric:: Using the proxy
+
+    .. code-block:: py
+
+        client.http = HTTPClient(
+            client,
+            base_url="http://127.0.0.1:8800",
+            global_ratelimit=False,
+        )
+
+        # Or over a unix socket
+        client.http = HTTPClient(
+            client,
+            base_url="http://acord-proxy",
+            connecter=aiohttp.UnixConnector("/tmp/acord.sock"),
+            global_ratelimit=False,
+        )
+
+    Parameters
+    ----------
+    host: :class:`str`
+        Host to listen on
+    port: :class:`int`
+        Port to listen on
+    path: :class:`str`
+        Path of a unix socket to listen on instead of ``host`` and ``port``
+    upstream: :class:`str`
+        Base URL requests are forwarded to, defaults to the discord API.
+        Can be pointed at a fake server for testing.
+    limit: :class:`int`
+        Maximum number of connections to the upstream
+    global_rate: :class:`int`
+        Global requests per second allowed for each token
+
+    Attributes
+    ----------
+    application: :class:`~aiohttp.web.Application`
+        Application serving the proxy
+    ratelimiters: Dict[:class:`str`, :class:`DefaultHTTPRatelimiter`]
+        Ratelimiter of each token which has used the proxy
+    """
+
+    def __init__(
+        self,
+        *,
+        host: str = "127.0.0.1",
+        port: int = 8800,
+        path: Optional[str] = None,
+        upstream: str = BASE_API_URL,
+        limit: int = 100,
+        global_rate: int = 50,
+    ) -> None:
+        self.host = host
+        self.port = port
+        self.path = path
+        self.upstream = upstream.rstrip("/")
+        self.limit = limit
+        self.global_rate = global_rate
+
+        self.ratelimiters: Dict[str, DefaultHTTPRatelimiter] = dict()
+        self.global_ratelimits: Dict[str, GlobalRatelimit] = dict()
+
+        self.application = web.Application()
+        self.application.router.add_route("*", "/{path:.*}", self.handle)
+        self.application.on_startup.append(self._create_session)
+        self.application.on_cleanup.append(self._close_session)
+
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    async def _create_session(self, _) -> None:
+        self._session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=self.limit),
+            auto_decompress=True,
+        )
+
+    async def _close_session(self, _) -> None:
+        if self._session is not None:
+            await self._session.close()
+
+    def _get_ratelimiters(self, authorization: str):
+        ratelimiter = self.ratelimiters.get(authorization)
+
+        if ratelimiter is None:
+            ratelimiter = self.ratelimiters[authorization] = DefaultHTTPRatelimiter(
+                max_requests=(10000, (60 * 10))
+            )
+            self.global_ratelimits[authorization] = GlobalRatelimit(self.global_rate)
+
+        return ratelimiter, self.global_ratelimits[authorization]
+
+    async def handle(self, request: web.Request) -> web.Response:
+        """Forwards a request to the upstream"""
+        path = request.match_info["path"]
+        route = Route(request.method, path=_VERSION_PREFIX.sub("", path))
+
+        ratelimiter, global_ratelimit = self._get_ratelimiters(
+            request.headers.get("Authorization", "")
+        )
+
+        priority = (
+            RequestPriority.INTERACTIVE
+            if is_priority_route(route)
+            else RequestPriority.NORMAL
+        )
+
+        await ratelimiter.acquire(route, priority=priority)
+        await global_ratelimit.acquire(priority=priority)
+
+        headers = {
+            key: value
+            for key, value in request.headers.items()
+            if key.lower() not in HOP_HEADERS
+        }
+        body = await request.read()
+
+        try:
+            async with self._session.request(
+                request.method,
+                f"{self.upstream}/{path}",
+                params=request.query,
+                headers=headers,
+                data=body or None,
+            ) as resp:
+                data = await resp.read()
+        except BaseException:
+            ratelimiter.update(route, {})
+            raise
+
+        ratelimit_headers = parse_ratelimit_headers(resp.headers)
+        ratelimiter.update(route, ratelimit_headers)
+
+        if resp.status == 429 and resp.headers.get("X-RateLimit-Global"):
+            ratelimiter.global_lock_set(
+                float(resp.headers.get("Retry-After", ratelimit_headers.get("reset", 1)))
+            )
+
+        logger.debug(f"Proxied {route.template} returned {resp.status}")
+
+        return web.Response(
+            status=resp.status,
+            body=data,
+            headers={
+                key: value
+                for key, value in resp.headers.items()
+                if key.lower() not in HOP_HEADERS
+            },
+        )
+
+    def run(self, **kwds) -> None:
+        """Runs the proxy, loop blocking.
+
+        Parameters
+        ----------
+        **kwds:
+            Additional kwargs for :func:`~aiohttp.web.run_app`
+        """
+        if self.path:
+            kwds.setdefault("path", self.path)
+        else:
+            kwds.setdefault("host", self.host)
+            kwds.setdefault("port", self.port)
+
+        web.run_app(self.application, **kwds)
@@ -399,9 +399,10 @@ async def fetch_user(self, user_id: int, /) -> Optional[User]:
         """Fetches user from API and caches it"""
 
         resp = await self.http.request(Route("GET", path=f"/users/{user_id}"))
-        user = User(conn=self.http, **(await resp.json()))
+        data = await resp.json()
+        user = User(conn=self.http, **data)
 
-        self.cache.add_user(user)
+        self.cache.add_user_payload(user, data)
         return user
 
     async def fetch_channel(self, channel_id: int, /) -> Optional[Channel]:
@@ -421,9 +422,10 @@ async def fetch_message(
         resp = await self.http.request(
             Route("GET", path=f"/channels/{channel_id}/messages/{message_id}")
         )
-        message = Message(conn=self.http, **(await resp.json()))
+        data = await resp.json()
+        message = Message(conn=self.http, **data)
 
-        self.cache.add_message(message)
+        self.cache.add_message_payload(message, data)
         return message
 
     async def fetch_guild(
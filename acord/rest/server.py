@@ -5,11 +5,7 @@
 from aiohttp import web
 from .abc import InteractionServer as BaseServer
 from acord.models import Interaction
-
-try:
-    from orjson import loads
-except ImportError:
-    from json import loads
+from acord.core.serializers import loads
 
 try:
     from nacl.signing import VerifyKey
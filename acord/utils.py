@@ -4,6 +4,7 @@
 from copy import deepcopy
 
 from acord.bases import ChannelTypes
+from acord.core import serializers
 from aiohttp import FormData
 
 
@@ -22,7 +23,7 @@ def _payload_dict_to_json(base, **keys) -> Any:
         if value is None and key not in keys:
             to_exclude.append(key)
 
-    return base.json(exclude=set(to_exclude))
+    return serializers.dumps(base, exclude=set(to_exclude))
 
 
 def _d_to_channel(DATA, conn):
@@ -85,7 +86,7 @@ def message_multipart_helper(
 
     form.add_field(
         name="payload_json",
-        value=r_payload.json(exclude=exclude),
+        value=serializers.dumps(r_payload, exclude=exclude),
         content_type="application/json",
     )
 
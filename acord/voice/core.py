@@ -483,7 +483,9 @@ async def _handle_voice(
                 )
 
             elif data["op"] == OpCodes.HEARTBEAT_ACK.value:
-                self.ping = datetime.utcnow().timestamp() - self.acked_at
+                self._keep_alive.ack()
+                self.acked_at = datetime.utcnow().timestamp()
+                self.ping = self._keep_alive.latency
 
             # else:
             #     print(data["op"])
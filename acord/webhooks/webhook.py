@@ -26,6 +26,10 @@
 from .connection import WebhookConnection
 from .types import WebhookType
 
+INTERACTION_CALLBACK = Route.compile(
+    "POST", "/interactions/{interaction_id}/{token}/callback"
+)
+
 url_pattern = re.compile(
     "(?P<scheme>https?):\/\/(?P<domain>(?:ptb\.|canary\.)?discord(?:app)?\.com)\/api(?:\/)?(?P<api_version>v\d{1,2})?\/webhooks\/(?P<webhook_identifier>\d{17,19})\/(?P<webhook_token>[\w-]{68})"
 )
@@ -342,7 +346,7 @@ async def respond_with_message(self, **kwds) -> None:
         else:
             d_type = InteractionCallback.CHANNEL_MESSAGE_WITH_SOURCE
 
-        route = Route("POST", path=f"/interactions/{self.id}/{self.token}/callback")
+        route = INTERACTION_CALLBACK.format(interaction_id=self.id, token=self.token)
         form_data = message_multipart_helper(
             FormPartHelper,
             {"data": {"files"}},
@@ -366,7 +370,7 @@ async def respond_with_modal(self, modal: Modal) -> None:
         d = FormPartHelper(type=InteractionCallback.MODAL, data=modal)
 
         await self.conn.request(
-            Route("POST", path=f"/interactions/{self.id}/{self.token}/callback"),
+            INTERACTION_CALLBACK.format(interaction_id=self.id, token=self.token),
             data=d.json(),
             headers={"Content-Type": "application/json"},
         )
@@ -389,7 +393,7 @@ async def respond_to_autocomplete(self, choices: List[AutoCompleteChoice]) -> No
         )
 
         await self.conn.request(
-            Route("POST", path=f"/interactions/{self.id}/{self.token}/callback"),
+            INTERACTION_CALLBACK.format(interaction_id=self.id, token=self.token),
             data=d.json(),
             headers={"Content-Type": "application/json"},
         )
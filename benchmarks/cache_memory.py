@@ -0,0 +1,140 @@
+# Measures memory used by cached members and messages,
+# with models stored as is and with DefaultCache(compact=True).
+#
+#   PYTHONPATH=. python benchmarks/cache_memory.py [count]
+import copy
+import gc
+import sys
+import time
+import tracemalloc
+from types import SimpleNamespace
+
+from acord import DefaultCache, Message
+from acord.models import Guild
+
+CHANNEL_ID = 10**17 + 1
+GUILD_ID = 10**17 + 2
+
+
+def user(i):
+    return {
+        "id": str(10**17 + i),
+        "username": f"user{i}",
+        "discriminator": "0001",
+        "avatar": "a" * 32,
+        "bot": False,
+        "public_flags": 0,
+        "banner": None,
+        "accent_color": None,
+    }
+
+
+def member(i):
+    return {
+        "user": user(i),
+        "nick": None,
+        "avatar": None,
+        "roles": [str(10**17 + 5), str(10**17 + 6)],
+        "joined_at": "2021-01-01T00:00:00.000000+00:00",
+        "premium_since": None,
+        "deaf": False,
+        "mute": False,
+        "pending": False,
+    }
+
+
+def message(i):
+    return {
+        "id": str(10**18 + i),
+        "channel_id": str(CHANNEL_ID),
+        "guild_id": str(GUILD_ID),
+        "author": user(i % 50),
+        "content": "hello world " * 5,
+        "timestamp": "2021-01-01T00:00:00.000000+00:00",
+        "edited_timestamp": None,
+        "tts": False,
+        "mention_everyone": False,
+        "mentions": [],
+        "mention_roles": [],
+        "attachments": [],
+        "embeds": [],
+        "pinned": False,
+        "type": 0,
+        "flags": 0,
+        "nonce": None,
+        "referenced_message": None,
+        "components": [],
+        "reactions": [],
+    }
+
+
+def guild(members):
+    return {
+        "id": str(GUILD_ID),
+        "name": "guild",
+        "owner_id": "1",
+        "afk_timeout": 0,
+        "verification_level": 0,
+        "default_message_notifications": 0,
+        "explicit_content_filter": 0,
+        "roles": [],
+        "emojis": [],
+        "features": [],
+        "mfa_level": 0,
+        "system_channel_flags": 0,
+        "premium_tier": 0,
+        "preferred_locale": "en-US",
+        "nsfw_level": 0,
+        "nsfw": False,
+        "premium_subscription_count": 0,
+        "max_members": 100,
+        "members": members,
+    }
+
+
+def traced() -> int:
+    gc.collect()
+    return tracemalloc.get_traced_memory()[0]
+
+
+def run(compact: bool, count: int) -> None:
+    cache = DefaultCache(compact=compact, sweep_interval=None, max_messages=None)
+    conn = SimpleNamespace(client=SimpleNamespace(cache=cache))
+
+    members = [member(i) for i in range(count)]
+    messages = [message(i) for i in range(count)]
+
+    tracemalloc.start()
+    before = traced()
+
+    cache.add_guild(Guild(conn=conn, **guild(copy.deepcopy(members))))
+    after_members = traced()
+
+    for data in copy.deepcopy(messages):
+        cache.add_message_payload(Message(conn=conn, **data), data)
+    after_messages = traced()
+
+    tracemalloc.stop()
+    del members, messages
+
+    started = time.perf_counter()
+    for i in range(count):
+        if cache.materializer is not None:
+            # Measure a cold lookup, not one answered from recently built models
+            cache.materializer.clear()
+        cache.get_message(CHANNEL_ID, 10**18 + i)
+    lookup = (time.perf_counter() - started) / count
+
+    print(
+        f"compact={compact!s:<5} "
+        f"{(after_members - before) / count:>6.0f} B/member  "
+        f"{(after_messages - after_members) / count:>6.0f} B/message  "
+        f"{lookup * 1e6:>6.1f} us/lookup"
+    )
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+
+    run(False, count)
+    run(True, count)
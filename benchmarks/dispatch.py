@@ -0,0 +1,75 @@
+# Compares finding the parser of a dispatch event in the parser registry
+# with walking the elif chain the gateway handler used before it.
+# Parsers are no-ops, so only the cost of routing an event is measured.
+#
+#   PYTHONPATH=. python benchmarks/dispatch.py
+import timeit
+
+from acord.client.parsers import DEFAULT_PARSERS
+
+# Events in the order the elif chain compared them
+CHAIN_ORDER = [
+    "READY", "INTERACTION_CREATE", "INTERACTION_UPDATE", "INTERACTION_DELETE",
+    "MESSAGE_CREATE", "MESSAGE_UPDATE", "MESSAGE_DELETE", "MESSAGE_DELETE_BULK",
+    "MESSAGE_REACTION_ADD", "MESSAGE_REACTION_REMOVE", "MESSAGE_REACTION_REMOVE_ALL",
+    "MESSAGE_REACTION_REMOVE_EMOJI", "CHANNEL_PINS_UPDATE", "INVITE_CREATE",
+    "INVITE_DELETE", "GUILD_CREATE", "GUILD_DELETE", "GUILD_UPDATE", "GUILD_BAN_ADD",
+    "GUILD_BAN_REMOVE", "GUILD_EMOJIS_UPDATE", "GUILD_STICKERS_UPDATE",
+    "GUILD_INTEGRATIONS_UPDATE", "GUILD_MEMBER_ADD", "GUILD_MEMBER_REMOVE",
+    "GUILD_MEMBER_UPDATE", "GUILD_ROLE_CREATE", "GUILD_ROLE_UPDATE",
+    "GUILD_ROLE_DELETE", "GUILD_SCHEDULED_EVENT_CREATE", "GUILD_SCHEDULED_EVENT_UPDATE",
+    "GUILD_SCHEDULED_EVENT_DELETE", "ON_INTEGRATION_CREATE", "ON_INTEGRATION_UPDATE",
+    "ON_INTEGRATION_DELETE", "ON_INVITE_CREATE", "ON_INVITE_DELETE", "CHANNEL_CREATE",
+    "CHANNEL_UPDATE", "CHANNEL_DELETE", "THREAD_CREATE", "THREAD_UPDATE",
+    "THREAD_DELETE", "THREAD_SYNC_LIST", "THREAD_MEMBER_UPDATE",
+    "THREAD_MEMBERS_UPDATE", "VOICE_STATE_UPDATE", "PRESENCE_UPDATE",
+    "VOICE_SERVER_UPDATE",
+]
+
+# Events received most often by a large bot
+COMMON = ["MESSAGE_CREATE", "GUILD_MEMBER_UPDATE", "PRESENCE_UPDATE", "VOICE_STATE_UPDATE"]
+
+
+def build_chain():
+    lines = ["def route(EVENT):"]
+
+    for i, event in enumerate(CHAIN_ORDER):
+        keyword = "if" if i == 0 else "elif"
+        lines.append(f"    {keyword} EVENT == {event!r}:\n        return {i}")
+
+    namespace = {}
+    exec("\n".join(lines), namespace)
+    return namespace["route"]
+
+
+def build_registry():
+    parsers = DEFAULT_PARSERS.copy()
+
+    def route(EVENT):
+        parser = parsers.get(EVENT)
+
+        if parser is None:
+            return
+        return parser
+
+    return route
+
+
+def report(name, events, number=200000):
+    chain, registry = build_chain(), build_registry()
+
+    def run(route):
+        def inner():
+            for event in events:
+                route(event)
+
+        seconds = min(timeit.repeat(inner, number=number // len(events), repeat=5))
+        return seconds / (number // len(events) * len(events)) * 1e9
+
+    print(f"{name:<16} elif {run(chain):>7.1f} ns/event  registry {run(registry):>7.1f} ns/event")
+
+
+if __name__ == "__main__":
+    report("every event", CHAIN_ORDER)
+    report("common events", COMMON)
+    report("last event", ["VOICE_SERVER_UPDATE"])
@@ -0,0 +1,55 @@
+# Compares decoding gateway payloads sent as ETF and as JSON.
+#
+#   PYTHONPATH=. python benchmarks/gateway_decode.py [members]
+import sys
+import timeit
+
+from acord.core import etf, serializers
+
+
+def member(i):
+    return {
+        "user": {
+            "id": 10**17 + i,
+            "username": f"user{i}",
+            "discriminator": "0001",
+            "avatar": "a" * 32,
+            "bot": False,
+        },
+        "nick": None,
+        "roles": [10**17 + 5, 10**17 + 6],
+        "joined_at": "2021-01-01T00:00:00.000000+00:00",
+        "deaf": False,
+        "mute": False,
+    }
+
+
+def guild_create(members):
+    return {
+        "op": 0,
+        "s": 2,
+        "t": "GUILD_CREATE",
+        "d": {
+            "id": 10**17 + 2,
+            "name": "guild",
+            "features": [],
+            "members": [member(i) for i in range(members)],
+        },
+    }
+
+
+def report(name, func, data, number):
+    seconds = min(timeit.repeat(lambda: func(data), number=number, repeat=5))
+    print(f"{name:<14} {len(data):>9} B  {seconds / number * 1e3:>8.3f} ms/payload")
+
+
+if __name__ == "__main__":
+    members = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    payload = guild_create(members)
+
+    as_etf = etf.pack(payload)
+    as_json = serializers.dumps(payload).encode("utf-8")
+
+    print(f"{members} members, erlpack={etf.HAS_ERLPACK}, json={serializers.get_backend().name}")
+    report("etf.unpack", etf.unpack, as_etf, 20)
+    report("json loads", serializers.loads, as_json, 20)
@@ -57,6 +57,7 @@
 extra_requires = {
     "speedup": ["orjson>=3.5.4", "aiodns>=1.1", "brotli", "cchardet"],
     "voice": ["pynacl", "git+https://github.com/TeamPyOgg/PyOgg"],
+    "etf": ["erlpack"],
 }
 # Using git+ for pyogg PyPi doesn't seem to install correct version
 
@@ -0,0 +1,102 @@
+from types import SimpleNamespace
+
+import pytest
+
+CHANNEL_ID = 10**17 + 1
+GUILD_ID = 10**17 + 2
+ROLE_ID = 10**17 + 5
+
+
+def user(i):
+    return {
+        "id": str(10**17 + i),
+        "username": f"user{i}",
+        "discriminator": "0001",
+        "avatar": None,
+        "bot": False,
+    }
+
+
+def member(i, roles=()):
+    return {
+        "user": user(i),
+        "nick": None,
+        "roles": [str(role_id) for role_id in roles],
+        "joined_at": "2021-01-01T00:00:00.000000+00:00",
+        "deaf": False,
+        "mute": False,
+    }
+
+
+def role(role_id=ROLE_ID):
+    return {
+        "id": str(role_id),
+        "name": "role",
+        "color": 0,
+        "hoist": False,
+        "position": 1,
+        "permissions": "0",
+        "managed": False,
+        "mentionable": False,
+    }
+
+
+def message(i):
+    return {
+        "id": str(10**18 + i),
+        "channel_id": str(CHANNEL_ID),
+        "guild_id": str(GUILD_ID),
+        "author": user(i),
+        "content": "hello world",
+        "timestamp": "2021-01-01T00:00:00.000000+00:00",
+        "edited_timestamp": None,
+        "tts": False,
+        "mention_everyone": False,
+        "mentions": [],
+        "mention_roles": [],
+        "attachments": [],
+        "embeds": [],
+        "pinned": False,
+        "type": 0,
+        "flags": 0,
+        "components": [],
+    }
+
+
+def guild(members=(), roles=()):
+    return {
+        "id": str(GUILD_ID),
+        "name": "guild",
+        "owner_id": "1",
+        "afk_timeout": 0,
+        "verification_level": 0,
+        "default_message_notifications": 0,
+        "explicit_content_filter": 0,
+        "roles": list(roles),
+        "emojis": [],
+        "features": [],
+        "mfa_level": 0,
+        "system_channel_flags": 0,
+        "premium_tier": 0,
+        "preferred_locale": "en-US",
+        "nsfw_level": 0,
+        "nsfw": False,
+        "premium_subscription_count": 0,
+        "max_members": 100,
+        "members": list(members),
+    }
+
+
+@pytest.fixture
+def payloads():
+    """Factories for gateway payloads, shared by the cache tests"""
+    return SimpleNamespace(
+        CHANNEL_ID=CHANNEL_ID,
+        GUILD_ID=GUILD_ID,
+        ROLE_ID=ROLE_ID,
+        user=user,
+        member=member,
+        role=role,
+        message=message,
+        guild=guild,
+    )
@@ -0,0 +1,140 @@
+import asyncio
+
+from acord.core.abc import Route
+from acord.core.http import HTTPClient
+from acord.core.response_cache import ResponseCache
+
+
+class FakeResponse:
+    def __init__(self, body):
+        self.body = body
+
+    async def read(self):
+        return self.body
+
+
+def client(**kwds):
+    http = HTTPClient(None, token="token", **kwds)
+    http.sent = []
+    http.gate = asyncio.Event()
+
+    async def _request(route, data=None, headers=None, **kwds):
+        http.sent.append(route)
+        await http.gate.wait()
+
+        if isinstance(http.result, BaseException):
+            raise http.result
+        return http.result
+
+    http._request = _request
+    http.result = FakeResponse(b"roles")
+    return http
+
+
+def roles():
+    return Route("GET", path="guilds/1/roles")
+
+
+def test_identical_requests_share_a_response():
+    async def main():
+        http = client()
+        requests = [asyncio.ensure_future(http.request(roles())) for _ in range(3)]
+        await asyncio.sleep(0)
+        http.gate.set()
+
+        responses = await asyncio.gather(*requests)
+
+        assert len(http.sent) == 1
+        assert all(resp is http.result for resp in responses)
+        assert http.metrics["coalesced"] == 2
+        assert not http._inflight
+
+    asyncio.run(main())
+
+
+def test_uncoalesced_requests_are_sent_separately():
+    async def main():
+        http = client()
+        http.gate.set()
+
+        await asyncio.gather(
+            http.request(roles()), http.request(roles(), coalesce=False)
+        )
+
+        assert len(http.sent) == 2
+        assert http.metrics["coalesced"] == 0
+
+    asyncio.run(main())
+
+
+def test_cancelling_the_sender_resends_for_waiters():
+    async def main():
+        http = client()
+        owner = asyncio.ensure_future(http.request(roles()))
+        await asyncio.sleep(0)
+        waiter = asyncio.ensure_future(http.request(roles()))
+        await asyncio.sleep(0)
+
+        owner.cancel()
+        await asyncio.sleep(0)
+        http.gate.set()
+
+        assert await asyncio.wait_for(waiter, 1) is http.result
+        assert owner.cancelled()
+        assert len(http.sent) == 2
+
+    asyncio.run(main())
+
+
+def test_cancelling_a_waiter_leaves_the_request_running():
+    async def main():
+        http = client()
+        owner = asyncio.ensure_future(http.request(roles()))
+        await asyncio.sleep(0)
+        waiter = asyncio.ensure_future(http.request(roles()))
+        await asyncio.sleep(0)
+
+        waiter.cancel()
+        await asyncio.sleep(0)
+        http.gate.set()
+
+        assert await owner is http.result
+        assert len(http.sent) == 1
+
+    asyncio.run(main())
+
+
+def test_errors_are_raised_to_every_waiter():
+    async def main():
+        http = client()
+        http.result = ConnectionError("lost")
+        requests = [asyncio.ensure_future(http.request(roles())) for _ in range(3)]
+        await asyncio.sleep(0)
+        http.gate.set()
+
+        results = await asyncio.gather(*requests, return_exceptions=True)
+
+        assert all(result is http.result for result in results)
+        assert len(http.sent) == 1
+        assert not http._inflight
+
+    asyncio.run(main())
+
+
+def test_cache_counters():
+    async def main():
+        http = client(response_cache=ResponseCache({"GET /guilds/{guild_id}/roles": 60}))
+        http.gate.set()
+
+        first = await http.request(roles())
+        second = await http.request(roles())
+        await http.request(roles(), cache=False)
+        await http.request(Route("GET", path="guilds/1/emojis"))
+
+        assert second is first
+        assert len(http.sent) == 3
+        assert http.metrics["cache_hits"] == 1
+        assert http.metrics["cache_misses"] == 1
+        assert http.metrics["requests"] == 4
+
+    asyncio.run(main())
@@ -0,0 +1,141 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from acord import DefaultCache, Message
+from acord.client.parsers import (
+    parse_guild_create,
+    parse_guild_member_add,
+    parse_message_update,
+    parse_voice_state_update,
+)
+from acord.models import RawMapping, RawPayload
+
+
+@pytest.fixture
+def shard():
+    cache = DefaultCache(compact=True, sweep_interval=None)
+    client = SimpleNamespace(cache=cache, events=[])
+    client.http = SimpleNamespace(client=client)
+    client.get_message = cache.get_message
+    client.get_guild = cache.get_guild
+    client.user = SimpleNamespace(id=1)
+    client.voice_connections = {}
+    client.awaiting_voice_connections = {}
+    client.dispatch = lambda event, *args: client.events.append((event, *args))
+
+    return SimpleNamespace(client=client, unavailable_guilds={})
+
+
+def test_guild_create_stores_member_payloads(shard, payloads):
+    parse_guild_create(
+        shard, payloads.guild([payloads.member(i) for i in range(5)])
+    )
+
+    created = shard.client.cache.get_guild(payloads.GUILD_ID)
+    assert isinstance(created.members, RawMapping)
+    assert all(
+        isinstance(value, RawPayload) for value in dict.values(created.members)
+    )
+
+    found = created.get_member(10**17 + 3)
+    assert found.user.username == "user3"
+    assert created.get_member(10**17 + 3) is found
+
+
+def test_message_update_keeps_payload(shard, payloads):
+    cache = shard.client.cache
+    data = payloads.message(1)
+    cache.add_message_payload(Message(conn=shard.client.http, **data), data)
+
+    parse_message_update(
+        shard,
+        {"id": data["id"], "channel_id": data["channel_id"], "content": "edited"},
+    )
+
+    stored = cache["messages"][(payloads.CHANNEL_ID, 10**18 + 1)]
+    assert isinstance(stored, RawPayload)
+    assert stored.data["content"] == "edited"
+
+    event, updated = shard.client.events[-1]
+    assert event == "message_update"
+    assert updated.content == "edited"
+    assert updated.author.username == "user1"
+    assert cache.get_message(payloads.CHANNEL_ID, 10**18 + 1).content == "edited"
+
+
+class FakeResponse:
+    def __init__(self, data):
+        self.data = data
+
+    async def json(self):
+        return self.data
+
+
+def assert_compact(guild):
+    assert all(isinstance(value, RawPayload) for value in dict.values(guild.members))
+
+
+def test_member_events_keep_guilds_compact(shard, payloads):
+    client = shard.client
+    parse_guild_create(shard, payloads.guild([payloads.member(1)]))
+    guild = client.cache.get_guild(payloads.GUILD_ID)
+
+    parse_guild_member_add(
+        shard, {**payloads.member(2), "guild_id": str(payloads.GUILD_ID)}
+    )
+    voice_state = {
+        "guild_id": str(payloads.GUILD_ID),
+        "channel_id": "10",
+        "user_id": str(10**17 + 1),
+        "member": payloads.member(1),
+        "session_id": "session",
+        "deaf": False,
+        "mute": False,
+        "self_deaf": False,
+        "self_mute": True,
+        "self_video": False,
+        "suppress": False,
+    }
+    asyncio.run(parse_voice_state_update(shard, voice_state))
+
+    assert_compact(guild)
+    assert guild.get_member(10**17 + 2).user.username == "user2"
+
+    member = guild.get_member(10**17 + 1)
+    assert member.voice_state.self_mute
+    stored = dict.__getitem__(guild.members, 10**17 + 1)
+    assert "member" not in stored.data["voice_state"]
+    assert client.events[-1][0] == "voice_state_update"
+
+
+def test_fetched_members_keep_guilds_compact(shard, payloads):
+    client = shard.client
+
+    async def request(route, **kwds):
+        if route.path.endswith(("members", "search")):
+            return FakeResponse([payloads.member(3), payloads.member(4)])
+        return FakeResponse(payloads.member(5))
+
+    client.http.request = request
+    parse_guild_create(shard, payloads.guild([payloads.member(1)]))
+    guild = client.cache.get_guild(payloads.GUILD_ID)
+
+    async def main():
+        fetched = await guild.fetch_member(member=10**17 + 5)
+        listed = [member async for member in guild.fetch_members(limit=2)]
+        found = [member async for member in guild.fetch_members_by_name("user")]
+
+        return fetched, listed, found
+
+    fetched, listed, found = asyncio.run(main())
+
+    assert fetched.guild_id == payloads.GUILD_ID
+    assert [member.user.username for member in listed + found] == [
+        "user3",
+        "user4",
+    ] * 2
+    assert sorted(dict.keys(guild.members)) == [10**17 + i for i in (1, 3, 4, 5)]
+    assert_compact(guild)
+    assert guild.get_member(10**17 + 5).guild_id == payloads.GUILD_ID
@@ -0,0 +1,77 @@
+import json
+import zlib
+
+import pytest
+
+from acord.core import etf
+from acord.core.decoders import ZLIB_SUFFIX, Inflator, decodeResponse, peekEnvelope
+
+
+def compress_stream(*payloads):
+    # Every message of a connection shares a single zlib context
+    compressor = zlib.compressobj()
+
+    return [
+        compressor.compress(json.dumps(payload).encode())
+        + compressor.flush(zlib.Z_SYNC_FLUSH)
+        for payload in payloads
+    ]
+
+
+def test_inflator_reads_whole_frames():
+    inflator = Inflator()
+    first, second = compress_stream({"op": 10}, {"op": 11})
+
+    assert first.endswith(ZLIB_SUFFIX)
+    assert decodeResponse(first, inflator) == {"op": 10}
+    assert decodeResponse(second, inflator) == {"op": 11}
+
+
+def test_inflator_gathers_partial_frames():
+    inflator = Inflator()
+    (message,) = compress_stream({"op": 0, "d": {"content": "a" * 500}})
+    frames = [message[i : i + 7] for i in range(0, len(message), 7)]
+
+    results = [inflator.decompress(frame) for frame in frames]
+
+    assert results[:-1] == [None] * (len(frames) - 1)
+    assert json.loads(results[-1]) == {"op": 0, "d": {"content": "a" * 500}}
+    assert not inflator.buffer
+
+
+def test_inflator_reset_starts_a_new_stream():
+    inflator = Inflator()
+    first, _ = compress_stream({"op": 10}, {"op": 11})
+    decodeResponse(first, inflator)
+
+    inflator.reset()
+
+    (fresh,) = compress_stream({"op": 1})
+    assert decodeResponse(fresh, inflator) == {"op": 1}
+
+
+def test_decode_response_detects_encoding():
+    assert decodeResponse('{"op": 1}') == {"op": 1}
+    assert decodeResponse(etf.pack({"op": 1})) == {"op": 1}
+    assert decodeResponse(b"not zlib" + ZLIB_SUFFIX, Inflator()) == {}
+
+
+@pytest.mark.parametrize("kind", [str, bytes])
+@pytest.mark.parametrize(
+    "payload, envelope",
+    [
+        ('{"t":"MESSAGE_CREATE","s":42,"op":0,"d":{"id":"1"}}', (0, "MESSAGE_CREATE", 42)),
+        ('{"op": 11, "s": null, "t": null, "d": null}', (11, None, None)),
+        ('{"op":0,"s":3,"t":"READY","d":{"op":7,"t":"X","s":9}}', (0, "READY", 3)),
+    ],
+)
+def test_peek_envelope(kind, payload, envelope):
+    data = payload if kind is str else payload.encode()
+
+    assert peekEnvelope(data) == envelope
+
+
+def test_peek_envelope_gives_up_when_data_comes_first():
+    # Fields nested in "d" must never be mistaken for the envelope
+    assert peekEnvelope('{"d":{"op":7,"t":"X","s":9},"op":0,"t":"READY","s":3}') is None
+    assert peekEnvelope(bytearray(b'{"op":0}')) is None
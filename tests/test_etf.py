@@ -0,0 +1,107 @@
+import datetime
+import enum
+import zlib
+from types import SimpleNamespace
+
+import pydantic
+import pytest
+
+from acord.core import etf
+
+
+class Colour(enum.Enum):
+    RED = "red"
+
+
+class Level(enum.IntEnum):
+    HIGH = 2
+
+
+class Presence(pydantic.BaseModel):
+    status: Colour
+    since: datetime.datetime
+    level: Level
+
+
+SINCE = datetime.datetime(2022, 1, 1, tzinfo=datetime.timezone.utc)
+
+
+@pytest.mark.parametrize(
+    "value",
+    [
+        None,
+        True,
+        False,
+        0,
+        255,
+        256,
+        -1,
+        2**31,
+        -(2**40),
+        934587034957203984,
+        1.5,
+        "",
+        "héllo ✨",
+        [],
+        [1, "two", [3.0]],
+        {"op": 0, "d": {"id": 934587034957203984, "flags": None}, "t": "READY"},
+    ],
+)
+def test_round_trip(value):
+    assert etf._unpack(etf._pack(value)) == value
+
+
+def test_tuples_and_sets_are_packed_as_lists():
+    assert etf._unpack(etf._pack((1, 2))) == [1, 2]
+    assert etf._unpack(etf._pack({3})) == [3]
+
+
+def test_models_are_packed_like_json():
+    packed = etf._unpack(etf._pack(Presence(status="red", since=SINCE, level=2)))
+
+    assert packed == {"status": "red", "since": SINCE.isoformat(), "level": 2}
+
+
+def test_erlpack_receives_builtin_types(monkeypatch):
+    packed = []
+    erlpack = SimpleNamespace(pack=lambda obj: packed.append(obj) or b"")
+    monkeypatch.setattr(etf, "HAS_ERLPACK", True)
+    monkeypatch.setattr(etf, "erlpack", erlpack, raising=False)
+
+    etf.pack({"d": Presence(status="red", since=SINCE, level=2), "s": (1,)})
+
+    assert packed == [
+        {"d": {"status": "red", "since": SINCE.isoformat(), "level": 2}, "s": [1]}
+    ]
+    assert type(packed[0]["d"]["level"]) is int
+
+
+def test_compressed_terms():
+    term = etf._pack({"content": "a" * 100})
+    compressed = bytes(
+        [etf.FORMAT_VERSION, etf.COMPRESSED]
+    ) + (len(term) - 1).to_bytes(4, "big") + zlib.compress(term[1:])
+
+    assert etf._unpack(compressed) == {"content": "a" * 100}
+
+
+def test_invalid_terms():
+    with pytest.raises(etf.ETFDecodeError):
+        etf._unpack(b"\x00")
+
+    with pytest.raises(etf.ETFDecodeError):
+        etf._unpack(bytes([etf.FORMAT_VERSION, 1]))
+
+
+def test_erlpack_decodes_binaries_as_str(monkeypatch):
+    calls = []
+
+    def unpack(data, **kwds):
+        calls.append(kwds)
+        return {"op": 0}
+
+    monkeypatch.setattr(etf, "HAS_ERLPACK", True)
+    monkeypatch.setattr(etf, "erlpack", SimpleNamespace(unpack=unpack), raising=False)
+
+    assert etf.unpack(b"\x83") == {"op": 0}
+    assert calls == [{"encoding": "utf-8", "encode_binary_ext": True}]
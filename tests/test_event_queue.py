@@ -0,0 +1,145 @@
+import asyncio
+import random
+from types import SimpleNamespace
+
+import pytest
+
+from acord.client.queue import EventQueue, routing_key
+
+
+def fake_shard(errors=None):
+    client = SimpleNamespace(on_error=lambda where: errors.append(where))
+    return SimpleNamespace(loop=asyncio.get_event_loop(), shard_id=0, client=client)
+
+
+def test_events_of_a_guild_are_parsed_in_order():
+    async def main():
+        queue = EventQueue(fake_shard(), workers=4)
+        parsed = {}
+
+        async def parser(shard, data):
+            # Uneven parse times would reorder events sharing a worker otherwise
+            await asyncio.sleep(random.random() / 1000)
+            parsed.setdefault(data["guild_id"], []).append(data["n"])
+
+        queue.start()
+
+        for n in range(20):
+            for guild_id in range(1, 9):
+                await queue.put("GUILD_MEMBER_UPDATE", {"guild_id": guild_id, "n": n}, parser)
+
+        await queue.join()
+        queue.stop()
+
+        assert parsed == {guild_id: list(range(20)) for guild_id in range(1, 9)}
+
+    asyncio.run(main())
+
+
+def test_routing_keys():
+    assert routing_key("GUILD_UPDATE", {"id": "5"}) == routing_key(
+        "MESSAGE_CREATE", {"guild_id": 5}
+    )
+    assert routing_key("MESSAGE_CREATE", {"channel_id": 1}) == 0
+    assert routing_key("RESUMED", None) == 0
+
+
+def test_full_queues_block_the_reader():
+    async def main():
+        queue = EventQueue(fake_shard(), maxsize=2)
+        release = asyncio.Event()
+
+        async def parser(shard, data):
+            await release.wait()
+
+        queue.start()
+        await queue.put("TYPING_START", {}, parser)
+        await asyncio.sleep(0)
+        await queue.put("TYPING_START", {}, parser)
+        await queue.put("TYPING_START", {}, parser)
+
+        blocked = asyncio.ensure_future(queue.put("TYPING_START", {}, parser))
+        await asyncio.sleep(0.02)
+        assert not blocked.done()
+        assert queue.depth == 2
+
+        release.set()
+        await blocked
+        await queue.join()
+        queue.stop()
+
+        stats = queue.stats
+        assert (stats.enqueued, stats.processed, stats.pending) == (4, 4, 0)
+        assert stats.blocked == 1
+        assert stats.blocked_for >= 0.01
+        assert stats.max_depth == 3
+        assert stats.to_dict()["pending"] == 0
+
+    asyncio.run(main())
+
+
+def test_failing_parsers_are_reported():
+    async def main():
+        errors = []
+        queue = EventQueue(fake_shard(errors))
+
+        def parser(shard, data):
+            raise ValueError("bad event")
+
+        queue.start()
+        await queue.put("MESSAGE_CREATE", {}, parser)
+        await queue.join()
+        queue.stop()
+
+        assert errors == ["parser for MESSAGE_CREATE"]
+        assert queue.stats.failed == 1
+
+    asyncio.run(main())
+
+
+def test_stopped_queues_keep_their_events():
+    async def main():
+        queue = EventQueue(fake_shard())
+        parsed = []
+
+        def parser(shard, data):
+            parsed.append(data)
+
+        await queue.put("MESSAGE_CREATE", 1, parser)
+        queue.start()
+        queue.stop()
+        await queue.put("MESSAGE_CREATE", 2, parser)
+
+        assert parsed == []
+        assert queue.depth == 2
+
+        queue.start()
+        await queue.close()
+
+        assert parsed == [1, 2]
+        assert not queue.running
+
+    asyncio.run(main())
+
+
+def test_close_gives_up_after_its_timeout():
+    async def main():
+        queue = EventQueue(fake_shard())
+
+        async def parser(shard, data):
+            await asyncio.sleep(10)
+
+        queue.start()
+        await queue.put("MESSAGE_CREATE", 1, parser)
+        await queue.put("MESSAGE_CREATE", 2, parser)
+        await queue.close(timeout=0.02)
+
+        assert not queue.running
+        assert queue.depth == 1
+
+    asyncio.run(main())
+
+
+def test_workers_are_required():
+    with pytest.raises(ValueError):
+        EventQueue(None, workers=0)
@@ -0,0 +1,59 @@
+import asyncio
+import time
+
+import pytest
+
+from acord.core.http import HTTPClient
+from acord.core.ratelimiter import GlobalRatelimit, RequestPriority
+
+
+def test_reserve_must_be_below_rate():
+    with pytest.raises(ValueError):
+        GlobalRatelimit(5, reserve=5)
+
+
+def test_normal_requests_leave_the_reserve():
+    async def main():
+        ratelimit = GlobalRatelimit(10, 10.0, reserve=3)
+
+        for _ in range(7):
+            await asyncio.wait_for(ratelimit.acquire(), 0.1)
+
+        assert ratelimit.available < 1
+
+        # Interactive requests may use the reserve without waiting
+        for _ in range(3):
+            await asyncio.wait_for(
+                ratelimit.acquire(priority=RequestPriority.INTERACTIVE), 0.1
+            )
+
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(ratelimit.acquire(), 0.05)
+
+    asyncio.run(main())
+
+
+def test_tokens_refill_over_time():
+    async def main():
+        ratelimit = GlobalRatelimit(20, 0.1, reserve=0)
+
+        started = time.monotonic()
+        for _ in range(30):
+            await ratelimit.acquire()
+
+        # 20 tokens up front, 10 more refill at 200 per second
+        assert 0.03 <= time.monotonic() - started < 0.5
+
+    asyncio.run(main())
+
+
+def test_each_client_gets_its_own_global_ratelimit():
+    first = HTTPClient(None, token="a")
+    second = HTTPClient(None, token="b")
+
+    assert first.global_ratelimit is not second.global_ratelimit
+    assert first.ratelimiter is not second.ratelimiter
+    assert HTTPClient(None, global_ratelimit=False).global_ratelimit is None
+
+    shared = GlobalRatelimit()
+    assert HTTPClient(None, global_ratelimit=shared).global_ratelimit is shared
@@ -0,0 +1,121 @@
+import asyncio
+from types import SimpleNamespace
+
+from acord.core.heartbeat import GatewayKeepAlive, KeepAlive, get_scheduler
+
+
+class FakeKeepAlive(KeepAlive):
+    def __init__(self, name, events, interval, *, acks=True):
+        self.name = name
+        self.events = events
+        self.acks = acks
+
+        self._loop = asyncio.get_event_loop()
+        self._interval = interval
+        self._ended = False
+
+    async def send_heartbeat(self):
+        self.events.append(("beat", self.name))
+        self._waiting_for_ack = True
+
+        if self.acks:
+            self.ack()
+
+    def get_payload(self):
+        return {"op": 1, "d": None}
+
+    async def on_zombie(self):
+        self.events.append(("zombie", self.name))
+        self.end()
+
+
+def test_one_timer_drives_keep_alives_in_deadline_order():
+    async def main():
+        loop = asyncio.get_event_loop()
+        scheduler = get_scheduler(loop)
+        events = []
+        timers = []
+        call_at = loop.call_at
+
+        def counting_call_at(when, callback, *args, **kwds):
+            timers.append(when)
+            return call_at(when, callback, *args, **kwds)
+
+        loop.call_at = counting_call_at
+        keep_alives = [FakeKeepAlive(name, events, 10) for name in "abc"]
+
+        # Scheduled out of order, later deadlines dont arm another timer
+        scheduler.schedule(keep_alives[0], 0.03)
+        scheduler.schedule(keep_alives[1], 0.01)
+        scheduler.schedule(keep_alives[2], 0.02)
+
+        assert len(scheduler) == 3
+        assert len(timers) == 2
+        assert scheduler._timer_at == keep_alives[1]._due
+
+        await asyncio.sleep(0.1)
+
+        assert events == [("beat", "b"), ("beat", "c"), ("beat", "a")]
+
+        for keep_alive in keep_alives:
+            keep_alive.end()
+
+        scheduler._arm()
+        assert len(scheduler) == 0
+        assert scheduler._timer is None
+
+    asyncio.run(main())
+
+
+def test_missed_ack_is_a_zombie():
+    async def main():
+        events = []
+        healthy = FakeKeepAlive("healthy", events, 0.02)
+        zombie = FakeKeepAlive("zombie", events, 0.02, acks=False)
+
+        healthy.start()
+        zombie.start()
+        await asyncio.sleep(0.09)
+        healthy.end()
+
+        assert [event for event in events if event[1] == "zombie"] == [
+            ("beat", "zombie"),
+            ("zombie", "zombie"),
+        ]
+        assert ("zombie", "healthy") not in events
+        assert events.count(("beat", "healthy")) >= 2
+        assert (zombie.missed, healthy.missed) == (1, 0)
+        assert not zombie.is_scheduled()
+
+    asyncio.run(main())
+
+
+def test_restart_takes_the_new_interval():
+    async def main():
+        keep_alive = FakeKeepAlive("a", [], 10)
+        keep_alive.restart(20)
+
+        assert keep_alive._interval == 0.02
+        assert keep_alive.is_scheduled()
+        keep_alive.end()
+
+    asyncio.run(main())
+
+
+def test_gateway_zombies_close_resumably():
+    async def main():
+        closed = []
+
+        async def close(code):
+            closed.append(code)
+
+        shard = SimpleNamespace(shard_id=0, sequence=5, ws=SimpleNamespace(close=close))
+        keep_alive = GatewayKeepAlive(shard, 41250)
+        keep_alive._waiting_for_ack = True
+
+        await keep_alive.beat()
+
+        assert closed == [4000]
+        assert keep_alive.get_payload() == {"op": 1, "d": 5}
+
+    asyncio.run(main())
@@ -0,0 +1,84 @@
+import asyncio
+
+import pytest
+
+from acord.client import startup
+from acord.client.startup import IdentifyScheduler
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    # Records waits instead of sleeping, moving the loop clock forward as if it had
+    recorded = []
+    real_sleep = asyncio.sleep
+
+    async def sleep(delay, *args):
+        recorded.append(round(delay, 1))
+        await real_sleep(0)
+
+    monkeypatch.setattr(startup.asyncio, "sleep", sleep)
+    return recorded
+
+
+def test_shards_are_grouped_by_bucket():
+    scheduler = IdentifyScheduler(4)
+
+    assert scheduler.buckets([9, 0, 5, 1, 4, 8, 2]) == [[0, 4, 8], [1, 5, 9], [2]]
+    assert IdentifyScheduler(1).buckets([2, 0, 1]) == [[0, 1, 2]]
+    assert scheduler.bucket(13) == 1
+
+
+def test_shards_in_a_bucket_are_spaced_out(sleeps):
+    async def main():
+        scheduler = IdentifyScheduler(2)
+        order = []
+
+        async def identify(shard_id):
+            async with scheduler.identify(shard_id):
+                order.append(shard_id)
+
+        await asyncio.gather(*(identify(shard_id) for shard_id in range(6)))
+
+        # The first shard of each bucket identifies straight away
+        assert order[:2] == [0, 1]
+        assert sorted(order) == list(range(6))
+        assert sleeps == [5.0, 5.0, 5.0, 5.0]
+
+    asyncio.run(main())
+
+
+def test_buckets_identify_in_parallel(sleeps):
+    async def main():
+        scheduler = IdentifyScheduler(16)
+
+        for shard_id in range(16):
+            async with scheduler.identify(shard_id):
+                pass
+
+        assert sleeps == []
+
+        async with scheduler.identify(16):
+            pass
+
+        assert sleeps == [5.0]
+
+    asyncio.run(main())
+
+
+def test_cancelled_waits_release_the_bucket():
+    async def main():
+        scheduler = IdentifyScheduler(1, delay=10)
+
+        async with scheduler.identify(0):
+            pass
+
+        waiting = asyncio.ensure_future(scheduler.identify(1).__aenter__())
+        await asyncio.sleep(0.01)
+        waiting.cancel()
+
+        with pytest.raises(asyncio.CancelledError):
+            await waiting
+
+        assert not scheduler._locks[0].locked()
+
+    asyncio.run(main())
@@ -0,0 +1,227 @@
+import asyncio
+import time
+
+import pytest
+
+from acord.client.cluster import RemoteIdentifyScheduler, ShardCluster
+from acord.client.startup import IdentifyScheduler
+from acord.core.ipc import IPCClient, IPCConnection, IPCServer
+from acord.errors import IPCError
+
+
+def guild_on_shard(shard_id, num_shards):
+    # Guild ids are routed by (guild_id >> 22) % num_shards
+    return (num_shards * 1000 + shard_id) << 22
+
+
+async def connected_pair(handlers):
+    accepted = asyncio.get_event_loop().create_future()
+
+    async def on_connection(reader, writer):
+        connection = IPCConnection(reader, writer, handlers)
+        accepted.set_result(connection)
+        await connection.listen()
+
+    server = await asyncio.start_server(on_connection, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    client = IPCConnection(reader, writer, {})
+    listener = asyncio.ensure_future(client.listen())
+
+    return server, client, listener, await accepted
+
+
+def test_requests_round_trip_over_a_socket():
+    async def main():
+        async def echo(data):
+            return data
+
+        async def fail(data):
+            raise ValueError("bad data")
+
+        server, client, listener, _ = await connected_pair({"echo": echo, "fail": fail})
+        payload = {"ids": [1, 2**63], "nested": {"name": "✨", "flag": None}}
+
+        try:
+            assert await client.request("echo", payload) == payload
+
+            with pytest.raises(IPCError, match="ValueError: bad data"):
+                await client.request("fail")
+            with pytest.raises(IPCError, match="No handler"):
+                await client.request("missing")
+        finally:
+            client.close()
+            await listener
+            server.close()
+
+    asyncio.run(main())
+
+
+def test_responses_are_matched_to_requests():
+    async def main():
+        async def slow_echo(data):
+            # Later requests are answered first
+            await asyncio.sleep(0.05 * (3 - data))
+            return data
+
+        server, client, listener, _ = await connected_pair({"echo": slow_echo})
+
+        try:
+            results = await asyncio.gather(*(client.request("echo", i) for i in range(3)))
+            assert results == [0, 1, 2]
+        finally:
+            client.close()
+            await listener
+            server.close()
+
+    asyncio.run(main())
+
+
+def test_pending_requests_fail_when_the_connection_closes():
+    async def main():
+        async def never(data):
+            await asyncio.sleep(10)
+
+        server, client, listener, accepted = await connected_pair({"never": never})
+        request = asyncio.ensure_future(client.request("never"))
+        await asyncio.sleep(0.05)
+
+        accepted.close()
+
+        with pytest.raises(IPCError):
+            await asyncio.wait_for(request, 1)
+
+        await listener
+        server.close()
+
+    asyncio.run(main())
+
+
+async def start_cluster(num_shards, shard_ids_by_cluster, **kwds):
+    server = IPCServer(num_shards, **kwds)
+    await server.start()
+    clients = []
+
+    for cluster_id, shard_ids in enumerate(shard_ids_by_cluster):
+        ipc = IPCClient(cluster_id, shard_ids, port=server.port)
+
+        @ipc.handler("whoami")
+        async def whoami(data, cluster_id=cluster_id):
+            return {"cluster_id": cluster_id, "data": data}
+
+        await ipc.connect()
+        clients.append(ipc)
+
+    return server, clients
+
+
+async def stop_cluster(server, clients):
+    for ipc in clients:
+        await ipc.close()
+    await server.close()
+
+
+def test_broadcast_reaches_every_cluster():
+    async def main():
+        server, clients = await start_cluster(6, [[0, 1], [2, 3], [4, 5]])
+
+        @clients[2].handler("whoami")
+        async def broken(data):
+            raise RuntimeError("cluster is unhealthy")
+
+        try:
+            results = await clients[0].broadcast("whoami", "hello")
+        finally:
+            await stop_cluster(server, clients)
+
+        assert results == {
+            0: {"cluster_id": 0, "data": "hello"},
+            1: {"cluster_id": 1, "data": "hello"},
+            2: None,
+        }
+
+    asyncio.run(main())
+
+
+def test_requests_are_routed_to_the_cluster_running_a_shard():
+    async def main():
+        server, clients = await start_cluster(4, [[0, 1], [2, 3]])
+
+        try:
+            assert server.shards == {0: 0, 1: 0, 2: 1, 3: 1}
+            assert server.cluster_for(guild_on_shard(3, 4)) == 1
+
+            result = await clients[0].request("whoami", guild_id=guild_on_shard(2, 4))
+            assert result["cluster_id"] == 1
+
+            result = await clients[1].request("whoami", cluster_id=0)
+            assert result["cluster_id"] == 0
+
+            with pytest.raises(IPCError):
+                await clients[0].request("whoami", cluster_id=5)
+            with pytest.raises(ValueError):
+                await clients[0].request("whoami")
+
+            # Disconnected clusters are forgotten
+            await clients[1].close()
+            await asyncio.sleep(0.05)
+            assert list(server.clusters) == [0]
+
+            with pytest.raises(IPCError):
+                await clients[0].request("whoami", guild_id=guild_on_shard(2, 4))
+        finally:
+            await stop_cluster(server, clients)
+
+    asyncio.run(main())
+
+
+def test_unknown_shards_have_no_cluster():
+    server = IPCServer(4)
+    server.shards = {0: 0}
+
+    with pytest.raises(IPCError):
+        server.cluster_for(guild_on_shard(1, 4))
+
+
+def test_shards_are_split_evenly_between_clusters():
+    cluster = ShardCluster(lambda: None, num_shards=10, clusters=3)
+
+    assert [cluster.shard_ids(i) for i in range(3)] == [
+        [0, 1, 2, 3],
+        [4, 5, 6],
+        [7, 8, 9],
+    ]
+    assert ShardCluster(lambda: None, num_shards=2, clusters=8).clusters == 2
+
+
+def test_remote_identifies_honour_max_concurrency():
+    async def main():
+        server, clients = await start_cluster(
+            4, [[0, 1], [2, 3]], identify_scheduler=IdentifyScheduler(delay=0.3)
+        )
+        started = time.monotonic()
+        identified = {}
+
+        async def identify(ipc, shard_id):
+            scheduler = RemoteIdentifyScheduler(ipc, max_concurrency=2)
+
+            async with scheduler.identify(shard_id):
+                identified[shard_id] = time.monotonic() - started
+
+        try:
+            await asyncio.gather(
+                *(
+                    identify(clients[shard_id // 2], shard_id)
+                    for shard_id in range(4)
+                )
+            )
+        finally:
+            await stop_cluster(server, clients)
+
+        # Shards 0 and 1 use different buckets, 2 and 3 wait for them
+        assert identified[0] < 0.2 and identified[1] < 0.2
+        assert identified[2] >= 0.25 and identified[3] >= 0.25
+        assert server.identify_scheduler.max_concurrency == 2
+
+    asyncio.run(main())
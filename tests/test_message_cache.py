@@ -0,0 +1,88 @@
+from types import SimpleNamespace
+
+import pytest
+
+from acord.client.caches.messages import MessageCache
+
+
+def message(channel_id, message_id):
+    return SimpleNamespace(channel_id=channel_id, id=message_id)
+
+
+def fill(cache, channel_id, ids):
+    for message_id in ids:
+        cache.add(message(channel_id, message_id))
+
+
+def test_lru_keeps_recently_read_messages():
+    cache = MessageCache(3, policy="lru")
+    fill(cache, 1, [1, 2, 3])
+
+    cache[(1, 1)]
+    fill(cache, 1, [4])
+
+    assert list(cache) == [(1, 3), (1, 1), (1, 4)]
+    assert cache.evictions["max_messages"] == 1
+
+
+def test_fifo_evicts_in_insertion_order():
+    cache = MessageCache(3, policy="fifo")
+    fill(cache, 1, [1, 2, 3])
+
+    cache[(1, 1)]
+    fill(cache, 1, [4])
+
+    assert list(cache) == [(1, 2), (1, 3), (1, 4)]
+
+
+def test_per_channel_limit():
+    cache = MessageCache(None, max_messages_per_channel=2)
+    fill(cache, 1, [1, 2, 3])
+    fill(cache, 2, [4])
+
+    assert cache.channel_size(1) == 2
+    assert (1, 1) not in cache
+    assert (2, 4) in cache
+    assert cache.evictions["max_messages_per_channel"] == 1
+
+
+def test_unknown_policies_are_rejected():
+    with pytest.raises(ValueError):
+        MessageCache(policy="lfu")
+
+
+def test_memory_usage_is_estimated_from_a_sample():
+    cache = MessageCache()
+    assert cache.memory_usage() == 0
+
+    fill(cache, 1, range(10))
+    assert cache.memory_usage(sample=2) > 0
+
+
+def test_messages_are_indexed_by_channel():
+    cache = MessageCache(None)
+    fill(cache, 1, [30, 10, 20])
+    fill(cache, 2, [15])
+
+    assert [m.id for m in cache.channel_messages(1)] == [10, 20, 30]
+    assert [m.id for m in cache.messages_between(1, after=10)] == [20, 30]
+    assert [m.id for m in cache.messages_between(1, before=30)] == [10, 20]
+    assert [m.id for m in cache.messages_between(1, after=10, before=30)] == [20]
+    assert cache.messages_between(3) == []
+
+
+def test_removing_messages_updates_the_index():
+    cache = MessageCache(None)
+    fill(cache, 1, [1, 2, 3])
+    fill(cache, 2, [4])
+
+    removed = cache.remove_many(1, [1, 5])
+    assert [m and m.id for m in removed] == [1, None]
+    assert cache.remove(1, 2).id == 2
+    assert cache.remove(1, 2) is None
+    assert [m.id for m in cache.channel_messages(1)] == [3]
+
+    assert [m.id for m in cache.purge_channel(1)] == [3]
+    assert cache.channel_size(1) == 0
+    assert list(cache) == [(2, 4)]
+    assert cache.remove_many(1, [3]) == [None]
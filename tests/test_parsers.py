@@ -0,0 +1,124 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+from aiohttp import WSMsgType
+
+from acord import Client
+from acord.client.handler import handle_websocket
+from acord.client.parsers import DEFAULT_PARSERS, EventParsers
+from acord.client.queue import EventQueue
+
+
+def test_register_only_affects_the_copy():
+    parsers = DEFAULT_PARSERS.copy()
+
+    @parsers.register("MESSAGE_CREATE")
+    def parse_message_create(shard, data):
+        pass
+
+    assert isinstance(parsers, EventParsers)
+    assert parsers["MESSAGE_CREATE"] is parse_message_create
+    assert DEFAULT_PARSERS["MESSAGE_CREATE"] is not parse_message_create
+
+
+def test_default_parsers_cover_gateway_events():
+    for event in ("READY", "MESSAGE_CREATE", "GUILD_CREATE", "PRESENCE_UPDATE"):
+        assert callable(DEFAULT_PARSERS[event])
+
+
+class Disconnected(Exception):
+    pass
+
+
+class FakeWebsocket:
+    def __init__(self, payloads):
+        self.messages = [
+            SimpleNamespace(type=WSMsgType.TEXT, data=json.dumps(payload))
+            for payload in payloads
+        ]
+
+    async def receive(self):
+        if not self.messages:
+            raise Disconnected()
+        return self.messages.pop(0)
+
+
+def run_gateway(client, payloads):
+    async def main():
+        shard = SimpleNamespace(
+            client=client,
+            ws=FakeWebsocket(payloads),
+            inflator=None,
+            sequence=None,
+            shard_id=0,
+            loop=asyncio.get_running_loop(),
+        )
+        shard.event_queue = EventQueue(shard)
+
+        with pytest.raises(Disconnected):
+            await handle_websocket(shard)
+
+        return shard
+
+    return asyncio.run(main())
+
+
+def dispatch(event, data, sequence):
+    return {"op": 0, "t": event, "d": data, "s": sequence}
+
+
+def test_registered_parser_replaces_builtin():
+    parsers = DEFAULT_PARSERS.copy()
+    builtin = parsers["GUILD_DELETE"]
+
+    @parsers.register("GUILD_DELETE")
+    async def parse_guild_delete(shard, data):
+        pass
+
+    assert parsers.get("GUILD_DELETE") is parse_guild_delete
+    assert parsers["GUILD_DELETE"] is not builtin
+    assert len(parsers) == len(DEFAULT_PARSERS)
+
+
+def test_unknown_events_have_no_parser():
+    assert DEFAULT_PARSERS.get("SOME_NEW_EVENT") is None
+    assert "SOME_NEW_EVENT" not in DEFAULT_PARSERS.copy()
+
+
+def test_client_parsers_route_dispatches():
+    client = Client(token="token")
+    parsed = []
+
+    @client.parsers.register("READY")
+    def parse_ready(shard, data):
+        parsed.append(("READY", data))
+
+    @client.parsers.register("MESSAGE_CREATE")
+    async def parse_message_create(shard, data):
+        parsed.append(("MESSAGE_CREATE", data))
+
+    @client.parsers.register("TYPING_START")
+    def parse_typing_start(shard, data):
+        parsed.append(("TYPING_START", data))
+
+    shard = run_gateway(
+        client,
+        [
+            dispatch("READY", {"v": 10}, 1),
+            dispatch("MESSAGE_CREATE", {"id": "1"}, 2),
+            dispatch("SOME_NEW_EVENT", {"id": "2"}, 3),
+            dispatch("TYPING_START", {"id": "3"}, 4),
+        ],
+    )
+
+    # Unknown events are skipped, but still advance the sequence
+    assert parsed == [
+        ("READY", {"v": 10}),
+        ("MESSAGE_CREATE", {"id": "1"}),
+        ("TYPING_START", {"id": "3"}),
+    ]
+    assert shard.sequence == 4
+    assert shard.event_queue.stats.processed == 2
+    assert DEFAULT_PARSERS["MESSAGE_CREATE"] is not parse_message_create
@@ -0,0 +1,91 @@
+import time
+
+import pydantic
+import pytest
+
+from acord.client.caches.messages import MessageCache
+from acord.client.caches.policy import CachePolicy, PolicyStore
+
+
+def store(**policy):
+    return PolicyStore(CachePolicy(**policy))
+
+
+def test_lru_evicts_least_recently_used():
+    items = store(max_items=2, eviction="lru")
+    items["a"], items["b"] = 1, 2
+    items["a"]
+    items["c"] = 3
+
+    assert sorted(items) == ["a", "c"]
+    assert items.evictions["max_items"] == 1
+
+
+def test_lfu_evicts_least_frequently_used():
+    items = store(max_items=2, eviction="lfu")
+    items["a"], items["b"] = 1, 2
+    items["a"], items["a"], items["b"]
+    items["c"] = 3
+
+    assert sorted(items) == ["a", "c"]
+
+    # Ties are broken by which was used least recently
+    items["d"] = 4
+    assert sorted(items) == ["a", "d"]
+
+
+def test_fifo_evicts_oldest():
+    items = store(max_items=2, eviction="fifo")
+    items["a"], items["b"] = 1, 2
+    items["a"]
+    items["a"] = 10
+    items["c"] = 3
+
+    assert sorted(items) == ["b", "c"]
+
+
+def test_items_expire():
+    items = store(ttl=0.2)
+    items["a"] = 1
+    time.sleep(0.12)
+    items["b"] = 2
+    time.sleep(0.12)
+
+    assert "a" not in items
+    assert items["b"] == 2
+    assert items.evictions["ttl"] == 1
+
+    time.sleep(0.12)
+    assert items.values() == []
+    assert items.sweep() == 1
+    assert len(items) == 0
+
+
+def test_updating_an_item_resets_its_expiry():
+    items = store(ttl=0.2)
+    items["a"] = 1
+    time.sleep(0.12)
+    items["a"] = 2
+    time.sleep(0.12)
+
+    assert items["a"] == 2
+
+
+def test_invalid_policies_are_rejected():
+    with pytest.raises(pydantic.ValidationError):
+        CachePolicy(max_items=0)
+    with pytest.raises(pydantic.ValidationError):
+        CachePolicy(eviction="random")
+
+
+def test_messages_expire():
+    cache = MessageCache(None, ttl=0.2)
+    cache[(1, 1)] = "old"
+    time.sleep(0.12)
+    cache[(1, 2)] = "new"
+    time.sleep(0.12)
+
+    assert cache.channel_messages(1) == ["new"]
+    assert cache.sweep() == 1
+    assert list(cache) == [(1, 2)]
+    assert cache.evictions["ttl"] == 1
@@ -0,0 +1,53 @@
+import asyncio
+
+from acord.core.ratelimiter import PriorityLock, RequestPriority
+
+
+def test_waiters_are_let_through_by_priority_then_arrival():
+    async def main():
+        lock = PriorityLock()
+        order = []
+
+        async def waiter(name, priority):
+            await lock.acquire(priority)
+            order.append(name)
+            lock.release()
+
+        await lock.acquire()
+        tasks = [
+            asyncio.ensure_future(waiter("background", RequestPriority.BACKGROUND)),
+            asyncio.ensure_future(waiter("normal 1", RequestPriority.NORMAL)),
+            asyncio.ensure_future(waiter("interactive", RequestPriority.INTERACTIVE)),
+            asyncio.ensure_future(waiter("normal 2", RequestPriority.NORMAL)),
+        ]
+        await asyncio.sleep(0)
+        assert lock.waiting == 4
+
+        lock.release()
+        await asyncio.gather(*tasks)
+
+        assert order == ["interactive", "normal 1", "normal 2", "background"]
+        assert not lock.locked()
+
+    asyncio.run(main())
+
+
+def test_cancelled_waiters_are_skipped():
+    async def main():
+        lock = PriorityLock()
+        await lock.acquire()
+
+        cancelled = asyncio.ensure_future(lock.acquire(RequestPriority.INTERACTIVE))
+        waiting = asyncio.ensure_future(lock.acquire(RequestPriority.BACKGROUND))
+        await asyncio.sleep(0)
+
+        cancelled.cancel()
+        await asyncio.sleep(0)
+        assert not lock.preempted(RequestPriority.NORMAL, 0)
+        assert lock.preempted(RequestPriority.BACKGROUND, 10)
+
+        lock.release()
+        await asyncio.wait_for(waiting, 1)
+        assert lock.locked()
+
+    asyncio.run(main())
@@ -0,0 +1,118 @@
+import asyncio
+import time
+
+import aiohttp
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from acord.rest.proxy import RESTProxy
+
+
+def fake_upstream(received, remaining="4"):
+    async def handler(request):
+        received.append(
+            (
+                request.method,
+                request.path,
+                dict(request.query),
+                request.headers.get("Authorization"),
+                await request.read(),
+            )
+        )
+
+        return web.json_response(
+            {"id": "1"},
+            headers={
+                "X-RateLimit-Limit": "5",
+                "X-RateLimit-Remaining": remaining,
+                "X-RateLimit-Reset-After": "0.3",
+                "X-RateLimit-Bucket": "abcd",
+                "X-Custom": "kept",
+            },
+        )
+
+    app = web.Application()
+    app.router.add_route("*", "/{path:.*}", handler)
+    return app
+
+
+async def start(received, **kwds):
+    upstream = TestServer(fake_upstream(received, **kwds))
+    await upstream.start_server()
+
+    proxy = RESTProxy(upstream=str(upstream.make_url("")))
+    server = TestServer(proxy.application)
+    await server.start_server()
+
+    return proxy, server, upstream
+
+
+def test_requests_are_forwarded():
+    async def main():
+        received = []
+        proxy, server, upstream = await start(received)
+
+        try:
+            async with aiohttp.ClientSession() as session:
+                async with session.post(
+                    server.make_url("/v10/channels/1/messages"),
+                    params={"wait": "true"},
+                    data=b'{"content": "hi"}',
+                    headers={"Authorization": "Bot token"},
+                ) as resp:
+                    assert resp.status == 200
+                    assert await resp.json() == {"id": "1"}
+                    assert resp.headers["X-Custom"] == "kept"
+                    assert resp.headers["X-RateLimit-Bucket"] == "abcd"
+        finally:
+            await server.close()
+            await upstream.close()
+
+        assert received == [
+            (
+                "POST",
+                "/v10/channels/1/messages",
+                {"wait": "true"},
+                "Bot token",
+                b'{"content": "hi"}',
+            )
+        ]
+        ratelimiter = proxy.ratelimiters["Bot token"]
+        assert ratelimiter.routes["POST /channels/{channel_id}/messages"] == "abcd"
+
+    asyncio.run(main())
+
+
+def test_clients_share_buckets():
+    async def main():
+        received = []
+        proxy, server, upstream = await start(received, remaining="0")
+        url = server.make_url("/v10/channels/1/pins")
+        headers = {"Authorization": "Bot token"}
+
+        try:
+            async with aiohttp.ClientSession() as first, aiohttp.ClientSession() as second:
+                async with first.get(url, headers=headers) as resp:
+                    assert resp.status == 200
+
+                started = time.monotonic()
+
+                # The bucket emptied by the first client holds back the second
+                async with second.get(url, headers=headers) as resp:
+                    assert resp.status == 200
+
+                assert time.monotonic() - started >= 0.2
+
+                # Other tokens have their own buckets
+                started = time.monotonic()
+                async with second.get(url, headers={"Authorization": "Bot other"}):
+                    pass
+                assert time.monotonic() - started < 0.2
+        finally:
+            await server.close()
+            await upstream.close()
+
+        assert len(received) == 3
+        assert set(proxy.ratelimiters) == {"Bot token", "Bot other"}
+
+    asyncio.run(main())
@@ -0,0 +1,69 @@
+import asyncio
+import time
+
+from acord.core.abc import Route
+from acord.core.ratelimiter import DefaultHTTPRatelimiter, RatelimitBucket
+
+
+def test_bucket_allows_one_request_until_limits_are_known():
+    async def main():
+        bucket = RatelimitBucket("key")
+        await bucket.acquire()
+
+        second = asyncio.ensure_future(bucket.acquire())
+        await asyncio.sleep(0.01)
+        assert not second.done()
+
+        bucket.update({"limit": 5, "remaining": 4, "reset": 1.0})
+        await asyncio.wait_for(second, 1)
+
+        assert bucket.limit == 5
+        assert bucket.remaining == 3
+
+    asyncio.run(main())
+
+
+def test_bucket_waits_for_reset_when_exhausted():
+    async def main():
+        bucket = RatelimitBucket("key")
+        await bucket.acquire()
+        bucket.update({"limit": 1, "remaining": 0, "reset": 0.05})
+
+        started = time.monotonic()
+        await bucket.acquire()
+
+        assert time.monotonic() - started >= 0.04
+
+    asyncio.run(main())
+
+
+def test_failed_request_releases_unknown_bucket():
+    async def main():
+        bucket = RatelimitBucket("key")
+        await bucket.acquire()
+        bucket.update({})
+
+        await asyncio.wait_for(bucket.acquire(), 0.1)
+
+    asyncio.run(main())
+
+
+def test_routes_sharing_a_hash_share_a_bucket():
+    ratelimiter = DefaultHTTPRatelimiter(max_requests=(10000, 600))
+    pins = Route("GET", path="/channels/1/pins")
+    typing = Route("POST", path="/channels/1/typing")
+    headers = {"limit": 5, "remaining": 4, "reset": 1.0, "bucket": "abcd"}
+
+    ratelimiter.update(pins, headers)
+    ratelimiter.update(typing, headers)
+
+    assert ratelimiter.bucket_key(pins) == ratelimiter.bucket_key(typing) == "abcd:1"
+    assert ratelimiter.get_bucket(pins) is ratelimiter.get_bucket(typing)
+
+
+def test_major_parameters_split_buckets():
+    ratelimiter = DefaultHTTPRatelimiter(max_requests=(10000, 600))
+    first = Route("GET", path="/channels/1/pins")
+    second = Route("GET", path="/channels/2/pins")
+
+    assert ratelimiter.get_bucket(first) is not ratelimiter.get_bucket(second)
@@ -0,0 +1,69 @@
+from acord.core.abc import Route
+from acord.core.response_cache import ResponseCache
+
+ROLES = "GET /guilds/{guild_id}/roles"
+EMOJIS = "GET /guilds/{guild_id}/emojis"
+
+
+def route(method, path):
+    return Route(method, path=path)
+
+
+def test_only_configured_routes_are_cached():
+    cache = ResponseCache({ROLES: 60})
+    cache.set(route("GET", "/guilds/1/roles"), "token", "roles")
+    cache.set(route("GET", "/guilds/1/emojis"), "token", "emojis")
+
+    assert cache.get(route("GET", "/guilds/1/roles"), "token") == "roles"
+    assert cache.get(route("GET", "/guilds/1/emojis"), "token") is None
+    assert cache.get(route("GET", "/guilds/1/roles"), "other token") is None
+    assert (cache.hits, cache.misses) == (1, 2)
+
+
+def test_expired_responses_are_removed():
+    cache = ResponseCache(default_ttl=0)
+    cache.set(route("GET", "/guilds/1/roles"), "token", "roles")
+
+    assert cache.get(route("GET", "/guilds/1/roles"), "token") is None
+    assert len(cache) == 0
+
+
+def test_oldest_responses_are_removed_once_full():
+    cache = ResponseCache(default_ttl=60, max_size=2)
+
+    for guild_id in (1, 2, 3):
+        cache.set(route("GET", f"/guilds/{guild_id}/roles"), "token", guild_id)
+
+    assert len(cache) == 2
+    assert cache.get(route("GET", "/guilds/1/roles"), "token") is None
+    assert cache.get(route("GET", "/guilds/3/roles"), "token") == 3
+
+
+def test_modifying_an_object_invalidates_its_collection():
+    cache = ResponseCache({ROLES: 60, EMOJIS: 60})
+    cache.set(route("GET", "/guilds/1/roles"), "token", "roles")
+    cache.set(route("GET", "/guilds/2/roles"), "token", "other roles")
+    cache.set(route("GET", "/guilds/1/emojis"), "token", "emojis")
+
+    assert cache.invalidate_route(route("PATCH", "/guilds/1/roles/5")) == 1
+
+    assert cache.get(route("GET", "/guilds/1/roles"), "token") is None
+    assert cache.get(route("GET", "/guilds/2/roles"), "token") == "other roles"
+    assert cache.get(route("GET", "/guilds/1/emojis"), "token") == "emojis"
+    assert cache.invalidations == 1
+
+
+def test_gateway_events_invalidate_responses():
+    cache = ResponseCache(default_ttl=60)
+    cache.set(route("GET", "/guilds/1/roles"), "token", "roles")
+    cache.set(route("GET", "/channels/5"), "token", "channel")
+    cache.set(route("GET", "/channels/5/messages"), "token", "messages")
+
+    assert cache.invalidate_event("GUILD_ROLE_UPDATE", {"guild_id": "1"}) == 1
+    assert cache.get(route("GET", "/guilds/1/roles"), "token") is None
+
+    # Updating a channel leaves its messages cached
+    assert cache.invalidate_event("CHANNEL_UPDATE", {"id": "5", "guild_id": None}) == 1
+    assert cache.get(route("GET", "/channels/5/messages"), "token") == "messages"
+
+    assert cache.invalidate_event("TYPING_START", {"channel_id": "5"}) == 0
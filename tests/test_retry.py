@@ -0,0 +1,82 @@
+import asyncio
+import io
+
+import aiohttp
+import pytest
+from aiohttp import FormData
+
+from acord.core.retry import RetryPolicy, rebuild_body, snapshot_body
+
+
+def test_ratelimits_are_always_retried():
+    policy = RetryPolicy(3)
+
+    assert policy.should_retry("POST", 1, status=429)
+    assert not policy.should_retry("POST", 3, status=429)
+
+
+def test_server_errors_are_retried_for_idempotent_methods():
+    policy = RetryPolicy(3)
+
+    assert policy.should_retry("GET", 1, status=503)
+    assert policy.should_retry("delete", 2, status=500)
+    assert not policy.should_retry("POST", 1, status=503)
+    assert not policy.should_retry("GET", 1, status=404)
+    assert RetryPolicy(3, retry_non_idempotent=True).should_retry("POST", 1, status=503)
+
+
+def test_only_connection_errors_are_retried():
+    policy = RetryPolicy(3)
+
+    assert policy.should_retry("GET", 1, error=aiohttp.ServerDisconnectedError())
+    assert policy.should_retry("GET", 1, error=asyncio.TimeoutError())
+    assert not policy.should_retry("POST", 1, error=asyncio.TimeoutError())
+    assert not policy.should_retry("GET", 1, error=ValueError())
+
+
+def test_delay_backs_off_exponentially():
+    policy = RetryPolicy(10, backoff=0.5, max_backoff=3.0, jitter=False)
+
+    assert [policy.delay(attempt) for attempt in range(1, 6)] == [0.5, 1, 2, 3, 3]
+
+    jittered = RetryPolicy(10, backoff=0.5)
+    assert all(0 <= jittered.delay(3) <= 2 for _ in range(100))
+
+
+def test_max_attempts_must_be_positive():
+    with pytest.raises(ValueError):
+        RetryPolicy(0)
+
+
+def test_bodies_without_files_are_sent_as_is():
+    assert snapshot_body({"content": "hi"}) is None
+    assert rebuild_body({"content": "hi"}, None) == {"content": "hi"}
+
+
+def test_forms_are_rebuilt_with_files_rewound():
+    file = io.BytesIO(b"hello")
+    form = FormData()
+    form.add_field("payload_json", "{}")
+    form.add_field("file", file, filename="a.txt")
+
+    snapshot = snapshot_body(form)
+    form()
+    file.read()
+
+    rebuilt = rebuild_body(form, snapshot)
+
+    assert rebuilt is not form
+    assert file.tell() == 0
+    assert b"hello" in asyncio.run(rebuilt().as_bytes())
+
+
+def test_closed_files_cannot_be_resent():
+    file = io.BytesIO(b"hello")
+    form = FormData()
+    form.add_field("file", file, filename="a.txt")
+
+    snapshot = snapshot_body(form)
+    file.close()
+
+    with pytest.raises(ValueError):
+        rebuild_body(form, snapshot)
@@ -0,0 +1,96 @@
+import pytest
+
+from acord.core.abc import Route
+from acord.core.ratelimiter import DefaultHTTPRatelimiter
+
+
+@pytest.mark.parametrize(
+    "method, path, template, major",
+    [
+        ("GET", "/channels/1/messages/2", "GET /channels/{channel_id}/messages/{id}", "1"),
+        ("GET", "/guilds/5/members", "GET /guilds/{guild_id}/members", "5"),
+        (
+            "POST",
+            "/webhooks/1/abc-token/messages/@original",
+            "POST /webhooks/{webhook_id}/{token}/messages/@original",
+            "1:abc-token",
+        ),
+        (
+            "PUT",
+            "/channels/1/messages/2/reactions/%F0%9F%98%80/@me",
+            "PUT /channels/{channel_id}/messages/{id}/reactions/{emoji}/@me",
+            "1",
+        ),
+        ("GET", "/invites/discord-api", "GET /invites/{code}", ""),
+        ("POST", "/guilds/templates/hgM48av5Q69A", "POST /guilds/templates/{code}", ""),
+        ("GET", "/users/@me", "GET /users/@me", ""),
+    ],
+)
+def test_parse_path(method, path, template, major):
+    route = Route(method, path=path)
+
+    assert route.template == template
+    assert route.major_parameters == major
+
+
+def test_non_snowflake_segments_share_a_bucket():
+    ratelimiter = DefaultHTTPRatelimiter(max_requests=(10000, 600))
+    emojis = ["%F0%9F%98%80", "%F0%9F%91%8D", "custom:1234", "other:5678"]
+    codes = ["abc", "def", "ghi"]
+
+    keys = {
+        ratelimiter.bucket_key(Route("PUT", path=f"/channels/1/messages/2/reactions/{e}/@me"))
+        for e in emojis
+    }
+    keys |= {ratelimiter.bucket_key(Route("GET", path=f"/invites/{c}")) for c in codes}
+
+    assert len(keys) == 2
+
+
+@pytest.mark.parametrize(
+    "method, path, values",
+    [
+        ("GET", "/channels/{channel_id}/messages/{message_id}", dict(channel_id=1, message_id=2)),
+        (
+            "PUT",
+            "/channels/{channel_id}/messages/{message_id}/reactions/{emoji}/@me",
+            dict(channel_id=1, message_id=2, emoji="%F0%9F%98%80"),
+        ),
+        (
+            "DELETE",
+            "/channels/{channel_id}/messages/{message_id}/reactions/{emoji}/{user_id}",
+            dict(channel_id=1, message_id=2, emoji="name:3", user_id=4),
+        ),
+        (
+            "POST",
+            "/interactions/{interaction_id}/{token}/callback",
+            dict(interaction_id=1, token="abc-token"),
+        ),
+        ("GET", "/invites/{code}", dict(code="discord-api")),
+    ],
+)
+def test_template_matches_parsed_route(method, path, values):
+    formatted = Route.compile(method, path).format(**values)
+    # Routes keep an empty segment for a leading slash in their url
+    parsed = Route(method, path=path.format(**values).lstrip("/"))
+
+    assert formatted.template == parsed.template
+    assert formatted.major_parameters == parsed.major_parameters
+    assert str(formatted.url) == str(parsed.url)
+
+
+def test_template_query_values_are_stringified():
+    template = Route.compile("POST", "/webhooks/{webhook_id}/{token}")
+    route = template.format(webhook_id=1, token="abc", wait=True, thread_id=5)
+
+    assert route.url.query == {"wait": "true", "thread_id": "5"}
+    parsed = Route("POST", path="webhooks/1/abc", wait=True, thread_id=5)
+    assert dict(route.url.query) == dict(parsed.url.query)
+
+
+def test_template_skips_empty_query_values():
+    route = Route.compile("GET", "/channels/{channel_id}/messages").format(
+        channel_id=1, limit=50, before=None
+    )
+
+    assert dict(route.url.query) == {"limit": "50"}
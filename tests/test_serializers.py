@@ -0,0 +1,125 @@
+import datetime
+import enum
+import json
+import sys
+from typing import List, Optional
+
+import pytest
+from pydantic import BaseModel
+
+from acord.core import serializers
+
+
+class Colour(enum.IntEnum):
+    RED = 1
+
+
+class Author(BaseModel):
+    id: int
+    name: str
+
+
+class Post(BaseModel):
+    id: int
+    author: Author
+    content: str
+    created_at: datetime.datetime
+    colour: Colour
+    tags: List[str]
+    edited_at: Optional[datetime.datetime] = None
+
+
+def installed_backends():
+    for name, backend in serializers.BACKENDS.items():
+        try:
+            backend()
+        except ImportError:
+            continue
+        yield name
+
+
+@pytest.fixture(autouse=True)
+def restore_backend():
+    backend = serializers.get_backend()
+    yield
+    serializers.set_backend(backend)
+
+
+@pytest.fixture
+def post():
+    return Post(
+        id=10**17 + 1,
+        author=Author(id=10**17 + 2, name="user"),
+        content="hello world",
+        created_at=datetime.datetime(2021, 1, 1, tzinfo=datetime.timezone.utc),
+        colour=Colour.RED,
+        tags=["a", "b"],
+    )
+
+
+def test_find_backend_follows_preference_order(monkeypatch):
+    tried = []
+
+    def backend(name, installed):
+        class Backend(serializers.StdlibBackend):
+            def __init__(self):
+                tried.append(name)
+
+                if not installed:
+                    raise ImportError(name)
+
+        Backend.name = name
+        return Backend
+
+    monkeypatch.setattr(
+        serializers,
+        "BACKENDS",
+        {
+            "orjson": backend("orjson", False),
+            "ujson": backend("ujson", True),
+            "json": backend("json", True),
+        },
+    )
+
+    assert serializers._find_backend().name == "ujson"
+    assert tried == ["orjson", "ujson"]
+
+
+def test_find_backend_falls_back_to_stdlib(monkeypatch):
+    # None in sys.modules makes the import raise ImportError
+    monkeypatch.setitem(sys.modules, "orjson", None)
+    monkeypatch.setitem(sys.modules, "ujson", None)
+
+    assert isinstance(serializers._find_backend(), serializers.StdlibBackend)
+
+
+def test_set_backend_by_name():
+    backend = serializers.set_backend("json")
+
+    assert isinstance(backend, serializers.StdlibBackend)
+    assert serializers.get_backend() is backend
+    assert serializers.loads(serializers.dumps({"a": [1]})) == {"a": [1]}
+
+
+def test_set_backend_rejects_unknown_backends():
+    current = serializers.get_backend()
+
+    with pytest.raises(ValueError, match="simdjson"):
+        serializers.set_backend("simdjson")
+    with pytest.raises(TypeError):
+        serializers.set_backend(json)
+
+    assert serializers.get_backend() is current
+
+
+@pytest.mark.parametrize("name", list(installed_backends()))
+def test_models_dump_like_stdlib(name, post):
+    serializers.set_backend("json")
+    expected = serializers.dumps(post, exclude={"tags"})
+
+    serializers.set_backend(name)
+    dumped = serializers.dumps(post, exclude={"tags"})
+
+    assert dumped == expected
+    assert json.loads(dumped) == json.loads(post.json(exclude={"tags"}))
+    assert serializers.loads(dumped)["created_at"] == "2021-01-01T00:00:00+00:00"
@@ -0,0 +1,80 @@
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from acord.client.client import Client
+from acord.client.sessions import FileSessionStore, SessionData, SQLiteSessionStore
+
+
+def _session(shard_id: int, **kwds) -> SessionData:
+    return SessionData(
+        shard_id=shard_id,
+        num_shards=2,
+        session_id=f"session-{shard_id}",
+        sequence=10,
+        resume_url="wss://resume",
+        **kwds,
+    )
+
+
+@pytest.fixture(params=["file", "sqlite"])
+def store(request, tmp_path):
+    if request.param == "file":
+        store = FileSessionStore(path=str(tmp_path / "sessions.json"))
+    else:
+        store = SQLiteSessionStore(path=str(tmp_path / "sessions.db"))
+
+    yield store
+    store.close()
+
+
+def test_save_many_round_trip(store):
+    store.save_many([_session(0), _session(1)])
+
+    assert store.get(0, 2).session_id == "session-0"
+    assert store.get(1, 2).session_id == "session-1"
+
+
+def test_save_replaces_session(store):
+    store.save(_session(0))
+    store.save(SessionData(**{**_session(0).dict(), "sequence": 20}))
+
+    assert store.get(0, 2).sequence == 20
+
+
+def test_expired_and_resharded_sessions_are_dropped(store):
+    store.save_many([_session(0, updated_at=time.time() - 1000), _session(1)])
+
+    assert store.get(0, 2) is None
+    assert store.get(1, 4) is None
+    assert store.load(1) is None
+
+
+class _RecordingStore(FileSessionStore):
+    batches: list = []
+
+    def save_many(self, sessions):
+        sessions = list(sessions)
+        self.batches.append(sessions)
+        super().save_many(sessions)
+
+
+def test_client_refreshes_idle_sessions_in_one_batch(tmp_path):
+    store = _RecordingStore(path=str(tmp_path / "sessions.json"))
+    store.batches = []
+
+    shards = {
+        i: SimpleNamespace(session_data=lambda i=i: _session(i)) for i in range(2)
+    }
+    shards[2] = SimpleNamespace(session_data=lambda: None)
+    client = SimpleNamespace(session_store=store, shards=shards)
+
+    Client.save_sessions(client)
+    first = store.load(0).updated_at
+    time.sleep(0.01)
+    Client.save_sessions(client)
+
+    assert len(store.batches) == 2
+    assert [len(batch) for batch in store.batches] == [2, 2]
+    assert store.load(0).updated_at > first
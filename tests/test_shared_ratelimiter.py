@@ -0,0 +1,48 @@
+import asyncio
+
+from acord.core.abc import Route
+from acord.core.ratelimit_server import SharedHTTPRatelimiter
+
+
+class BrokenConnection:
+    def __init__(self):
+        self.closed = False
+        self.requests = 0
+
+    async def request(self, op, data=None):
+        self.requests += 1
+        raise ConnectionResetError("Connection reset by peer")
+
+    def close(self):
+        self.closed = True
+
+
+def test_socket_errors_fall_back_to_local_buckets():
+    async def main():
+        ratelimiter = SharedHTTPRatelimiter(port=1, host_server=False)
+        connection = BrokenConnection()
+        ratelimiter._connection = connection
+        route = Route("GET", path="channels/1/pins")
+
+        await asyncio.wait_for(ratelimiter.acquire(route), 1)
+
+        assert connection.requests == 1
+        assert connection.closed
+        assert ratelimiter._connection is None
+        assert ratelimiter._fallback.get_bucket(route).remaining == 0
+
+    asyncio.run(main())
+
+
+def test_socket_errors_while_sending_drop_the_connection():
+    async def main():
+        ratelimiter = SharedHTTPRatelimiter(port=1, host_server=False)
+        connection = BrokenConnection()
+        ratelimiter._connection = connection
+
+        await ratelimiter._send("global", {"retry_after": 1})
+
+        assert connection.closed
+        assert not ratelimiter.connected
+
+    asyncio.run(main())
@@ -0,0 +1,63 @@
+from types import SimpleNamespace
+
+import pytest
+
+from acord import DefaultCache, User
+from acord.core.http import HTTPClient
+from acord.models import Guild, RawMapping
+
+
+def connect(compact):
+    cache = DefaultCache(compact=compact, sweep_interval=None)
+    return cache, HTTPClient(SimpleNamespace(cache=cache), token="token")
+
+
+@pytest.mark.parametrize("compact_from", [False, True])
+@pytest.mark.parametrize("compact_to", [False, True])
+def test_snapshot_round_trip(tmp_path, payloads, compact_from, compact_to):
+    path = str(tmp_path / "cache.snap")
+    cache, http = connect(compact_from)
+    members = [payloads.member(i, roles=[payloads.ROLE_ID]) for i in range(10)]
+    cache.add_guild(
+        Guild(conn=http, **payloads.guild(members, roles=[payloads.role()]))
+    )
+    # Users are weakly referenced when not compact
+    users = [User(conn=http, **payloads.user(i)) for i in range(3)]
+
+    for i, model in enumerate(users):
+        cache.add_user_payload(model, payloads.user(i))
+
+    written = cache.snapshot(path)
+
+    restored, conn = connect(compact_to)
+    info = restored.restore(path, conn)
+
+    assert info.records == written
+    assert restored.restored_snapshot is info
+    assert 0 <= info.age < 60
+
+    restored_guild = restored.get_guild(payloads.GUILD_ID)
+    assert restored_guild.conn is conn
+    assert isinstance(restored_guild.members, RawMapping) is compact_from
+    assert restored_guild.roles[payloads.ROLE_ID].conn is conn
+
+    restored_member = restored_guild.get_member(10**17 + 3)
+    assert restored_member.user.username == "user3"
+    assert restored_member.conn is conn
+
+    restored_user = restored.get_user(10**17 + 1)
+
+    if compact_to:
+        assert restored_user.conn is conn
+    else:
+        # Nothing restored references the user, so the weak section drops it
+        assert restored_user is None
+
+
+def test_invalid_snapshots_are_rejected(tmp_path):
+    path = tmp_path / "cache.snap"
+    path.write_bytes(b"nope")
+    cache, conn = connect(False)
+
+    with pytest.raises(ValueError):
+        cache.restore(str(path), conn)
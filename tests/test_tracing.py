@@ -0,0 +1,66 @@
+from acord.core.abc import Route
+from acord.core.tracing import Histogram, HistogramSink, RequestTrace
+
+
+def _trace(route: str, total: float = 0.1) -> RequestTrace:
+    return RequestTrace(
+        route=route,
+        bucket="unknown",
+        status=200,
+        error=None,
+        total=total,
+        ratelimit_wait=0.0,
+        dns=0.0,
+        connect=0.0,
+        ttfb=total,
+        retries=0,
+        size=10,
+        reused_connection=True,
+    )
+
+
+def _samples(lines, suffix):
+    return {
+        line.rsplit(" ", 1)[0]: float(line.rsplit(" ", 1)[1])
+        for line in lines
+        if line.startswith(f"latency{suffix}")
+    }
+
+
+def test_histogram_buckets_are_cumulative():
+    histogram = Histogram("latency", "help", (0.1, 1))
+    histogram.observe(0.05, route="a")
+    histogram.observe(0.5, route="a")
+
+    buckets = _samples(histogram.export(), "_bucket")
+
+    assert buckets['latency_bucket{route="a",le="0.1"}'] == 1
+    assert buckets['latency_bucket{route="a",le="1"}'] == 2
+    assert buckets['latency_bucket{route="a",le="+Inf"}'] == 2
+
+
+def test_histogram_value_above_every_bound():
+    histogram = Histogram("latency", "help", (0.1, 1))
+    histogram.observe(0.05, route="a")
+    histogram.observe(5.0, route="a")
+
+    lines = histogram.export()
+    buckets = _samples(lines, "_bucket")
+
+    assert buckets['latency_bucket{route="a",le="1"}'] == 1
+    assert buckets['latency_bucket{route="a",le="+Inf"}'] == 2
+    assert _samples(lines, "_sum") == {'latency_sum{route="a"}': 5.05}
+    assert _samples(lines, "_count") == {'latency_count{route="a"}': 2}
+
+
+def test_route_labels_stay_bounded():
+    sink = HistogramSink()
+    paths = [f"/channels/1/messages/2/reactions/emoji{i}/@me" for i in range(50)]
+    paths += [f"/invites/code{i}" for i in range(50)]
+
+    for path in paths:
+        sink.emit(_trace(Route("PUT", path=path).template))
+
+    series = sink.histograms["total"]._series
+    assert len(series) == 2
+    assert sink.export().count("acord_http_requests_total{") == 2